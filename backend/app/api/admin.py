@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Header, HTTPException, Depends
+from fastapi import APIRouter, Header, HTTPException, Depends, Response
+from ..repos.cart_repo import get_cart_index
 from ..repos.csv_repo import CSVRepository
 from ..repos.user_repo import UserRepo
 from ..core.errors import Forbidden, NotFound
 from ..core.security import is_admin_token
+from .deps import CATALOG_VERSION_HEADER, get_csv_repo
+from .responses import clean_nan_values
 from pathlib import Path
 import pandas as pd
-import math
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -14,37 +16,25 @@ def require_admin(authorization: str | None = Header(default=None)):
     if not is_admin_token(token):
         raise Forbidden("Admin role required")
 
-def get_csv_repo():
-    return CSVRepository()
-
-def clean_nan_values(data):
-    """Replace NaN values with None for JSON serialization"""
-    if isinstance(data, list):
-        return [clean_nan_values(item) for item in data]
-    elif isinstance(data, dict):
-        return {key: clean_nan_values(value) for key, value in data.items()}
-    elif isinstance(data, float) and math.isnan(data):
-        return None
-    return data
-
 @router.post("/items", status_code=201)
-def create_item(payload: dict, _=Depends(require_admin)):
-    repo = get_csv_repo()
-    return repo.add_product(payload)
+def create_item(payload: dict, response: Response, _=Depends(require_admin), repo: CSVRepository = Depends(get_csv_repo)):
+    result = repo.add_product(payload)
+    response.headers[CATALOG_VERSION_HEADER] = str(repo.version_id)
+    return result
 
 @router.patch("/items/{product_id}")
-def update_item(product_id: str, payload: dict, _=Depends(require_admin)):
-    repo = get_csv_repo()
+def update_item(product_id: str, payload: dict, response: Response, _=Depends(require_admin), repo: CSVRepository = Depends(get_csv_repo)):
     result = repo.update_product(product_id, payload)
     if not result:
         raise HTTPException(status_code=404, detail="Product not found")
+    response.headers[CATALOG_VERSION_HEADER] = str(repo.version_id)
     return result
 
 @router.delete("/items/{product_id}", status_code=204)
-def delete_item(product_id: str, _=Depends(require_admin)):
-    repo = get_csv_repo()
+def delete_item(product_id: str, response: Response, _=Depends(require_admin), repo: CSVRepository = Depends(get_csv_repo)):
     if not repo.delete_product(product_id):
         raise HTTPException(status_code=404, detail="Product not found")
+    response.headers[CATALOG_VERSION_HEADER] = str(repo.version_id)
     return None
 
 
@@ -131,32 +121,26 @@ def get_user_wishlist_stats(email: str):
 
 
 @router.get("/stats")
-def get_system_stats():
+def get_system_stats(repo: CSVRepository = Depends(get_csv_repo)):
     """Get comprehensive system statistics"""
     user_repo = UserRepo()
     
-    # Get product count from CSV
+    # Get product count from the shared catalog
     base_path = Path(__file__).parent.parent.parent
-    products_path = base_path / "data" / "amazon.csv"
-    cart_path = base_path / "data" / "cart.csv"
     wishlist_path = base_path / "data" / "wishlists.csv"
     
     try:
-        products_df = pd.read_csv(products_path)
+        products_df = repo.df
         product_count = len(products_df)
         categories = products_df['category'].nunique() if 'category' in products_df.columns else 0
     except:
         product_count = 0
         categories = 0
     
-    # Get cart statistics
-    try:
-        cart_df = pd.read_csv(cart_path)
-        total_cart_items = len(cart_df)
-        users_with_carts = cart_df['user_id'].nunique() if len(cart_df) > 0 else 0
-    except:
-        total_cart_items = 0
-        users_with_carts = 0
+    # Get cart statistics (cart.csv alone misses the cart journal)
+    cart_index = get_cart_index()
+    total_cart_items = len(cart_index)
+    users_with_carts = cart_index.users()
     
     # Get wishlist statistics
     try:
@@ -195,6 +179,15 @@ def get_recent_users():
     return {"recent_users": users}
 
 
+@router.get("/search-cache")
+def get_search_cache_stats(repo: CSVRepository = Depends(get_csv_repo)):
+    """Get hit/miss/eviction counters of the search result cache"""
+    cache = getattr(repo, 'search_cache', None)
+    if cache is None:
+        raise NotFound("The configured catalog backend has no search cache")
+    return {"search_cache": cache.stats()}
+
+
 @router.get("/health")
 def get_system_health():
     """Get system health status"""
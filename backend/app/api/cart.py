@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException, Header
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Header
 from app.services.cart_service import CartService
 from app.models.dto import CartItemAddRequest, CartItemResponse
+from app.repos.cart_repo import get_cart_index
+from app.repos.csv_repo import CSVRepository
+from app.api.deps import ProductFields, get_csv_repo
 
 router = APIRouter(prefix="/cart", tags=["Cart"])
 
@@ -25,20 +29,15 @@ def add_to_cart(product_id: str, x_user_id: str | None = Header(default=None), a
     return CartService.add_item(request)
 
 @router.get("")
-def get_cart(x_user_id: str | None = Header(default=None), authorization: str | None = Header(default=None)):
+def get_cart(x_user_id: str | None = Header(default=None), authorization: str | None = Header(default=None), fields: Optional[List[str]] = Depends(ProductFields("quantity")), repo: CSVRepository = Depends(get_csv_repo)):
     user_id = get_user_id(x_user_id, authorization)
-    return CartService.get_items(user_id)
+    return CartService.get_items(user_id, csv_repo=repo, fields=fields)
 
 @router.get("/{product_id}/check")
 def check_cart(product_id: str, x_user_id: str | None = Header(default=None), authorization: str | None = Header(default=None)):
     user_id = get_user_id(x_user_id, authorization)
-    items = CartService.get_items(user_id)
-    # Handle both dict and object responses
-    is_in_cart = any(
-        (item.product_id if hasattr(item, 'product_id') else item['product_id']) == product_id 
-        for item in items
-    )
-    return {"is_in_cart": is_in_cart}
+    # A membership test on the cart index; the catalog is not consulted
+    return {"is_in_cart": get_cart_index().quantity(user_id, product_id) > 0}
 
 @router.delete("/remove")
 def remove_from_cart(product_id: str, x_user_id: str | None = Header(default=None), authorization: str | None = Header(default=None)):
@@ -0,0 +1,51 @@
+from typing import List, Optional
+from fastapi import Depends, Query, Response
+from ..core.config import get_catalog_backend, get_catalog_db_path
+from ..core.errors import BadRequest
+from ..repos.csv_repo import CSVRepository, get_shared_repository, parse_fields
+from ..repos.sqlite_repo import get_shared_sqlite_repository
+
+# Response header naming the catalog version a request was answered from
+CATALOG_VERSION_HEADER = "X-Catalog-Version"
+
+
+def get_catalog_repository():
+    """The shared catalog repository of the configured backend (CATALOG_BACKEND)"""
+    if get_catalog_backend() == "sqlite":
+        return get_shared_sqlite_repository(get_catalog_db_path())
+    return get_shared_repository()
+
+
+def get_csv_repo(response: Response) -> CSVRepository:
+    """FastAPI dependency returning the process-wide catalog repository,
+    pinned to the catalog version that is current when the request starts.
+
+    The version id is sent back in the X-Catalog-Version header.
+    Override it with app.dependency_overrides[get_csv_repo] in tests.
+    """
+    repo = get_catalog_repository().pinned()
+    response.headers[CATALOG_VERSION_HEADER] = str(repo.version_id)
+    return repo
+
+
+class ProductFields:
+    """FastAPI dependency for the fields= projection of product responses.
+
+    Returns the requested field names (None when fields= is absent), after
+    checking them against the catalog's product columns plus the endpoint's
+    computed fields; unknown names are a 400.
+    """
+
+    def __init__(self, *computed: str):
+        self.computed = list(computed)
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated product fields to return, e.g. "
+                                                        "product_id,product_name,discounted_price"),
+        repo: CSVRepository = Depends(get_csv_repo)
+    ) -> Optional[List[str]]:
+        try:
+            return parse_fields(fields, repo.product_fields + self.computed)
+        except ValueError as e:
+            raise BadRequest(str(e))
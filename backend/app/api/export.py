@@ -4,6 +4,8 @@ from ..models.dto import ExportSelectionRequest
 from ..services.export_service import ExportService
 from ..core.errors import Forbidden
 from ..core.security import is_admin_token
+from ..repos.csv_repo import CSVRepository
+from .deps import get_csv_repo
 
 router = APIRouter(prefix="/export", tags=["export"])
 
@@ -13,8 +15,8 @@ def require_admin(authorization: str | None = Header(default=None)):
         raise Forbidden("Admin role required")
 
 @router.post("/selection")
-def export_selection(req: ExportSelectionRequest, _=Depends(require_admin)):
-    payload = ExportService().export_selection(req)
+def export_selection(req: ExportSelectionRequest, _=Depends(require_admin), repo: CSVRepository = Depends(get_csv_repo)):
+    payload = ExportService(repo=repo).export_selection(req)
     return JSONResponse(
         content=payload.model_dump(),
         headers={"Content-Disposition": "attachment; filename=selection.json"}
@@ -1,24 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query
-from ..repos.csv_repo import CSVRepository
-from ..services.items_recommendation_service import recommend_items_for_query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from ..repos.csv_repo import HIGHLIGHTED, SIMILARITY, CSVRepository, display_columns
+from ..repos.ranking import DEFAULT_RANKER, get_ranker
+from ..services.items_recommendation_service import (recommend_items_for_query, recommend_items_for_user,
+                                                      users_also_saved)
+from ..core.errors import BadRequest
+from .cart import get_user_id
+from .deps import ProductFields, get_csv_repo
+from .responses import FastJSONResponse
 import time
-import math
 
 router = APIRouter(prefix="/items", tags=["items"])
 
-def get_csv_repo():
-    return CSVRepository()
-
-def clean_nan_values(data):
-    """Replace NaN values with None for JSON serialization"""
-    if isinstance(data, list):
-        return [clean_nan_values(item) for item in data]
-    elif isinstance(data, dict):
-        return {key: clean_nan_values(value) for key, value in data.items()}
-    elif isinstance(data, float) and math.isnan(data):
-        return None
-    return data
-
 @router.get("/search")
 def search_products(
     q: str = None,
@@ -30,49 +23,65 @@ def search_products(
     min_discount: float = None,
     page: int = 1,
     size: int = 10,
-    compact: bool = False
+    compact: bool = False,
+    rank: str = Query(DEFAULT_RANKER, description="Ranking engine for text matches: relevance or bm25"),
+    cursor: str = Query(None, description="next_cursor from the previous page; takes precedence over page"),
+    fuzzy: bool = Query(False, description="Tolerate typos: match similarly spelled words in name and category"),
+    response: Response = None,
+    fields: Optional[List[str]] = Depends(ProductFields(HIGHLIGHTED)),
+    repo: CSVRepository = Depends(get_csv_repo)
 ):
-    repo = get_csv_repo()
+    try:
+        get_ranker(rank)
+    except ValueError as e:
+        raise BadRequest(str(e))
     offset = (page - 1) * size
     
     # Track search time for performance monitoring
     start_time = time.time()
     
-    # Get results with total count
-    products, total_results = repo.search_products(
-        query=q,
-        category=category,
-        min_rating=min_rating,
-        max_rating=max_rating,
-        min_price=min_price,
-        max_price=max_price,
-        min_discount=min_discount,
-        limit=size,
-        offset=offset,
-        return_total=True
-    )
+    # Get results with total count and the cursor of the next page
+    try:
+        products, total_results, next_cursor = repo.search_products(
+            query=q,
+            category=category,
+            min_rating=min_rating,
+            max_rating=max_rating,
+            min_price=min_price,
+            max_price=max_price,
+            min_discount=min_discount,
+            limit=size,
+            offset=offset,
+            return_total=True,
+            rank=rank,
+            cursor=cursor,
+            return_cursor=True,
+            fuzzy=fuzzy,
+            as_frame=True,
+            fields=display_columns(fields, q)
+        )
+    except ValueError as e:
+        raise BadRequest(str(e))
     
-    # Format products for display with highlighting
-    products = repo.format_for_display(products, query=q, compact=compact)
+    # Format products for display with highlighting (straight from the page's columns)
+    products = repo.format_for_display(products, query=q, compact=compact, fields=fields)
     
     search_time = round((time.time() - start_time) * 1000, 2)  # Convert to milliseconds
     
     # Calculate pagination metadata
     total_pages = (total_results + size - 1) // size  # Ceiling division
-    has_more = page < total_pages
-    
-    # Clean NaN values for JSON serialization
-    products = clean_nan_values(products)
+    has_more = next_cursor is not None if cursor else page < total_pages
     
     # Prepare response
-    response = {
+    body = {
         "products": products,
         "pagination": {
             "page": page,
             "size": size,
             "total_results": total_results,
             "total_pages": total_pages,
-            "has_more": has_more
+            "has_more": has_more,
+            "next_cursor": next_cursor
         },
         "filters_applied": {
             "search_query": q,
@@ -85,45 +94,154 @@ def search_products(
         },
         "meta": {
             "search_time_ms": search_time,
-            "results_on_page": len(products)
+            "results_on_page": len(products),
+            "rank": rank,
+            "fuzzy": fuzzy,
+            "catalog_version": repo.version_id
         }
     }
     
-    return response
+    # Catalog values are JSON-ready (missing values are None), so skip the generic encoder
+    return FastJSONResponse(body, response=response)
 
-@router.get("/{product_id}")
-def get_product_details(product_id: str):
-    repo = get_csv_repo()
-    product = repo.get_product_by_id(product_id)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    related = repo.get_related_products(product_id)
-    
-    # Clean NaN values for JSON serialization
-    product = clean_nan_values(product)
-    related = clean_nan_values(related)
-    
+@router.get("/facets")
+def get_search_facets(
+    q: str = None,
+    category: str = None,
+    min_rating: float = None,
+    max_rating: float = None,
+    min_price: float = None,
+    max_price: float = None,
+    min_discount: float = None,
+    repo: CSVRepository = Depends(get_csv_repo)
+):
+    """Counts per category, price band, rating and discount bucket for the same filters as /search"""
+    facets = repo.facet_counts(
+        query=q,
+        category=category,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        min_price=min_price,
+        max_price=max_price,
+        min_discount=min_discount
+    )
     return {
-        "product": product,
-        "related": related
+        "facets": facets,
+        "meta": {"catalog_version": repo.version_id}
     }
 
-@router.get("/categories/list")
-def get_categories():
-    repo = get_csv_repo()
-    return {"categories": repo.get_categories()}
+@router.get("/suggest")
+def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=10),
+    repo: CSVRepository = Depends(get_csv_repo)
+):
+    """Typeahead suggestions: product names and category terms weighted by rating_count"""
+    return {"prefix": prefix, "suggestions": repo.suggest(prefix, limit)}
 
 @router.get("/recommend")
 def recommend_items(
     query: str = Query(..., min_length=1, description="Search query for item recommendations"),
-    limit: int = Query(10, ge=1, le=50, description="Maximum number of recommendations to return")
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of recommendations to return"),
+    repo: CSVRepository = Depends(get_csv_repo)
 ):
-    items, total_found = recommend_items_for_query(query, limit)
-    cleaned_items = clean_nan_values(items)
+    items, total_found = recommend_items_for_query(query, limit, repo=repo)
     return {
-        "items": cleaned_items,
+        "items": items,
         "query": query,
         "total_found": total_found
     }
 
+@router.get("/recommend/for-me")
+def recommend_items_for_me(
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of recommendations to return"),
+    user_id: str = Depends(get_user_id),
+    response: Response = None,
+    fields: Optional[List[str]] = Depends(ProductFields("score")),
+    repo: CSVRepository = Depends(get_csv_repo)
+):
+    """Products saved by users who saved the same products as the caller (wishlist and cart)"""
+    items, based_on = recommend_items_for_user(user_id, limit, repo=repo, fields=fields)
+    return FastJSONResponse({
+        "items": items,
+        "based_on": based_on
+    }, response=response)
+
+@router.get("/similar")
+def similar_items(
+    text: str = Query(..., min_length=1, description="Description to find similar products for"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of products to return"),
+    response: Response = None,
+    fields: Optional[List[str]] = Depends(ProductFields(SIMILARITY)),
+    repo: CSVRepository = Depends(get_csv_repo)
+):
+    """Products whose name, category and description are most like the text (approximate)"""
+    return FastJSONResponse({
+        "items": repo.similar_to_text(text, limit, fields),
+        "text": text
+    }, response=response)
+
+@router.get("/{product_id}")
+def get_product_details(
+    product_id: str,
+    response: Response = None,
+    fields: Optional[List[str]] = Depends(ProductFields()),
+    repo: CSVRepository = Depends(get_csv_repo)
+):
+    product = repo.get_product_by_id(product_id, fields)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    related = repo.get_related_products(product_id, fields=fields)
+    also_saved = users_also_saved(product_id, repo=repo, fields=fields)
+    
+    return FastJSONResponse({
+        "product": product,
+        "related": related,
+        "also_saved": also_saved
+    }, response=response)
+
+@router.get("/{product_id}/similar")
+def similar_to_item(
+    product_id: str,
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of products to return"),
+    response: Response = None,
+    fields: Optional[List[str]] = Depends(ProductFields(SIMILARITY)),
+    repo: CSVRepository = Depends(get_csv_repo)
+):
+    """Products whose text is most like this product's (approximate)"""
+    items = repo.similar_to_product(product_id, limit, fields)
+    if items is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return FastJSONResponse({"items": items}, response=response)
+
+@router.get("/{product_id}/reviews")
+def get_product_reviews(
+    product_id: str,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    response: Response = None,
+    repo: CSVRepository = Depends(get_csv_repo)
+):
+    if repo.get_product_by_id(product_id) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    offset = (page - 1) * size
+    reviews, total_results = repo.get_reviews(product_id, limit=size, offset=offset)
+    total_pages = (total_results + size - 1) // size  # Ceiling division
+    
+    return FastJSONResponse({
+        "product_id": product_id,
+        "reviews": reviews,
+        "pagination": {
+            "page": page,
+            "size": size,
+            "total_results": total_results,
+            "total_pages": total_pages,
+            "has_more": page < total_pages
+        }
+    }, response=response)
+
+@router.get("/categories/list")
+def get_categories(repo: CSVRepository = Depends(get_csv_repo)):
+    return {"categories": repo.get_categories()}
@@ -0,0 +1,52 @@
+"""JSON responses that skip FastAPI's generic encoder.
+
+Catalog rows hold only None, str, int and float values (missing values are
+normalized to None when the catalog is loaded), so catalog responses can be
+rendered straight to bytes: with orjson when it is installed, else with the
+standard json module. Routes return a FastJSONResponse instead of a dict,
+which bypasses jsonable_encoder's walk over every value.
+"""
+import json
+import math
+from typing import Any
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def clean_nan_values(data):
+    """Replace NaN values with None for JSON serialization"""
+    if isinstance(data, list):
+        return [clean_nan_values(item) for item in data]
+    elif isinstance(data, dict):
+        return {key: clean_nan_values(value) for key, value in data.items()}
+    elif isinstance(data, float) and math.isnan(data):
+        return None
+    return data
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON for content; NaN becomes null"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+    except ValueError:
+        return json.dumps(clean_nan_values(content), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(Response):
+    """application/json response rendered by dumps()"""
+    media_type = "application/json"
+
+    def __init__(self, content: Any, status_code: int = 200, response: Response = None, **kwargs):
+        # Keep the headers that dependencies set on the request's response (e.g. X-Catalog-Version)
+        if response is not None:
+            kwargs['headers'] = {**response.headers, **(kwargs.get('headers') or {})}
+        super().__init__(content, status_code=status_code, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -6,3 +6,29 @@ def get_google_places_api_key() -> str:
         raise ValueError("GOOGLE_PLACES_API_KEY environment variable is not set")
     return key
 
+
+def get_catalog_backend() -> str:
+    """Catalog storage backend: "csv" (pandas, the default) or "sqlite" """
+    backend = os.getenv("CATALOG_BACKEND", "csv").strip().lower()
+    if backend not in ("csv", "sqlite"):
+        raise ValueError(f"CATALOG_BACKEND must be 'csv' or 'sqlite', not '{backend}'")
+    return backend
+
+def get_catalog_db_path() -> str | None:
+    """SQLite catalog database path (CATALOG_DB_PATH), None for data/amazon.db"""
+    return os.getenv("CATALOG_DB_PATH") or None
+
+
+def _keyword_list(name: str) -> list[str] | None:
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return [keyword.strip() for keyword in value.split(",") if keyword.strip()]
+
+def get_main_product_keywords() -> list[str] | None:
+    """Category segments that mark main products (MAIN_PRODUCT_KEYWORDS, comma-separated), None for the defaults"""
+    return _keyword_list("MAIN_PRODUCT_KEYWORDS")
+
+def get_accessory_keywords() -> list[str] | None:
+    """Category fragments that mark accessories (ACCESSORY_KEYWORDS, comma-separated), None for the defaults"""
+    return _keyword_list("ACCESSORY_KEYWORDS")
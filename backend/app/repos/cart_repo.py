@@ -1,58 +1,268 @@
-import os
+"""Shopping carts: an in-memory user -> {product_id: quantity} index.
+
+data/cart.csv holds one row per (user, product) with its quantity. Every add
+or removal changes the index in O(1) and appends one NDJSON line to a journal
+next to the CSV (data/cart.csv -> data/cart.journal.ndjson):
+
+    {"user_id": "3", "product_id": "B07...", "quantity": 2}
+
+Entries carry the new absolute quantity (0 = removed), so replaying a journal
+over a CSV that already holds some of it is harmless. Once the journal
+outgrows the cart itself (and COMPACT_AFTER entries), the write that notices
+only renames it to data/cart.compacting.journal.ndjson; a background thread
+folds that file into the CSV, read back from disk, while new writes start a
+fresh journal. Loading reads the CSV, then the compacting journal, then the
+journal.
+
+Older cart files may hold a row per click; loading sums their quantities.
+"""
 import csv
+import json
+import logging
+import os
+import threading
 from pathlib import Path
+from typing import Dict, List, Tuple
+from . import co_occurrence
+
+logger = logging.getLogger(__name__)
 
 # Get absolute path to backend/data/cart.csv
 BASE_DIR = Path(__file__).resolve().parent.parent.parent   # backend/
 DATA_DIR = BASE_DIR / "data"
 CART_FILE = DATA_DIR / "cart.csv"
 
+CART_COLUMNS = ["user_id", "product_id", "quantity"]
+JOURNAL_SUFFIX = '.journal.ndjson'
+COMPACTING_SUFFIX = '.compacting' + JOURNAL_SUFFIX
+# Journal entries to accumulate (at least) before they are folded into the CSV
+COMPACT_AFTER = 10_000
+
+
+def journal_path(csv_path) -> Path:
+    """Journal location for a cart CSV (data/cart.csv -> data/cart.journal.ndjson)"""
+    path = Path(csv_path)
+    return path.with_name(path.stem + JOURNAL_SUFFIX)
+
+
+def compacting_path(csv_path) -> Path:
+    """Where a journal waits to be folded into the cart CSV"""
+    path = Path(csv_path)
+    return path.with_name(path.stem + COMPACTING_SUFFIX)
+
+
+def _set(carts: Dict[str, Dict[str, int]], user_id: str, product_id: str, quantity: int):
+    """Set (or, at zero or below, drop) one cart line"""
+    if quantity > 0:
+        carts.setdefault(user_id, {})[product_id] = quantity
+    else:
+        items = carts.get(user_id)
+        if items is not None:
+            items.pop(product_id, None)
+            if not items:
+                del carts[user_id]
+
+
+def _read_csv(path: Path, carts: Dict[str, Dict[str, int]]):
+    """Add the CSV rows to carts, summing the quantities per (user, product)"""
+    try:
+        with open(path, "r", newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    quantity = int(row["quantity"])
+                except (TypeError, ValueError):
+                    continue
+                items = carts.get(row["user_id"], {})
+                _set(carts, row["user_id"], row["product_id"], items.get(row["product_id"], 0) + quantity)
+    except FileNotFoundError:
+        pass
+
+
+def _replay(path: Path, carts: Dict[str, Dict[str, int]]) -> int:
+    """Apply a journal to carts and return its entry count, dropping a torn
+    last line left by a crash mid-append"""
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return 0
+    entries = valid_bytes = 0
+    for line in content.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            break
+        _set(carts, entry['user_id'], entry['product_id'], entry['quantity'])
+        entries += 1
+        valid_bytes += len(line)
+    if valid_bytes < len(content):
+        logger.warning("Discarding %d bytes of incomplete journal tail in %s", len(content) - valid_bytes, path)
+        with open(path, 'r+b') as f:
+            f.truncate(valid_bytes)
+    return entries
+
+
+class CartIndex:
+    """The carts of one cart CSV, persisted through its journal"""
+
+    def __init__(self, csv_path, compact_after: int = COMPACT_AFTER):
+        self.csv_path = Path(csv_path)
+        self.journal_path = journal_path(csv_path)
+        self.compacting_path = compacting_path(csv_path)
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        self._folding = threading.Lock()  # one fold into the CSV at a time
+        self._compaction = None
+        self._journal = None
+        self._carts: Dict[str, Dict[str, int]] = {}
+        _read_csv(self.csv_path, self._carts)
+        _replay(self.compacting_path, self._carts)
+        self._journaled = _replay(self.journal_path, self._carts)
+        self._pairs = sum(len(items) for items in self._carts.values())
+        if self.compacting_path.exists():
+            # a compaction was interrupted: finish it before taking writes
+            self._fold()
+
+    # -- reads -------------------------------------------------------------
+
+    def items(self, user_id: str) -> Dict[str, int]:
+        """product_id -> quantity in a user's cart, in the order first added"""
+        return dict(self._carts.get(user_id, ()))
+
+    def quantity(self, user_id: str, product_id: str) -> int:
+        return self._carts.get(user_id, {}).get(product_id, 0)
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        """(user_id, product_id) of every cart line"""
+        with self._lock:
+            return [(user_id, product_id) for user_id, items in self._carts.items() for product_id in items]
+
+    def __len__(self) -> int:
+        """Number of (user, product) cart lines"""
+        return self._pairs
+
+    def users(self) -> int:
+        """Number of users with a non-empty cart"""
+        with self._lock:
+            return len(self._carts)
+
+    # -- writes ------------------------------------------------------------
+
+    def add(self, user_id: str, product_id: str, quantity: int = 1) -> int:
+        """Add quantity of a product to a user's cart and return the new quantity"""
+        with self._lock:
+            had = self.quantity(user_id, product_id)
+            quantity = max(had + quantity, 0)
+            _set(self._carts, user_id, product_id, quantity)
+            self._pairs += (quantity > 0) - (had > 0)
+            self._append(user_id, product_id, quantity)
+            return quantity
+
+    def remove(self, user_id: str, product_id: str) -> bool:
+        """Drop a product from a user's cart; False if it was not there"""
+        with self._lock:
+            if not self.quantity(user_id, product_id):
+                return False
+            _set(self._carts, user_id, product_id, 0)
+            self._pairs -= 1
+            self._append(user_id, product_id, 0)
+            return True
+
+    def _append(self, user_id: str, product_id: str, quantity: int):
+        """Journal the new quantity of one cart line (caller holds the lock)"""
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        entry = {'user_id': user_id, 'product_id': product_id, 'quantity': quantity}
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        self._journaled += 1
+        if self._journaled >= max(self.compact_after, self._pairs):
+            self._schedule_compaction()
+
+    def _schedule_compaction(self):
+        """Hand the journal to a background fold (caller holds the lock; one at a time)"""
+        if self._folding.locked() or self.compacting_path.exists():
+            return
+        self._rotate()
+        self._compaction = threading.Thread(target=self._fold, name='cart-compaction', daemon=True)
+        self._compaction.start()
+
+    def _rotate(self):
+        """Move the journal aside for folding; later writes start a new one (caller holds the lock)"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.journal_path.exists():
+            os.replace(self.journal_path, self.compacting_path)
+        self._journaled = 0
+
+    def compact(self) -> bool:
+        """Fold the journal into the CSV now; False if there was nothing to fold"""
+        with self._folding:
+            folded = self._fold_locked()  # a scheduled fold whose thread has not started yet
+            with self._lock:
+                if not self._journaled:
+                    return folded
+                self._rotate()
+            return self._fold_locked()
+
+    def _fold(self):
+        """Background fold of the compacting journal into the CSV"""
+        with self._folding:
+            self._fold_locked()
+
+    def _fold_locked(self) -> bool:
+        """Write the CSV with the compacting journal applied, then drop that
+        journal (caller holds _folding); False if there is none"""
+        if not self.compacting_path.exists():
+            return False
+        carts: Dict[str, Dict[str, int]] = {}
+        _read_csv(self.csv_path, carts)
+        _replay(self.compacting_path, carts)
+        tmp_path = self.csv_path.with_name(self.csv_path.name + '.tmp')
+        with open(tmp_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CART_COLUMNS)
+            for user_id, items in carts.items():
+                writer.writerows((user_id, product_id, quantity) for product_id, quantity in items.items())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.csv_path)
+        self.compacting_path.unlink()
+        return True
+
+
+_indexes: Dict[Path, CartIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_cart_index() -> CartIndex:
+    """The process-wide index over CART_FILE, loaded on first use"""
+    path = Path(CART_FILE)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = CartIndex(path)
+        return index
+
+
 class CartRepo:
 
     @staticmethod
     def add_item(user_id: str, product_id: str, quantity: int = 1):
-        # Ensure file exists and has header row
-        if not CART_FILE.exists():
-            with open(CART_FILE, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(["user_id", "product_id", "quantity"])
-
-        with open(CART_FILE, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([user_id, product_id, quantity])
+        get_cart_index().add(user_id, product_id, quantity)
+        co_occurrence.record(CART_FILE, user_id, product_id, held=True)
 
     @staticmethod
     def get_items(user_id: str):
-        if not CART_FILE.exists():
-            return []
-
-        items = []
-        with open(CART_FILE, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row["user_id"] == user_id:
-                    items.append({
-                        "user_id": row["user_id"],
-                        "product_id": row["product_id"],
-                        "quantity": int(row["quantity"])
-                    })
-        return items
+        return [
+            {"user_id": user_id, "product_id": product_id, "quantity": quantity}
+            for product_id, quantity in get_cart_index().items(user_id).items()
+        ]
 
     @staticmethod
     def remove_item(user_id: str, product_id: str):
-        if not CART_FILE.exists():
-            return
-
-        rows = []
-        with open(CART_FILE, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if not (row["user_id"] == user_id and row["product_id"] == product_id):
-                    rows.append(row)
-
-        # Rewrite file with header
-        with open(CART_FILE, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=["user_id", "product_id", "quantity"])
-            writer.writeheader()
-            writer.writerows(rows)
-
+        if get_cart_index().remove(user_id, product_id):
+            co_occurrence.record(CART_FILE, user_id, product_id, held=False)
@@ -0,0 +1,133 @@
+"""Append-only journal of admin catalog mutations.
+
+Rewriting amazon.csv on every add/update/delete makes each admin edit O(N).
+Instead the repository applies a mutation in memory and appends one NDJSON
+line to a journal next to the CSV (data/amazon.csv -> data/amazon.journal.ndjson):
+
+    {"seq": 12, "op": "update", "product_id": "B07...", "data": {"rating": 4.1}}
+
+Loading the catalog replays the journal on top of the CSV, so an edit that was
+acknowledged survives a crash. Compaction folds the journal back into the CSV
+and keeps only the entries written after the compacted state.
+
+The journal belongs to a single process: sequence numbers, compaction and
+truncation all work from that process's in-memory entries, so running several
+workers against one catalog is not supported (their edits would be lost).
+"""
+import json
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Iterator, List
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = '.journal.ndjson'
+OPERATIONS = ('add', 'update', 'delete')
+
+
+def journal_path(csv_path) -> Path:
+    """Journal location for a catalog CSV (data/amazon.csv -> data/amazon.journal.ndjson)"""
+    path = Path(csv_path)
+    return path.with_name(path.stem + JOURNAL_SUFFIX)
+
+
+def _plain(value):
+    """JSON-safe version of a catalog value (numpy scalars, NaN -> null)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class CatalogJournal:
+    """NDJSON write-ahead log with monotonically increasing sequence numbers"""
+
+    def __init__(self, csv_path):
+        self.path = journal_path(csv_path)
+        self._lock = threading.Lock()
+        self._entries = self._read()
+        self.last_seq = self._entries[-1]['seq'] if self._entries else 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _read(self) -> List[dict]:
+        """Parse the journal, dropping a torn last line left by a crash mid-append"""
+        if not self.path.exists():
+            return []
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        entries = []
+        valid_bytes = 0
+        for line in content.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            entries.append(entry)
+            valid_bytes += len(line)
+        if valid_bytes < len(content):
+            logger.warning("Discarding %d bytes of incomplete journal tail in %s",
+                           len(content) - valid_bytes, self.path)
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return entries
+
+    def entries(self) -> Iterator[dict]:
+        """Journal entries in sequence order"""
+        return iter(list(self._entries))
+
+    def append(self, op: str, product_id: str, data: dict = None) -> int:
+        """Durably append one mutation and return its sequence number"""
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown journal operation '{op}'")
+        with self._lock:
+            entry = {
+                'seq': self.last_seq + 1,
+                'op': op,
+                'product_id': _plain(product_id),
+                'data': {key: _plain(value) for key, value in (data or {}).items()},
+            }
+            line = json.dumps(entry, ensure_ascii=False) + '\n'
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._entries.append(entry)
+            self.last_seq = entry['seq']
+            return entry['seq']
+
+    def truncate_through(self, seq: int):
+        """Drop the entries up to and including seq (they are now in the base CSV).
+
+        The journal is rewritten from this process's entries; see the module
+        docstring on running a single worker.
+        """
+        with self._lock:
+            remaining = [entry for entry in self._entries if entry['seq'] > seq]
+            if not remaining:
+                if self.path.exists():
+                    self.path.unlink()
+            else:
+                tmp_path = self.path.with_name(self.path.name + '.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for entry in remaining:
+                        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            self._entries = remaining
+
+    def size_on_disk(self) -> int:
+        """Journal file size in bytes (0 if there is no journal)"""
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,112 @@
+"""Columnar binary sidecar for the catalog CSV.
+
+Parsing amazon.csv (long about_product/review text) is the slowest part of
+starting a worker. The first load writes an Arrow IPC (Feather v2) copy of the
+parsed frame next to the CSV; later loads read that instead. The snapshot
+records the CSV's size, mtime and sha256 so it is rebuilt automatically when
+the CSV changes. Without pyarrow installed everything falls back to the CSV.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = '.feather'
+_METADATA_KEY = b'catalog_source'
+
+
+def snapshot_path(csv_path) -> Path:
+    """Sidecar location for a catalog CSV (data/amazon.csv -> data/amazon.feather)"""
+    return Path(csv_path).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def _sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_info(csv_path, checksum: bool = True) -> dict:
+    """Size, mtime and (with checksum) sha256 of a CSV, as recorded in its sidecars"""
+    stat = os.stat(csv_path)
+    info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if checksum:
+        info['sha256'] = _sha256(csv_path)
+    return info
+
+
+def is_fresh(recorded: dict, csv_path) -> bool:
+    """Cheap size/mtime check first; fall back to the checksum when only mtime moved
+    (e.g. the file was touched or checked out again with identical content)."""
+    current = source_info(csv_path, checksum=False)
+    if recorded.get('size') != current['size']:
+        return False
+    if recorded.get('mtime_ns') == current['mtime_ns']:
+        return True
+    return recorded.get('sha256') == _sha256(csv_path)
+
+
+def read_snapshot(csv_path) -> Optional[pd.DataFrame]:
+    """Return the snapshotted frame if a fresh snapshot exists, else None"""
+    path = snapshot_path(csv_path)
+    if feather is None or not path.exists():
+        return None
+    try:
+        table = feather.read_table(path, memory_map=True)
+        recorded = json.loads((table.schema.metadata or {}).get(_METADATA_KEY, b'{}'))
+        if not is_fresh(recorded, csv_path):
+            return None
+        # Free Arrow buffers while converting so both copies do not coexist
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    except Exception as exc:
+        logger.warning("Ignoring unreadable catalog snapshot %s: %s", path, exc)
+        return None
+
+
+def write_snapshot(df: pd.DataFrame, csv_path, source: dict = None) -> bool:
+    """Write df as the snapshot of csv_path. Returns False if it could not be written.
+
+    source is the CSV's size/mtime/sha256 as of when df was read from it.
+    """
+    if feather is None:
+        return False
+    path = snapshot_path(csv_path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_METADATA_KEY] = json.dumps(source or source_info(csv_path)).encode()
+        feather.write_feather(table.replace_schema_metadata(metadata), tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as exc:
+        logger.warning("Could not write catalog snapshot %s: %s", path, exc)
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return False
+
+
+def load_catalog(csv_path) -> pd.DataFrame:
+    """Load the catalog, preferring a fresh snapshot and refreshing a stale one"""
+    df = read_snapshot(csv_path)
+    if df is not None:
+        return df
+    # Fingerprint before parsing so a concurrent edit can only make the snapshot stale
+    source = source_info(csv_path) if feather is not None else None
+    df = pd.read_csv(csv_path)
+    write_snapshot(df, csv_path, source)
+    return df
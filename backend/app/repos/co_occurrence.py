@@ -0,0 +1,160 @@
+"""Item-item co-occurrence of saved products (wishlists and carts).
+
+Two products co-occur once for every user who holds both, in a wishlist or
+a cart. The counts form a sparse symmetric matrix (product -> Counter of
+co-held products) that is built on first use, from wishlists.csv and the
+in-memory cart index, and then kept current by WishlistRepo and CartRepo, which report every save and
+removal through record().
+
+A product's neighbours are ranked by cosine similarity of the holder sets,
+co-count / sqrt(holders(a) * holders(b)), and the best NEIGHBOURS_K of each
+product are cached until a save touches one of its pairs.
+"""
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import pandas as pd
+
+NEIGHBOURS_K = 20
+
+
+class CoOccurrenceIndex:
+    """Co-occurrence counts over the user/product pairs of some CSV sources"""
+
+    def __init__(self, sources: Dict[str, Path], loaded: Dict[str, Iterable[Tuple[str, str]]] = None):
+        """loaded holds the (user_id, product_id) pairs of sources that are
+        already in memory; the other sources are read from their CSV"""
+        self.sources = {name: Path(path) for name, path in sources.items()}
+        loaded = loaded or {}
+        self._lock = threading.RLock()
+        # user -> product -> names of the sources holding it
+        self._holdings: Dict[str, Dict[str, Set[str]]] = {}
+        self._holders: Counter = Counter()
+        self._pairs: Dict[str, Counter] = {}
+        self._neighbours: Dict[str, List[Tuple[str, float]]] = {}
+        for name, path in self.sources.items():
+            pairs = loaded[name] if name in loaded else self._read(path)
+            for user_id, product_id in pairs:
+                self.hold(name, user_id, product_id)
+
+    @staticmethod
+    def _read(path: Path) -> List[Tuple[str, str]]:
+        """Distinct (user_id, product_id) pairs of a CSV file"""
+        try:
+            frame = pd.read_csv(path, usecols=['user_id', 'product_id'], dtype=str)
+        except (FileNotFoundError, pd.errors.EmptyDataError, ValueError):
+            return []
+        frame = frame.dropna().drop_duplicates()
+        return list(zip(frame['user_id'], frame['product_id']))
+
+    # -- maintenance -------------------------------------------------------
+
+    def hold(self, source: str, user_id, product_id: str):
+        """user_id holds product_id in source (no-op if it already did)"""
+        with self._lock:
+            items = self._holdings.setdefault(str(user_id), {})
+            holding = items.get(product_id)
+            if holding is None:
+                self._link(items, product_id, 1)
+                items[product_id] = holding = set()
+            holding.add(source)
+
+    def release(self, source: str, user_id, product_id: str):
+        """user_id no longer holds product_id in source"""
+        with self._lock:
+            items = self._holdings.get(str(user_id), {})
+            holding = items.get(product_id)
+            if holding is None or source not in holding:
+                return
+            holding.discard(source)
+            if not holding:
+                del items[product_id]
+                self._link(items, product_id, -1)
+
+    def _link(self, items: Dict[str, Set[str]], product_id: str, delta: int):
+        """Add delta to the pairs of product_id with the other items of a user"""
+        self._holders[product_id] += delta
+        if self._holders[product_id] <= 0:
+            del self._holders[product_id]
+        # holders(product_id) is in the denominator of every list it appears in
+        self._neighbours.pop(product_id, None)
+        for other in self._pairs.get(product_id, ()):
+            self._neighbours.pop(other, None)
+        for other in items:
+            if other == product_id:
+                continue
+            for a, b in ((product_id, other), (other, product_id)):
+                counts = self._pairs.setdefault(a, Counter())
+                counts[b] += delta
+                if counts[b] <= 0:
+                    del counts[b]
+            self._neighbours.pop(other, None)
+
+    # -- lookups -----------------------------------------------------------
+
+    def neighbours(self, product_id: str) -> List[Tuple[str, float]]:
+        """(product_id, similarity) of the NEIGHBOURS_K products most often held
+        with product_id, best first"""
+        with self._lock:
+            cached = self._neighbours.get(product_id)
+            if cached is None:
+                holders = self._holders.get(product_id, 0)
+                scored = [
+                    (other, count / math.sqrt(holders * self._holders[other]))
+                    for other, count in self._pairs.get(product_id, {}).items()
+                ]
+                scored.sort(key=lambda item: (-item[1], item[0]))
+                cached = self._neighbours[product_id] = scored[:NEIGHBOURS_K]
+            return cached
+
+    def user_items(self, user_id) -> List[str]:
+        """Products user_id holds in any source"""
+        with self._lock:
+            return list(self._holdings.get(str(user_id), {}))
+
+    def for_user(self, user_id, limit: int = 10) -> List[Tuple[str, float]]:
+        """(product_id, score) of products the user does not hold yet, scored by
+        the summed similarity to the products they do hold, best first"""
+        held = set(self.user_items(user_id))
+        scores: Counter = Counter()
+        for product_id in held:
+            for other, similarity in self.neighbours(product_id):
+                if other not in held:
+                    scores[other] += similarity
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+_shared: Optional[CoOccurrenceIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_co_occurrence_index() -> CoOccurrenceIndex:
+    """The process-wide index over data/wishlists.csv and data/cart.csv, built on first use"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            from .cart_repo import CART_FILE, get_cart_index
+            from .wishlist_repo import WISHLIST_FILE
+            # carts come from the in-memory index: cart.csv lacks its journal
+            _shared = CoOccurrenceIndex({'wishlist': WISHLIST_FILE, 'cart': CART_FILE},
+                                        loaded={'cart': get_cart_index().pairs()})
+        return _shared
+
+
+def record(path, user_id, product_id: str, held: bool):
+    """Report a save (held) or removal in the CSV at path to the shared index.
+
+    Before the index is built there is nothing to do: the build reads the
+    source, which already has the change. During a build this waits for it, as
+    the build may have read the source before the change. Files it is not
+    built from are ignored.
+    """
+    with _shared_lock:
+        index = _shared
+    if index is None:
+        return
+    for name, source in index.sources.items():
+        if source == Path(path):
+            (index.hold if held else index.release)(name, user_id, product_id)
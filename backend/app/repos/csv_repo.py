@@ -1,49 +1,750 @@
+import numpy as np
 import pandas as pd
 from typing import List, Optional
 from pathlib import Path
 import os
+import re
 import threading
+from ..core.errors import Conflict
+from .text_index import InvertedIndex, TEXT_FIELDS
+from .ranking import StaticFeatures, get_ranker, keyword_scores, top_k
+from .catalog_snapshot import load_catalog
+from .catalog_journal import CatalogJournal
+from .search_cache import SearchCache, search_key
+from .facets import FacetCache, FacetCodes
+from .predicates import INDEX_COST, REGEX_COST, Predicate, apply_predicates
+from .related_index import RelatedIndex
+from .similar_index import SimilarIndex
+from .suggest_index import MAX_SUGGESTIONS, SuggestIndex
+from .search_cursor import SearchCursor, decode_cursor, encode_cursor
+
+DEFAULT_CSV_PATH = Path(__file__).parent.parent.parent / "data" / "amazon.csv"
+
+# Display columns that are also needed as numbers for filtering/ranking.
+# The raw strings ("₹1,099", "64%") stay in self.df for responses; the parsed
+# values live in CSVRepository.numeric, aligned with self.df row positions.
+NUMERIC_COLUMNS = {
+    'discounted_price': np.float64,
+    'actual_price': np.float64,
+    'discount_percentage': np.float64,
+    'rating': np.float64,
+    'rating_count': np.int64,
+}
+
+# Columns the static ranking features are computed from
+FEATURE_COLUMNS = {'category', 'rating', 'rating_count'}
+
+# Columns the typeahead index is built from
+SUGGEST_COLUMNS = {'product_id', 'product_name', 'category', 'rating_count'}
+
+# Columns the related and similar products indexes are built from
+TEXT_VECTOR_COLUMNS = set(TEXT_FIELDS)
+
+# Fields of a product in list views (format_for_display), in response order
+DISPLAY_FIELDS = ['product_id', 'product_name', 'category', 'discounted_price', 'actual_price',
+                  'discount_percentage', 'rating', 'rating_count', 'img_link', 'product_link']
+# Fields checked for the query in highlighted_fields
+HIGHLIGHT_FIELDS = ['product_name', 'category', 'about_product']
+# Computed (non-catalog) field of search results
+HIGHLIGHTED = 'highlighted_fields'
+# Computed field of "more like this" results: cosine similarity to the query
+SIMILARITY = 'similarity'
+
+# Journal entries to accumulate before they are folded back into the CSV
+COMPACT_AFTER = 500
+# Ids generated by add_product: P followed by a zero-padded number
+GENERATED_ID = re.compile(r'P(\d+)')
+
+
+def parse_numeric(values: pd.Series, dtype=np.float64) -> np.ndarray:
+    """Strip currency/percent/thousands formatting and convert to a typed array.
+
+    Unparseable values become NaN (or 0 for integer columns).
+    """
+    if not pd.api.types.is_numeric_dtype(values) and \
+            pd.api.types.infer_dtype(values, skipna=True) not in ('integer', 'floating', 'mixed-integer-float'):
+        values = values.astype(str).str.replace(r'[₹,%]', '', regex=True).str.strip()
+    parsed = pd.to_numeric(values, errors='coerce')
+    if np.issubdtype(dtype, np.integer):
+        return parsed.fillna(0).to_numpy(dtype=dtype)
+    return parsed.to_numpy(dtype=dtype)
+
+
+def missing_as_none(frame: pd.DataFrame) -> pd.DataFrame:
+    """frame as object columns holding None for every missing value (NaN/NA),
+    so rows serialize to JSON as they are"""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None)
+
+
+def append_row(frame: pd.DataFrame, values: dict) -> pd.DataFrame:
+    """Copy of frame with values appended as a new row, keeping None for every
+    missing value (including the existing rows of columns new to frame)"""
+    new_columns = [column for column in values if column not in frame.columns]
+    if new_columns:
+        frame = frame.assign(**dict.fromkeys(new_columns))
+    row = missing_as_none(pd.DataFrame([values], columns=frame.columns))
+    return pd.concat([frame, row], ignore_index=True)
+
+
+def parse_fields(fields: Optional[str], available: List[str]) -> Optional[List[str]]:
+    """Field names of a comma-separated fields= value, in request order (None if
+    not given). Raises ValueError for names that are not in available."""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    if not names:
+        raise ValueError("fields must name at least one field")
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(available)})")
+    return names
+
+
+class FieldProjection:
+    """A parsed fields= projection over catalog rows plus, optionally, one
+    computed field the caller adds to each row (a cart quantity, a score).
+
+    read lists the catalog columns to fetch: the requested ones plus
+    product_id, which callers need to match rows back to their inputs.
+    """
+    
+    def __init__(self, fields: Optional[List[str]], computed: str = None):
+        self.computed = computed
+        self.catalog = None if fields is None else [field for field in fields if field != computed]
+        self.read = None if fields is None else list(dict.fromkeys(self.catalog + ['product_id']))
+        self.with_computed = computed is not None and (fields is None or computed in fields)
+    
+    def apply(self, product: dict, value=None) -> dict:
+        """product cut down to the requested fields, with the computed value if requested"""
+        if self.catalog is not None:
+            product = {field: product[field] for field in self.catalog}
+        if self.with_computed:
+            product[self.computed] = value
+        return product
+
+
+def display_columns(fields: Optional[List[str]], query: str = None) -> Optional[List[str]]:
+    """Catalog columns format_for_display reads to produce fields (None for all)"""
+    if fields is None:
+        return None
+    columns = [field for field in fields if field != HIGHLIGHTED]
+    if query and HIGHLIGHTED in fields:
+        columns += [field for field in HIGHLIGHT_FIELDS if field not in columns]
+    return columns
+
+
+def _format_frame(frame: pd.DataFrame, query: str = None, compact: bool = False,
+                  fields: List[str] = None) -> List[dict]:
+    """format_for_display for a frame of catalog rows: each output field is
+    read as one column list and the rows are zipped from those lists"""
+    size = len(frame)
+
+    def column(field):
+        return frame[field].tolist() if field in frame.columns else [None] * size
+
+    def highlighted():
+        if not query:
+            return [[] for _ in range(size)]
+        needle = query.lower()
+        hits = [[bool(value) and needle in str(value).lower() for value in column(field)]
+                for field in HIGHLIGHT_FIELDS]
+        return [[field for field, hit in zip(HIGHLIGHT_FIELDS, row) if hit] for row in zip(*hits)]
+
+    if fields is None:
+        fields = DISPLAY_FIELDS + ([HIGHLIGHTED] if query else []) + ([] if compact else ['about_product'])
+    values = [highlighted() if field == HIGHLIGHTED else column(field) for field in fields]
+    return [dict(zip(fields, row)) for row in zip(*values)]
+
+
+# Per-review columns of the Amazon dataset. The file repeats a product's row
+# once per review; the loader keeps one row per product in self.df and moves
+# these columns into the separate self.reviews table.
+REVIEW_COLUMNS = ['user_id', 'user_name', 'review_id', 'review_title', 'review_content']
+
+
+def split_reviews(raw: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Split the denormalized catalog into (products, reviews).
+
+    products has one row per product_id (its first row in the file) and no
+    review columns; reviews has product_id plus the review columns, one row
+    per file row that carries any review data.
+    """
+    review_columns = [col for col in REVIEW_COLUMNS if col in raw.columns]
+    if 'product_id' not in raw.columns or not review_columns:
+        reviews = pd.DataFrame(columns=['product_id'] + REVIEW_COLUMNS)
+    else:
+        reviews = raw[['product_id'] + review_columns].dropna(how='all', subset=review_columns)
+    if 'product_id' not in raw.columns:
+        return raw, reviews
+    products = raw.drop(columns=review_columns).drop_duplicates('product_id', keep='first')
+    return products, reviews.reset_index(drop=True)
+
+
+def catalog_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """The fields of a "more like this" projection that are product columns"""
+    return None if fields is None else [field for field in fields if field != SIMILARITY]
+
+
+def with_similarity(records: List[dict], similarities: np.ndarray, fields: List[str] = None) -> List[dict]:
+    """Add each record's similarity, unless the fields projection leaves it out"""
+    if fields is None or SIMILARITY in fields:
+        for record, similarity in zip(records, similarities.tolist()):
+            record[SIMILARITY] = round(similarity, 4)
+    return records
+
+
+class _SuggestRebuilder:
+    """Background typeahead rebuilds shared by the versions of one catalog.
+
+    One thread at a time builds the newest stale version it was asked for;
+    versions published while it runs are skipped in favour of the latest.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Optional['CatalogVersion'] = None
+        self._thread: Optional[threading.Thread] = None
+        self.built: tuple = (-1, None)  # (version id, index) of the last rebuild
+    
+    def request(self, version: 'CatalogVersion'):
+        """Rebuild version's index soon, unless a newer one is built or queued"""
+        with self._lock:
+            pending_id = self._pending.id if self._pending is not None else -1
+            if version.id <= max(self.built[0], pending_id):
+                return
+            self._pending = version
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='suggest-index-rebuild', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                version, self._pending = self._pending, None
+                if version is None:
+                    self._thread = None
+                    return
+            version._build_suggest_index()
+            with self._lock:
+                self.built = (version.id, version._suggest_index)
+
+
+class CatalogVersion:
+    """One immutable state of the catalog: the product and review tables plus
+    every structure derived from them.
+
+    A published version is never modified. Writers fork() the latest version,
+    edit the fork while holding the write lock, and publish it by swapping a
+    single reference, so a reader that picked up a version can use it for a
+    whole request without locking or copying.
+    """
+    
+    def __init__(self, df: pd.DataFrame, reviews: pd.DataFrame, columns: List[str], version_id: int = 1):
+        self.id = version_id
+        self.columns = columns
+        # Missing values are None from here on, in loaded and edited rows alike
+        self.df = missing_as_none(df)
+        self.reviews = missing_as_none(reviews)
+        self._build_indexes()
+    
+    def fork(self) -> 'CatalogVersion':
+        """Next version, sharing everything with this one until it is edited.
+
+        The edit methods below replace frames, arrays and index lists instead
+        of writing into them, so the top-level containers are all that is copied.
+        """
+        draft = object.__new__(CatalogVersion)
+        draft.__dict__.update(self.__dict__)
+        draft.id = self.id + 1
+        draft.numeric = dict(self.numeric)
+        draft.features = dict(self.features)
+        draft.id_index = dict(self.id_index)
+        draft.review_index = dict(self.review_index)
+        draft.text_index = self.text_index.fork()
+        draft._id_ranks = None
+        draft._facet_codes = None
+        draft._related_index = self._related_index.fork() if self._related_index is not None else None
+        draft._similar_index = self._similar_index.fork() if self._similar_index is not None else None
+        draft._similar_sidecar = None  # the saved vectors match the CSV rows only
+        # An edit to a name, category or rating count only marks the typeahead
+        # index stale; it keeps serving until the catalog's rebuilder (shared
+        # with this version) replaces it
+        return draft
+    
+    def _build_indexes(self):
+        """Rebuild every structure derived from self.df and self.reviews"""
+        self.df = self.df.reset_index(drop=True)
+        self._build_numeric()
+        self._feature_spec = StaticFeatures()
+        self.features = self._compute_features(self.df)
+        self._build_id_index()
+        self._build_review_index()
+        self.text_index = InvertedIndex(self.df)
+        self._id_ranks = None
+        self._facet_codes = None
+        self._related_index = None
+        self._similar_index = None
+        self._similar_sidecar = None
+        self._suggest_index = None
+        self._suggest_id = -1
+        self._suggest_stale = False
+        self._suggest_rebuilder = _SuggestRebuilder()
+    
+    @property
+    def id_ranks(self) -> np.ndarray:
+        """Rank of each row's product_id in sorted id order (the final search tie-break)"""
+        if self._id_ranks is None:
+            ids = self.df['product_id'].astype(str).to_numpy() if 'product_id' in self.df.columns \
+                else np.zeros(len(self.df), dtype=str)
+            ranks = np.empty(len(ids), dtype=np.int64)
+            ranks[np.argsort(ids, kind='stable')] = np.arange(len(ids))
+            self._id_ranks = ranks
+        return self._id_ranks
+    
+    @property
+    def facet_codes(self) -> FacetCodes:
+        """Category and bucket codes of every row, for facet counts"""
+        if self._facet_codes is None:
+            categories = self.df['category'] if 'category' in self.df.columns \
+                else pd.Series([None] * len(self.df), dtype=object)
+            self._facet_codes = FacetCodes(categories, self.numeric['discounted_price'],
+                                           self.numeric['rating'], self.numeric['discount_percentage'])
+        return self._facet_codes
+    
+    @property
+    def related_index(self) -> RelatedIndex:
+        """Precomputed related products of every row (built on first use)"""
+        if self._related_index is None:
+            categories = self.df['category'] if 'category' in self.df.columns \
+                else pd.Series([None] * len(self.df), dtype=object)
+            self._related_index = RelatedIndex(self.text_index, categories, self.numeric['rating_count'])
+        return self._related_index
+    
+    @property
+    def similar_index(self) -> SimilarIndex:
+        """Text vectors and LSH tables for "more like this" search (loaded or
+        built on first use, see _reload)"""
+        if self._similar_index is None:
+            sidecar, self._similar_sidecar = self._similar_sidecar, None
+            product_ids = self.df['product_id'].tolist() if 'product_id' in self.df.columns else []
+            index = SimilarIndex.load(sidecar, product_ids) if sidecar is not None else None
+            if index is None:
+                index = SimilarIndex.build(self.text_index)
+                if sidecar is not None:
+                    index.save(sidecar, product_ids)
+            self._similar_index = index
+        return self._similar_index
+    
+    @property
+    def suggest_index(self) -> SuggestIndex:
+        """Typeahead index over product names and category terms (possibly
+        from an earlier version while a rebuild runs, see fork())"""
+        if self._suggest_index is None:
+            self._build_suggest_index()
+        if self._suggest_stale:
+            built_id, built = self._suggest_rebuilder.built
+            if self._suggest_id < built_id <= self.id:
+                self._suggest_index, self._suggest_id = built, built_id
+            self._suggest_rebuilder.request(self)
+        return self._suggest_index
+    
+    def fresh_suggest_index(self) -> SuggestIndex:
+        """The typeahead index of exactly this version, built here if it is stale"""
+        if self._suggest_index is None or self._suggest_stale:
+            self._build_suggest_index()
+        return self._suggest_index
+    
+    def _build_suggest_index(self):
+        index = SuggestIndex(self.df, self.numeric['rating_count'])
+        self._suggest_index, self._suggest_id, self._suggest_stale = index, self.id, False
+    
+    def _build_review_index(self):
+        """Map product_id -> positions in self.reviews, in file order"""
+        groups = self.reviews.groupby('product_id', sort=False).indices
+        self.review_index = {pid: positions.tolist() for pid, positions in groups.items()}
+    
+    def _build_id_index(self):
+        """Map product_id -> row positions. The dataset repeats some ASINs,
+        so each id keeps all of its positions in file order."""
+        if 'product_id' not in self.df.columns:
+            self.id_index = {}
+            return
+        groups = self.df.groupby('product_id', sort=False).indices
+        self.id_index = {pid: positions.tolist() for pid, positions in groups.items()}
+    
+    def positions_for(self, product_id: str) -> List[int]:
+        """Row positions holding product_id (empty if unknown)"""
+        return self.id_index.get(product_id, [])
+    
+    def next_product_id(self) -> str:
+        """An unused generated id: one past the highest numeric P-suffix in the catalog"""
+        suffixes = (GENERATED_ID.fullmatch(str(product_id)) for product_id in self.id_index)
+        highest = max((int(match.group(1)) for match in suffixes if match), default=0)
+        return f"P{highest + 1:08d}"
+    
+    def _build_numeric(self):
+        """Parse the numeric display columns once into typed arrays"""
+        self.numeric = {}
+        for column, dtype in NUMERIC_COLUMNS.items():
+            if column in self.df.columns:
+                self.numeric[column] = parse_numeric(self.df[column], dtype)
+            else:
+                missing = 0 if np.issubdtype(dtype, np.integer) else np.nan
+                self.numeric[column] = np.full(len(self.df), missing, dtype=dtype)
+    
+    def _append_numeric_row(self, position: int):
+        """Parse the numeric columns of a row appended at position"""
+        row = self.df.iloc[[position]]
+        for column, dtype in NUMERIC_COLUMNS.items():
+            if column in self.df.columns:
+                value = parse_numeric(row[column], dtype)
+            else:
+                value = np.full(1, 0 if np.issubdtype(dtype, np.integer) else np.nan, dtype=dtype)
+            self.numeric[column] = np.concatenate((self.numeric[column], value))
+    
+    def _update_numeric_row(self, position: int, columns):
+        """Re-parse the given numeric columns of a single edited row"""
+        row = self.df.iloc[[position]]
+        for column in columns:
+            if column in NUMERIC_COLUMNS and column in self.df.columns:
+                values = self.numeric[column].copy()
+                values[position] = parse_numeric(row[column], NUMERIC_COLUMNS[column])[0]
+                self.numeric[column] = values
+    
+    def _compute_features(self, frame: pd.DataFrame) -> dict:
+        """Static ranking features of the rows of frame (a slice of self.df)"""
+        categories = frame['category'] if 'category' in frame.columns else pd.Series(index=frame.index, dtype=object)
+        rows = frame.index.to_numpy()
+        return self._feature_spec.compute(categories, self.numeric['rating'][rows], self.numeric['rating_count'][rows])
+    
+    def _append_feature_row(self, position: int):
+        """Compute the static features of a row appended at position"""
+        row = self._compute_features(self.df.iloc[[position]])
+        for name, values in row.items():
+            self.features[name] = np.concatenate((self.features[name], values))
+    
+    def _update_feature_row(self, position: int):
+        """Recompute the static features of a single edited row"""
+        row = self._compute_features(self.df.iloc[[position]])
+        for name, values in row.items():
+            updated = self.features[name].copy()
+            updated[position] = values[0]
+            self.features[name] = updated
+    
+    def rows(self, positions, fields: List[str] = None) -> pd.DataFrame | pd.Series:
+        """self.df.iloc[positions], restricted to the fields columns (all when None)"""
+        if fields is None:
+            return self.df.iloc[positions]
+        return self.df.iloc[positions, self.df.columns.get_indexer(fields)]
+    
+    def numeric_for(self, frame: pd.DataFrame, column: str) -> np.ndarray:
+        """Numeric values of column for the rows of frame (a view/filter of self.df)"""
+        return self.numeric[column][frame.index.to_numpy()]
+    
+    def denormalized(self) -> pd.DataFrame:
+        """Rebuild the file layout: one row per review, product columns repeated"""
+        if self.reviews.empty and not any(col in self.columns for col in REVIEW_COLUMNS):
+            return self.df
+        merged = self.df.merge(self.reviews, on='product_id', how='left')
+        columns = [col for col in self.columns if col in merged.columns]
+        columns += [col for col in merged.columns if col not in columns]
+        return merged[columns]
+    
+    # -- edits (only on an unpublished fork) --------------------------------
+    
+    def add(self, product_data: dict):
+        """Append a product (and its review fields)"""
+        self.add_review(product_data['product_id'], product_data)
+        
+        # Review fields go to the review table, the rest to the product table
+        product_row = {key: value for key, value in product_data.items() if key not in REVIEW_COLUMNS}
+        self.df = append_row(self.df, product_row)
+        position = len(self.df) - 1
+        self._append_numeric_row(position)
+        self._append_feature_row(position)
+        product_id = product_data['product_id']
+        self.id_index[product_id] = self.positions_for(product_id) + [position]
+        self.text_index.add_row(position, product_data, self.df)
+        if self._related_index is not None:
+            self._related_index.set_row(position, product_row)
+        if self._similar_index is not None:
+            self._similar_index.set_row(position, product_row)
+        self._suggest_stale = True
+    
+    def add_review(self, product_id: str, product_data: dict, skip_existing: bool = False):
+        """Append the review fields of product_data, if any, to the review table"""
+        review_data = {key: product_data[key] for key in REVIEW_COLUMNS if product_data.get(key) is not None}
+        if not review_data:
+            return
+        positions = self.review_index.get(product_id, [])
+        if skip_existing and positions:
+            existing = self.reviews.iloc[positions][list(review_data)]
+            if (existing == pd.Series(review_data)).all(axis=1).any():
+                return
+        self.reviews = append_row(self.reviews, {'product_id': product_id, **review_data})
+        self.review_index[product_id] = positions + [len(self.reviews) - 1]
+    
+    def update(self, product_id: str, update_data: dict) -> Optional[int]:
+        """Set the given fields on a product; returns its position (None if unknown)"""
+        positions = self.positions_for(product_id)
+        if not positions:
+            return None
+        position = positions[0]
+        old_text = {field: self.df.at[position, field] for field in TEXT_FIELDS if field in self.df.columns}
+        
+        # Update only provided fields. Each edited column is copied and swapped
+        # into a shallow copy of the frame, so the published frame is untouched.
+        changed = [key for key, value in update_data.items() if value is not None and key in self.df.columns]
+        self.df = self.df.copy(deep=False)
+        for key in changed:
+            column = self.df[key].copy()
+            column.iat[position] = update_data[key]
+            self.df[key] = column
+        
+        self._update_numeric_row(position, changed)
+        if FEATURE_COLUMNS.intersection(changed):
+            self._update_feature_row(position)
+        self.text_index.remove_row(position, old_text)
+        self.text_index.add_row(position, self.df.iloc[position].to_dict(), self.df)
+        if self.df.at[position, 'product_id'] != product_id:
+            self._build_id_index()
+        if TEXT_VECTOR_COLUMNS.intersection(changed):
+            row = self.df.iloc[position].to_dict()
+            for index in (self._related_index, self._similar_index):
+                if index is not None:
+                    index.set_row(position, row)
+        if SUGGEST_COLUMNS.intersection(changed):
+            self._suggest_stale = True
+        return position
+    
+    def delete(self, product_id: str) -> bool:
+        """Remove a product and its reviews; False if it is unknown"""
+        positions = self.positions_for(product_id)
+        if not positions:
+            return False
+        
+        # Row positions shift after a delete, so rebuild the derived structures
+        # (the related and similar indexes are cheaper to shift than to rebuild)
+        self.df = self.df[self.df['product_id'] != product_id]
+        self.reviews = self.reviews[self.reviews['product_id'] != product_id].reset_index(drop=True)
+        suggest_index, related_index, similar_index = self._suggest_index, self._related_index, self._similar_index
+        suggest_id, suggest_rebuilder = self._suggest_id, self._suggest_rebuilder
+        self._build_indexes()
+        self._suggest_index, self._suggest_stale = suggest_index, suggest_index is not None
+        self._suggest_id, self._suggest_rebuilder = suggest_id, suggest_rebuilder
+        for index in (related_index, similar_index):
+            if index is not None:
+                for position in sorted(positions, reverse=True):
+                    index.remove_row(position)
+        self._related_index, self._similar_index = related_index, similar_index
+        return True
+
+
+class _LiveCatalog:
+    """State shared by a repository and the views pinned from it"""
+    
+    def __init__(self):
+        self.latest: Optional[CatalogVersion] = None
+        self.journal: Optional[CatalogJournal] = None
+        self.signature: Optional[tuple] = None
+        self.compaction: Optional[threading.Thread] = None
+
 
 class CSVRepository:
-    _lock = threading.Lock()  # Thread-safe file operations
+    _lock = threading.RLock()  # Serializes writers (re-entrant: writers may compact); readers never lock
     
-    def __init__(self, csv_path: str = None):
+    def __init__(self, csv_path: str = None, compact_after: int = COMPACT_AFTER,
+                 search_cache: SearchCache = None):
         if csv_path is None:
-            base_path = Path(__file__).parent.parent.parent
-            csv_path = base_path / "data" / "amazon.csv"
+            csv_path = DEFAULT_CSV_PATH
         self.csv_path = csv_path
+        self.compact_after = compact_after
+        self.search_cache = search_cache if search_cache is not None else SearchCache()
+        self.facet_cache = FacetCache()
+        self._live = _LiveCatalog()
+        self._pinned: Optional[CatalogVersion] = None
         self._reload()
     
+    @property
+    def version(self) -> CatalogVersion:
+        """Catalog version reads are answered from: the pinned one, else the latest"""
+        return self._pinned or self._live.latest
+    
+    @property
+    def version_id(self) -> int:
+        """Id of the catalog version reads are answered from"""
+        return self.version.id
+    
+    def pinned(self) -> 'CSVRepository':
+        """View of this repository that reads one version for its whole lifetime.
+
+        Routers get a pinned view per request, so every read in a request sees
+        the same catalog while admin writes publish newer versions. Writes made
+        through the view go to the shared catalog and the view moves to them.
+        """
+        view = object.__new__(CSVRepository)
+        view.__dict__.update(self.__dict__)
+        view._pinned = self._live.latest
+        return view
+    
+    # Read access to the current version's tables and indexes
+    df = property(lambda self: self.version.df)
+    reviews = property(lambda self: self.version.reviews)
+    numeric = property(lambda self: self.version.numeric)
+    text_index = property(lambda self: self.version.text_index)
+    
+    @property
+    def product_fields(self) -> List[str]:
+        """Columns of the product table (what fields= projections may name)"""
+        return list(self.version.df.columns)
+    
+    def _positions_for(self, product_id: str) -> List[int]:
+        """Row positions holding product_id (empty if unknown)"""
+        return self.version.positions_for(product_id)
+    
+    def _file_signature(self) -> Optional[tuple]:
+        """(mtime_ns, size) of the backing CSV plus the journal size, or None if the CSV is missing"""
+        try:
+            stat = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, self._live.journal.size_on_disk())
+    
     def _reload(self):
-        """Reload data from CSV file"""
-        self.df = pd.read_csv(self.csv_path)
+        """Reload data from CSV file (via its binary snapshot when fresh) and replay the journal"""
+        raw = load_catalog(self.csv_path)
+        products, reviews = split_reviews(raw)
+        previous = self._live.latest
+        version = CatalogVersion(products, reviews, list(raw.columns),
+                                 version_id=previous.id + 1 if previous else 1)
+        # The typeahead, related and similar indexes are built on first use,
+        # so a (re)load only pays for the catalog itself. The base version
+        # reads its similar-products vectors from the file saved next to the
+        # CSV while it is fresh, and saves them after a build otherwise.
+        version._similar_sidecar = self.csv_path
+        self._live.journal = CatalogJournal(self.csv_path)
+        self._live.latest = self._replay(version)
+        self._live.signature = self._file_signature()
+    
+    def _replay(self, version: CatalogVersion) -> CatalogVersion:
+        """Re-apply journaled mutations on top of the base CSV.
+
+        Replay must be idempotent: a crash between compaction replacing the CSV
+        and trimming the journal leaves entries that are already in the CSV.
+        An add for an id that already exists therefore keeps the existing row
+        (as loading keeps the first row of a duplicated id) and only adds
+        reviews that are not there yet; updates and deletes are naturally safe
+        to repeat.
+        """
+        if not len(self._live.journal):
+            return version
+        draft = version.fork()
+        for entry in self._live.journal.entries():
+            op, product_id, data = entry['op'], entry['product_id'], entry['data']
+            if op == 'add':
+                if draft.positions_for(product_id):
+                    draft.add_review(product_id, data, skip_existing=True)
+                else:
+                    draft.add(data)
+            elif op == 'update':
+                draft.update(product_id, data)
+            elif op == 'delete':
+                draft.delete(product_id)
+        return draft
+    
+    def _commit(self, draft: CatalogVersion, op: str, product_id: str, data: dict = None):
+        """Journal a mutation made on draft, then publish draft as the latest version"""
+        self._live.journal.append(op, product_id, data)
+        self._live.latest = draft
+        if self._pinned is not None:
+            self._pinned = draft
+        # Our own write must not look like an external change
+        self._live.signature = self._file_signature()
+        if len(self._live.journal) >= self.compact_after:
+            self._schedule_compaction()
+    
+    def _schedule_compaction(self):
+        """Fold the journal into the CSV on a background thread (one at a time)"""
+        compaction = self._live.compaction
+        if compaction is not None and compaction.is_alive():
+            return
+        self._live.compaction = threading.Thread(target=self.compact, name='catalog-compaction', daemon=True)
+        self._live.compaction.start()
+    
+    def compact(self) -> bool:
+        """Write the latest catalog version to the CSV and trim the journal.
+
+        The CSV is written to a temporary file without holding the lock, so
+        admin writes keep landing in the journal meanwhile; only entries up to
+        the compacted sequence number are dropped. Returns False if there was
+        nothing to compact.
+        """
+        with self._lock:
+            journal = self._live.journal
+            if not len(journal):
+                return False
+            # Published versions are immutable, so it can be written unlocked
+            version = self._live.latest
+            seq = journal.last_seq
+        
+        tmp_path = f"{self.csv_path}.tmp"
+        version.denormalized().to_csv(tmp_path, index=False)
+        with self._lock:
+            os.replace(tmp_path, self.csv_path)
+            journal.truncate_through(seq)
+            self._live.signature = self._file_signature()
+        return True
+    
+    def is_stale(self) -> bool:
+        """True if the CSV was changed on disk by someone other than this repository"""
+        return self._file_signature() != self._live.signature
     
-    def _save(self):
-        """Save data to CSV file"""
+    def refresh_if_stale(self) -> bool:
+        """Reload the catalog if the file changed on disk. Returns True if it reloaded."""
+        if not self.is_stale():
+            return False
         with self._lock:
-            self.df.to_csv(self.csv_path, index=False)
+            if not self.is_stale():
+                return False
+            self._reload()
+            return True
     
     def get_all_products(self, limit: int = 100, offset: int = 0) -> List[dict]:
         """Get all products with pagination"""
-        return self.df.iloc[offset:offset+limit].to_dict('records')
+        return self.version.df.iloc[offset:offset+limit].to_dict('records')
     
-    def get_product_by_id(self, product_id: str) -> Optional[dict]:
-        """Get a single product by ID"""
-        result = self.df[self.df['product_id'] == product_id]
-        if result.empty:
+    def get_product_by_id(self, product_id: str, fields: List[str] = None) -> Optional[dict]:
+        """Get a single product by ID (only the given fields, if any)"""
+        version = self.version
+        positions = version.positions_for(product_id)
+        if not positions:
             return None
-        return result.iloc[0].to_dict()
+        return version.rows(positions[0], fields).to_dict()
     
-    def get_products_by_ids(self, product_ids: List[str]) -> List[dict]:
-        """Get multiple products by their IDs"""
+    def get_products_by_ids(self, product_ids: List[str], fields: List[str] = None) -> List[dict]:
+        """Get multiple products by their IDs (only the given fields, if any)"""
         if not product_ids:
             return []
-        result = self.df[self.df['product_id'].isin(product_ids)]
-        return result.to_dict('records')
+        version = self.version
+        # Gather positions from the index and keep catalog order, like isin() did
+        positions = sorted(
+            position
+            for product_id in set(product_ids)
+            for position in version.positions_for(product_id)
+        )
+        return version.rows(positions, fields).to_dict('records')
+    
+    def get_reviews(self, product_id: str, limit: int = 10, offset: int = 0) -> tuple[List[dict], int]:
+        """Get one page of a product's reviews and the product's total review count"""
+        version = self.version
+        positions = version.review_index.get(product_id, [])
+        page = version.reviews.iloc[positions[offset:offset+limit]]
+        return page.to_dict('records'), len(positions)
     
-    def search_products(self, 
-                       query: str = None, 
-                       category: str = None, 
+    def search_products(self,
+                       query: str = None,
+                       category: str = None,
                        min_rating: float = None,
                        max_rating: float = None,
                        min_price: float = None,
@@ -51,126 +752,238 @@ class CSVRepository:
                        min_discount: float = None,
                        limit: int = 100,
                        offset: int = 0,
-                       return_total: bool = False) -> List[dict] | tuple[List[dict], int]:
+                       return_total: bool = False,
+                       rank: str = None,
+                       cursor: str = None,
+                       return_cursor: bool = False,
+                       fuzzy: bool = False,
+                       as_frame: bool = False,
+                       fields: List[str] = None) -> List[dict] | pd.DataFrame | tuple:
         """Search products with filters - searches across name, description, and category
         
+        Text matches are ordered by relevance, then rating, then product_id.
+        
         Args:
             return_total: If True, returns (results, total_count) tuple
+            rank: Ranker used to order text matches ('relevance' or 'bm25', see ranking.RANKERS)
+            cursor: next_cursor of the previous page; replaces offset (raises ValueError if invalid)
+            return_cursor: If True, also returns the cursor of the next page (None on the last page)
+            fuzzy: If True, match query words to similarly spelled words of the name and category
+                (trigram similarity, see InvertedIndex.fuzzy_scores) and rank by similarity instead
+            as_frame: If True, returns the page as a DataFrame instead of a list of dicts
+            fields: If given, only these catalog columns are returned
         """
-        filtered_df = self.df.copy()
+        version = self.version
+        ranker_name = get_ranker(rank).name if query else None
+        key = search_key(query, category, min_rating, max_rating, min_price, max_price, min_discount,
+                         ranker_name, fuzzy)
         
-        # Enhanced text search across multiple fields
-        if query:
-            import re
-            
-            # Search in product name, description (about_product), and category
-            name_match = filtered_df['product_name'].str.contains(query, case=False, na=False)
-            desc_match = filtered_df['about_product'].str.contains(query, case=False, na=False)
-            cat_match = filtered_df['category'].str.contains(query, case=False, na=False)
-            
-            # Check for exact word matches (e.g., "TV" as a whole word, not just "TV" in "Television")
-            word_boundary_pattern = r'\b' + re.escape(query) + r'\b'
-            name_exact_word = filtered_df['product_name'].str.contains(word_boundary_pattern, case=False, na=False, regex=True)
-            cat_exact_word = filtered_df['category'].str.contains(word_boundary_pattern, case=False, na=False, regex=True)
-            
-            # Combine matches with OR logic - product matches if found in any field
-            filtered_df = filtered_df[name_match | desc_match | cat_match]
-            
-            # Only add relevance scoring if we have matches
-            if len(filtered_df) > 0:
-                # Filter the boolean series to match the filtered dataframe indices
-                filtered_name_exact = name_exact_word[filtered_df.index]
-                filtered_name_match = name_match[filtered_df.index]
-                filtered_cat_exact = cat_exact_word[filtered_df.index]
-                filtered_cat_match = cat_match[filtered_df.index]
-                filtered_desc_match = desc_match[filtered_df.index]
-                
-                # Detect if it's a main product category (Laptops, Smartphones, Tablets, etc) vs accessories
-                # Check if category contains main product keywords
-                main_product_keywords = r'\|(Laptops|Smartphones|Tablets|Televisions|Cameras|Monitors|Desktops|SmartWatches)\|'
-                is_main_product = filtered_df['category'].str.contains(main_product_keywords, case=False, na=False, regex=True)
-                
-                # Detect accessory subcategories
-                accessory_subcategories = r'LaptopAccessories|MobileAccessories|Chargers|Cables|Bags|Sleeves|Covers|Cases|Stands|Mounts|Adapters'
-                is_accessory = filtered_df['category'].str.contains(accessory_subcategories, case=False, na=False, regex=True)
-                
-                # Boost main products over accessories
-                product_boost = (is_main_product & ~is_accessory).astype(int) * 5  # +5 points for main products
-                
-                # Add relevance score for ranking (higher score = better match)
-                # Prioritize exact word matches over partial matches
-                filtered_df['relevance_score'] = (
-                    filtered_name_exact.astype(int) * 10 +  # Exact word in name is most important
-                    filtered_name_match.astype(int) * 3 +   # Any name match is important
-                    filtered_cat_exact.astype(int) * 5 +    # Exact word in category
-                    filtered_cat_match.astype(int) * 2 +    # Category matches are moderately important
-                    filtered_desc_match.astype(int) * 1 +   # Description matches are less important
-                    product_boost                           # Boost actual products over accessories
-                )
-                
-                # Sort by relevance score (highest first), then by rating
-                filtered_df = filtered_df.sort_values(['relevance_score', 'rating'], ascending=[False, False])
+        # Paging through a result set slices the cached ranking of the whole set
+        cached = self.search_cache.get(version.id, key)
+        if cached is None:
+            cached = self._ranked_positions(version, query, category, min_rating, max_rating,
+                                            min_price, max_price, min_discount, rank, offset + limit, fuzzy)
+            self.search_cache.put(version.id, key, *cached)
+        positions, scores, ranked = cached
         
-        # Filter by category (exact or partial match)
-        if category:
-            filtered_df = filtered_df[
-                filtered_df['category'].str.contains(category, case=False, na=False)
-            ]
+        # Get total count before pagination
+        total_count = len(positions)
         
-        # Filter by minimum rating
-        if min_rating is not None:
-            # Convert rating to float for comparison
-            filtered_df['rating_float'] = pd.to_numeric(filtered_df['rating'], errors='coerce')
-            filtered_df = filtered_df[filtered_df['rating_float'] >= min_rating]
+        if cursor:
+            offset = self._resume_index(version, positions, scores, decode_cursor(cursor, key))
         
-        # Filter by maximum rating
-        if max_rating is not None:
-            if 'rating_float' not in filtered_df.columns:
-                filtered_df['rating_float'] = pd.to_numeric(filtered_df['rating'], errors='coerce')
-            filtered_df = filtered_df[filtered_df['rating_float'] <= max_rating]
+        # Only the head of the result set is in order; deeper pages order more of it
+        if ranked < min(offset + limit, total_count):
+            positions, scores, ranked = self._rank_head(version, positions, scores, max(offset + limit, 2 * ranked))
+            self.search_cache.put(version.id, key, positions, scores, ranked)
         
-        # Filter by price range
-        if min_price is not None or max_price is not None:
-            # Clean price string and convert to float
-            filtered_df['price_clean'] = filtered_df['discounted_price'].str.replace('₹', '').str.replace(',', '').astype(float)
-            if min_price is not None:
-                filtered_df = filtered_df[filtered_df['price_clean'] >= min_price]
-            if max_price is not None:
-                filtered_df = filtered_df[filtered_df['price_clean'] <= max_price]
+        # Apply pagination
+        page = positions[offset:offset+limit]
+        results = version.rows(page, fields)
+        if not as_frame:
+            results = results.to_dict('records')
         
-        # Filter by minimum discount
-        if min_discount is not None:
-            # Clean discount string and convert to float
-            filtered_df['discount_clean'] = filtered_df['discount_percentage'].str.replace('%', '').astype(float)
-            filtered_df = filtered_df[filtered_df['discount_clean'] >= min_discount]
+        output = (results,)
+        if return_total:
+            output += (total_count,)
+        if return_cursor:
+            next_cursor = None
+            if len(page) and offset + len(page) < total_count:
+                last = offset + len(page) - 1
+                next_cursor = encode_cursor(SearchCursor(
+                    version=version.id, served=last + 1, position=int(positions[last]),
+                    product_id=str(version.df['product_id'].iat[positions[last]]),
+                    score=None if scores is None else float(scores[last]),
+                    rating=float(version.numeric['rating'][positions[last]]),
+                ), key)
+            output += (next_cursor,)
+        return output if len(output) > 1 else results
+    
+    def _resume_index(self, version: CatalogVersion, positions: np.ndarray, scores: Optional[np.ndarray],
+                      cursor: SearchCursor) -> int:
+        """Index in the ranked positions where the page after cursor starts"""
+        served = min(cursor.served, len(positions))
+        if cursor.version == version.id:
+            # Same catalog, same ranking: continue right where the last page ended
+            return served
         
-        # Get total count before pagination
-        total_count = len(filtered_df)
+        if scores is None:
+            # Catalog order: continue after the last product's row (or where it was)
+            known = version.positions_for(cursor.product_id)
+            position = known[0] if known else cursor.position
+            return int(np.searchsorted(positions, position, side='right' if known else 'left'))
         
-        # Apply pagination
-        paginated_df = filtered_df.iloc[offset:offset+limit]
+        # Ranked order changed: skip every result whose sort key is not after the cursor's
+        rating = np.nan_to_num(version.numeric['rating'][positions], nan=-np.inf)
+        cursor_rating = -np.inf if cursor.rating is None else cursor.rating
+        ids = version.df['product_id'].astype(str).to_numpy()[positions]
+        # Results sort before the cursor exactly when their key is not after it,
+        # which also holds while only the head of the ranking is in order
+        after = (scores < cursor.score) | (scores == cursor.score) & (
+            (rating < cursor_rating) | (rating == cursor_rating) & (ids > cursor.product_id))
+        return int(len(after) - np.count_nonzero(after))
+    
+    def _rank_head(self, version: CatalogVersion, positions: np.ndarray, scores: np.ndarray,
+                   k: int) -> tuple[np.ndarray, np.ndarray, int]:
+        """Reorder matches so the best k come first in result order (the rest keep no order)"""
+        head = top_k(k, scores, version.numeric['rating'][positions], version.id_ranks[positions])
+        tail = np.ones(len(positions), dtype=bool)
+        tail[head] = False
+        order = np.concatenate([head, np.flatnonzero(tail)])
+        return positions[order], scores[order], len(head)
+    
+    def _ranked_positions(self, version: CatalogVersion, query, category, min_rating, max_rating,
+                          min_price, max_price, min_discount, rank,
+                          k: int = None, fuzzy: bool = False) -> tuple[np.ndarray, Optional[np.ndarray], int]:
+        """Row positions of every matching product, their relevance scores (None
+        without a text query) and how many of the leading positions are in
+        result order (at least k; all of them when k is None)"""
+        ranker = get_ranker(rank) if query else None
+        positions, matches = self._matching(version, query, category, min_rating, max_rating,
+                                            min_price, max_price, min_discount, fuzzy)
+        if not query:
+            # Catalog order
+            return positions, None, len(positions)
         
-        # Remove temporary columns before returning
-        columns_to_drop = ['relevance_score', 'price_clean']
-        paginated_df = paginated_df.drop(columns=[col for col in columns_to_drop if col in paginated_df.columns], errors='ignore')
+        # Relevance score for ranking (higher score = better match), computed for the survivors only
+        relevance = np.zeros(0)
+        if fuzzy:
+            relevance = matches[positions]
+        elif len(positions):
+            relevance = np.asarray(ranker.score(version.text_index, positions, query, matches, version.features),
+                                   dtype=np.float64)
+        # Ordered by relevance score (highest first), then by rating (missing last), then product_id
+        return self._rank_head(version, positions, relevance, len(positions) if k is None else k)
+    
+    def _matching(self, version: CatalogVersion, query, category, min_rating, max_rating,
+                  min_price, max_price, min_discount, fuzzy: bool = False,
+                  on_stage=None) -> tuple[np.ndarray, Optional[dict]]:
+        """Row positions (int32, catalog order) matching the query and filters,
+        and the per-field text matches (None without a text query; with fuzzy,
+        the trigram similarity of every row instead)"""
+        # Every predicate reads the same immutable version and tests only the
+        # positions that survived the previous ones; the frame is never copied
+        predicates = []
+        text = {}
         
-        results = paginated_df.to_dict('records')
+        # Typo-tolerant search: words similar to the query words, from the trigram index
+        if query and fuzzy:
+            def fuzzy_match(positions):
+                if 'matches' not in text:
+                    text['matches'] = version.text_index.fuzzy_scores(query)
+                return text['matches'][positions] > 0
+            predicates.append(Predicate('fuzzy text', fuzzy_match, INDEX_COST))
         
-        if return_total:
-            return results, total_count
-        return results
+        # Enhanced text search across name, description and category, answered
+        # from the inverted index (phrases are verified on the given rows only)
+        elif query:
+            from_postings = version.text_index.answers_from_postings(query)
+            
+            def text_match(positions):
+                if not (from_postings and 'matches' in text):
+                    matches = text['matches'] = version.text_index.match(
+                        query, rows=None if from_postings else positions)
+                    # Combine matches with OR logic - product matches if found in any field
+                    text['matched'] = matches['product_name'] | matches['about_product'] | matches['category']
+                return text['matched'][positions]
+            predicates.append(Predicate('text', text_match, INDEX_COST))
+        
+        # Filter by category (exact or partial match)
+        if category:
+            def category_match(positions):
+                return version.df['category'].iloc[positions].str.contains(
+                    category, case=False, na=False).to_numpy(dtype=bool)
+            predicates.append(Predicate('category', category_match, REGEX_COST))
+        
+        # Numeric filters compare against the arrays parsed at load time
+        for column, bound, at_least in (
+            ('rating', min_rating, True),
+            ('rating', max_rating, False),
+            ('discounted_price', min_price, True),
+            ('discounted_price', max_price, False),
+            ('discount_percentage', min_discount, True),
+        ):
+            if bound is not None:
+                predicates.append(Predicate(
+                    f"{column} {'>=' if at_least else '<='} {bound}",
+                    self._bound_test(version.numeric[column], bound, at_least)))
+        
+        positions = np.arange(len(version.df), dtype=np.int32)
+        positions = apply_predicates(predicates, positions, on_stage=on_stage)
+        if query and 'matches' not in text:
+            # Emptied before the text stage ran: no row needs scoring
+            text['matches'] = np.zeros(len(version.df)) if fuzzy else {}
+        return positions, text.get('matches')
     
-    def format_for_display(self, products: List[dict], query: str = None, compact: bool = False) -> List[dict]:
+    @staticmethod
+    def _bound_test(values: np.ndarray, bound: float, at_least: bool):
+        if at_least:
+            return lambda positions: values[positions] >= bound
+        return lambda positions: values[positions] <= bound
+    
+    def facet_counts(self,
+                     query: str = None,
+                     category: str = None,
+                     min_rating: float = None,
+                     max_rating: float = None,
+                     min_price: float = None,
+                     max_price: float = None,
+                     min_discount: float = None) -> dict:
+        """Category, price band, rating and discount counts of the products a
+        search with the same arguments would match (see facets.FacetCodes)"""
+        version = self.version
+        key = search_key(query, category, min_rating, max_rating, min_price, max_price, min_discount)
+        facets = self.facet_cache.get(version.id, key)
+        if facets is None:
+            numbers = (min_rating, max_rating, min_price, max_price, min_discount)
+            if not query and not category and all(value is None for value in numbers):
+                positions = None  # unfiltered: every row counts
+            else:
+                positions, _ = self._matching(version, query, category, min_rating, max_rating,
+                                              min_price, max_price, min_discount)
+            facets = version.facet_codes.count(positions)
+            self.facet_cache.put(version.id, key, facets)
+        return facets
+    
+    def format_for_display(self, products: List[dict] | pd.DataFrame, query: str = None,
+                           compact: bool = False, fields: List[str] = None) -> List[dict]:
         """Format products for display with highlighted search terms
         
         Args:
-            products: List of product dictionaries
+            products: List of product dictionaries, or a DataFrame of catalog rows
+                (formatted column by column, see _format_frame)
             query: Search query to highlight
             compact: If True, return only essential fields
+            fields: If given, exactly these fields, in this order (catalog columns or
+                highlighted_fields); compact is then ignored
         
         Returns:
             List of formatted product dictionaries
         """
+        if fields is not None and not isinstance(products, pd.DataFrame):
+            products = pd.DataFrame(products, dtype=object)
+        if isinstance(products, pd.DataFrame):
+            return _format_frame(products, query, compact, fields)
         formatted_products = []
         
         for product in products:
@@ -209,62 +1022,123 @@ class CSVRepository:
         
         return formatted_products
     
-    def get_related_products(self, product_id: str, limit: int = 4) -> List[dict]:
-        """Get related products based on category"""
-        product = self.get_product_by_id(product_id)
-        if not product:
+    def recommend(self, query: str, limit: int = 10) -> tuple[List[dict], int]:
+        """Best products for a query by keyword_scores (ties by rating, then
+        product_id), each with its score, and the number of matching products.
+        Only the returned rows are read from the table."""
+        version = self.version
+        scores = keyword_scores(version.text_index, query)
+        matches = np.flatnonzero(scores > 0)
+        scores = np.round(scores[matches], 2)
+        best = top_k(limit, scores, version.numeric['rating'][matches], version.id_ranks[matches])
+        items = version.rows(matches[best]).to_dict('records')
+        for item, score in zip(items, scores[best].tolist()):
+            item['score'] = score
+        return items, len(matches)
+    
+    def similar_to_text(self, text: str, limit: int = 10, fields: List[str] = None) -> List[dict]:
+        """Products whose text is most like text (approximate nearest neighbours,
+        see similar_index), each with its cosine similarity"""
+        version = self.version
+        index = version.similar_index
+        positions, similarities = index.search(index.text_vector({'text': text}), limit)
+        return with_similarity(version.rows(positions, catalog_fields(fields)).to_dict('records'), similarities, fields)
+    
+    def similar_to_product(self, product_id: str, limit: int = 10,
+                           fields: List[str] = None) -> Optional[List[dict]]:
+        """Products whose text is most like that of product_id (None if it is unknown)"""
+        version = self.version
+        positions = version.positions_for(product_id)
+        if not positions:
+            return None
+        index = version.similar_index
+        found, similarities = index.search(index.vectors[positions[0]], limit + len(positions), exclude=positions[0])
+        keep = ~np.isin(found, positions)
+        records = version.rows(found[keep][:limit], catalog_fields(fields)).to_dict('records')
+        return with_similarity(records, similarities[keep][:limit], fields)
+    
+    def get_related_products(self, product_id: str, limit: int = 4, fields: List[str] = None) -> List[dict]:
+        """Most similar products by text and category path, from the precomputed
+        related index (only the given fields, if any)"""
+        version = self.version
+        positions = version.positions_for(product_id)
+        if not positions:
             return []
         
-        category = product.get('category', '')
-        # Get products in same category, excluding the current product
-        related = self.df[
-            (self.df['category'] == category) & 
-            (self.df['product_id'] != product_id)
-        ]
-        
-        return related.head(limit).to_dict('records')
+        related = version.related_index.related(positions[0])
+        related = [position for position in related.tolist() if position not in positions][:limit]
+        return version.rows(related, fields).to_dict('records')
+    
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+        """Typeahead: best product names and category terms for a prefix, by rating_count"""
+        return self.version.suggest_index.suggest(prefix, limit)
     
     def get_categories(self) -> List[str]:
         """Get unique categories"""
-        return self.df['category'].unique().tolist()
+        return self.version.df['category'].unique().tolist()
     
     def add_product(self, product_data: dict) -> dict:
-        """Add a new product to the CSV"""
+        """Add a new product to the catalog (Conflict if its product_id is taken)"""
         with self._lock:
-            # Generate new product_id if not provided
+            latest = self._live.latest
+            # Generate new product_id if not provided. Ids are never reused:
+            # replay folds a second add of an id into the first.
             if 'product_id' not in product_data or not product_data['product_id']:
-                # Generate ID based on max existing ID
-                max_id = len(self.df)
-                product_data['product_id'] = f"P{max_id + 1:08d}"
+                product_data['product_id'] = latest.next_product_id()
+            elif latest.positions_for(product_data['product_id']):
+                raise Conflict(f"Product {product_data['product_id']} already exists")
             
-            # Add the new row
-            new_row = pd.DataFrame([product_data])
-            self.df = pd.concat([self.df, new_row], ignore_index=True)
-            self._save()
+            draft = latest.fork()
+            draft.add(product_data)
+            self._commit(draft, 'add', product_data['product_id'], product_data)
             return product_data
     
     def update_product(self, product_id: str, update_data: dict) -> Optional[dict]:
         """Update an existing product"""
         with self._lock:
-            idx = self.df[self.df['product_id'] == product_id].index
-            if len(idx) == 0:
+            draft = self._live.latest.fork()
+            position = draft.update(product_id, update_data)
+            if position is None:
                 return None
-            
-            # Update only provided fields
-            for key, value in update_data.items():
-                if value is not None and key in self.df.columns:
-                    self.df.at[idx[0], key] = value
-            
-            self._save()
-            return self.df.iloc[idx[0]].to_dict()
+            self._commit(draft, 'update', product_id,
+                         {key: value for key, value in update_data.items() if value is not None})
+            return draft.df.iloc[position].to_dict()
     
     def delete_product(self, product_id: str) -> bool:
-        """Delete a product from the CSV"""
+        """Delete a product from the catalog"""
         with self._lock:
-            initial_len = len(self.df)
-            self.df = self.df[self.df['product_id'] != product_id]
-            
-            if len(self.df) < initial_len:
-                self._save()
-                return True
-            return False
+            draft = self._live.latest.fork()
+            if not draft.delete(product_id):
+                return False
+            self._commit(draft, 'delete', product_id)
+            return True
+
+
+# Process-wide catalog snapshots, one per CSV path. Loading amazon.csv is the
+# most expensive thing a request can do, so routers and services share one
+# repository instead of constructing their own.
+_shared_repos: dict = {}
+_shared_repos_lock = threading.Lock()
+
+
+def get_shared_repository(csv_path: str = None) -> CSVRepository:
+    """Return the shared repository for csv_path, loading it on first use.
+
+    The snapshot is reloaded when the file's mtime/size changes on disk.
+    Writes made through the repository update the snapshot in place.
+    """
+    key = str(csv_path or DEFAULT_CSV_PATH)
+    with _shared_repos_lock:
+        repo = _shared_repos.get(key)
+        if repo is None:
+            repo = CSVRepository(csv_path=key)
+            _shared_repos[key] = repo
+            return repo
+    repo.refresh_if_stale()
+    return repo
+
+
+def reset_shared_repositories():
+    """Drop all shared snapshots (used by tests)"""
+    with _shared_repos_lock:
+        _shared_repos.clear()
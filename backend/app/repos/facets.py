@@ -0,0 +1,123 @@
+"""Facet counts for the search sidebar.
+
+Every product gets integer codes once per catalog version: its top-level and
+second-level category (the first two '|' separated parts) and the bucket of
+its price, rating and discount. Counting the facets of a result set is then
+one np.bincount per facet over the codes of the matching rows.
+"""
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+import numpy as np
+import pandas as pd
+
+# Lower bucket edges; the last bucket is open-ended
+PRICE_BANDS = (0, 500, 1000, 2000, 5000, 10000, 25000)
+RATING_BUCKETS = (0, 2, 3, 3.5, 4, 4.5)
+DISCOUNT_BUCKETS = (0, 10, 25, 50, 75)
+
+FACET_CACHE_SIZE = 256
+
+
+def _bucket_codes(values: np.ndarray, edges) -> np.ndarray:
+    """Index of the bucket each value falls in; -1 for missing or below the first edge"""
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.searchsorted(np.asarray(edges, dtype=np.float64), values, side='right') - 1
+    codes[np.isnan(values)] = -1
+    return codes.astype(np.int32)
+
+
+def _bucket_facet(codes: np.ndarray, edges) -> List[dict]:
+    counts = np.bincount(codes[codes >= 0], minlength=len(edges))
+    buckets = []
+    for i, low in enumerate(edges):
+        high = edges[i + 1] if i + 1 < len(edges) else None
+        buckets.append({
+            'label': f'{low}-{high}' if high is not None else f'{low}+',
+            'min': low,
+            'max': high,
+            'count': int(counts[i]),
+        })
+    return buckets
+
+
+class FacetCodes:
+    """Per-row facet codes of one catalog version"""
+
+    def __init__(self, categories: pd.Series, price: np.ndarray, rating: np.ndarray, discount: np.ndarray):
+        parts = categories.fillna('').astype(str).str.split('|', n=2)
+        top = parts.str[0].fillna('')
+        second = (top + '|' + parts.str[1]).where(parts.str.len() > 1, '')
+        self.top, self.top_labels = pd.factorize(top.replace('', None))
+        self.second, self.second_labels = pd.factorize(second.replace('', None))
+        # Top-level code of each second-level label
+        self.second_parent = np.zeros(len(self.second_labels), dtype=np.int64)
+        has_second = self.second >= 0
+        self.second_parent[self.second[has_second]] = self.top[has_second]
+        self.price = _bucket_codes(price, PRICE_BANDS)
+        self.rating = _bucket_codes(rating, RATING_BUCKETS)
+        self.discount = _bucket_codes(discount, DISCOUNT_BUCKETS)
+
+    def count(self, positions: Optional[np.ndarray] = None) -> dict:
+        """Facet counts over the rows at positions (all rows if None)"""
+        def rows(codes):
+            return codes if positions is None else codes[positions]
+
+        top = rows(self.top)
+        second = rows(self.second)
+        top_counts = np.bincount(top[top >= 0], minlength=len(self.top_labels))
+        second_counts = np.bincount(second[second >= 0], minlength=len(self.second_labels))
+
+        children = {}
+        for code in np.flatnonzero(second_counts):
+            children.setdefault(self.second_parent[code], []).append(
+                {'value': self.second_labels[code], 'count': int(second_counts[code])})
+        categories = []
+        for code in np.flatnonzero(top_counts):
+            subcategories = sorted(children.get(code, []), key=lambda c: (-c['count'], c['value']))
+            categories.append({'value': self.top_labels[code], 'count': int(top_counts[code]),
+                               'subcategories': subcategories})
+        categories.sort(key=lambda c: (-c['count'], c['value']))
+
+        return {
+            'total': int(len(top)),
+            'categories': categories,
+            'price_bands': _bucket_facet(rows(self.price), PRICE_BANDS),
+            'rating': _bucket_facet(rows(self.rating), RATING_BUCKETS),
+            'discount': _bucket_facet(rows(self.discount), DISCOUNT_BUCKETS),
+        }
+
+
+class FacetCache:
+    """Thread-safe LRU cache of (catalog version, search key) -> facet counts.
+
+    Like the search cache, entries of older versions are dropped as soon as
+    a newer version is seen.
+    """
+
+    def __init__(self, max_entries: int = FACET_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._version: Optional[int] = None
+
+    def get(self, version: int, key: Hashable) -> Optional[dict]:
+        with self._lock:
+            if version != self._version or key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, version: int, key: Hashable, facets: dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._version is not None and version < self._version:
+                return
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._entries[key] = facets
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,67 @@
+"""Search filters as predicates over row positions.
+
+A predicate tests an array of catalog row positions and returns a boolean
+mask aligned with it. apply_predicates() narrows an array of positions
+through a list of predicates without ever copying the catalog frame: each
+stage only tests the rows that survived the previous ones, and only the
+surviving positions array is reallocated.
+
+Predicates run in the order that minimizes the expected work per row: by
+cost per rejected row, cost / (1 - selectivity), where the selectivity of
+each predicate is measured on an evenly spaced sample of the candidates.
+Cheap numeric comparisons that reject most rows therefore run before the
+text match, and the category regex runs last, on whatever is left.
+"""
+from typing import Callable, List, Optional
+import numpy as np
+
+# Rows tested per predicate to estimate its selectivity
+SAMPLE_SIZE = 256
+
+# Relative per-row costs
+NUMERIC_COST = 1.0
+INDEX_COST = 4.0   # inverted-index lookups (plus verification of phrase queries)
+REGEX_COST = 50.0  # pandas str.contains on object strings
+
+
+class Predicate:
+    """A named row test: test(positions) -> bool mask aligned with positions"""
+
+    def __init__(self, name: str, test: Callable[[np.ndarray], np.ndarray], cost: float = NUMERIC_COST):
+        self.name = name
+        self.test = test
+        self.cost = cost
+
+    def __repr__(self) -> str:
+        return f'Predicate({self.name!r}, cost={self.cost})'
+
+
+def order_predicates(predicates: List[Predicate], positions: np.ndarray,
+                     sample_size: int = SAMPLE_SIZE) -> List[Predicate]:
+    """Predicates sorted by estimated cost per rejected row (cheapest first)"""
+    if len(predicates) < 2:
+        return list(predicates)
+    sample = positions[::max(1, len(positions) // sample_size)]
+
+    def cost_per_rejection(predicate: Predicate) -> float:
+        kept = predicate.test(sample).mean() if len(sample) else 0.0
+        return predicate.cost / max(1.0 - kept, 1e-6)
+
+    return sorted(predicates, key=cost_per_rejection)
+
+
+def apply_predicates(predicates: List[Predicate], positions: np.ndarray,
+                     on_stage: Optional[Callable[[Predicate, int, int], None]] = None) -> np.ndarray:
+    """Positions that pass every predicate, in their original order.
+
+    on_stage(predicate, rows_in, rows_out) is called after each stage (for
+    instrumentation).
+    """
+    for predicate in order_predicates(predicates, positions):
+        if not len(positions):
+            break
+        rows_in = len(positions)
+        positions = positions[predicate.test(positions)]
+        if on_stage is not None:
+            on_stage(predicate, rows_in, len(positions))
+    return positions
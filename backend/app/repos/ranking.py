@@ -0,0 +1,215 @@
+import math
+import re
+from typing import Dict, Iterable
+import numpy as np
+import pandas as pd
+from ..core.config import get_accessory_keywords, get_main_product_keywords
+from .text_index import InvertedIndex, tokenize
+
+# Category path segments that mark a "real" product (vs. an accessory for one)
+MAIN_PRODUCT_KEYWORDS = ('Laptops', 'Smartphones', 'Tablets', 'Televisions', 'Cameras', 'Monitors', 'Desktops',
+                         'SmartWatches')
+# Category fragments that mark an accessory, even below a main product segment
+ACCESSORY_KEYWORDS = ('LaptopAccessories', 'MobileAccessories', 'Chargers', 'Cables', 'Bags', 'Sleeves', 'Covers',
+                      'Cases', 'Stands', 'Mounts', 'Adapters')
+
+# Popularity prior: the rating smoothed towards PRIOR_RATING as if every
+# product had PRIOR_COUNT extra ratings of that value, scaled to 0..1
+PRIOR_RATING = 4.0
+PRIOR_COUNT = 50
+
+
+class StaticFeatures:
+    """Query-independent ranking features of every catalog row, as arrays.
+
+    main_product is 1 for products in a main-product category segment that
+    are not accessories; popularity is the smoothed rating (0..1).
+    """
+    ARRAYS = ('is_main_product', 'is_accessory', 'main_product', 'popularity')
+
+    def __init__(self, main_product_keywords: Iterable[str] = None, accessory_keywords: Iterable[str] = None):
+        if main_product_keywords is None:
+            main_product_keywords = get_main_product_keywords()
+        if main_product_keywords is None:
+            main_product_keywords = MAIN_PRODUCT_KEYWORDS
+        if accessory_keywords is None:
+            accessory_keywords = get_accessory_keywords()
+        if accessory_keywords is None:
+            accessory_keywords = ACCESSORY_KEYWORDS
+        self.main_product_keywords = tuple(main_product_keywords)
+        self.accessory_keywords = tuple(accessory_keywords)
+        # Main product keywords match a whole category path segment, accessory keywords any part of the path
+        self._main_pattern = (r'\|(?:' + '|'.join(map(re.escape, self.main_product_keywords)) + r')\|'
+                              if self.main_product_keywords else None)
+        self._accessory_pattern = '|'.join(map(re.escape, self.accessory_keywords)) or None
+
+    @staticmethod
+    def _contains(categories: pd.Series, pattern: str) -> np.ndarray:
+        if pattern is None:
+            return np.zeros(len(categories), dtype=bool)
+        return categories.str.contains(pattern, case=False, na=False, regex=True).to_numpy(dtype=bool)
+
+    def main_product(self, categories: pd.Series) -> np.ndarray:
+        """1 for main products (laptops, phones, TVs...) that are not accessories, else 0"""
+        return (self._contains(categories, self._main_pattern) &
+                ~self._contains(categories, self._accessory_pattern)).astype(np.int64)
+
+    def compute(self, categories: pd.Series, rating: np.ndarray, rating_count: np.ndarray) -> Dict[str, np.ndarray]:
+        """Feature arrays for the given rows"""
+        is_main_product = self._contains(categories, self._main_pattern)
+        is_accessory = self._contains(categories, self._accessory_pattern)
+        rating = np.nan_to_num(np.asarray(rating, dtype=np.float64), nan=PRIOR_RATING)
+        count = np.asarray(rating_count, dtype=np.float64)
+        return {
+            'is_main_product': is_main_product,
+            'is_accessory': is_accessory,
+            'main_product': (is_main_product & ~is_accessory).astype(np.int64),
+            'popularity': (rating * count + PRIOR_RATING * PRIOR_COUNT) / (count + PRIOR_COUNT) / 5.0,
+        }
+
+
+class FlagRanker:
+    """The original relevance score: a weighted sum of match flags.
+
+    Exact word in name 10, any name match 3, exact word in category 5,
+    category match 2, description match 1, plus 5 for main products.
+    """
+    name = 'relevance'
+
+    def score(self, index: InvertedIndex, rows: np.ndarray, query: str,
+              matches: Dict[str, np.ndarray], features: Dict[str, np.ndarray]) -> np.ndarray:
+        exact = index.exact_word(query, fields=('product_name', 'category'), rows=rows)
+        return (
+            exact['product_name'][rows].astype(int) * 10 +      # Exact word in name is most important
+            matches['product_name'][rows].astype(int) * 3 +     # Any name match is important
+            exact['category'][rows].astype(int) * 5 +           # Exact word in category
+            matches['category'][rows].astype(int) * 2 +         # Category matches are moderately important
+            matches['about_product'][rows].astype(int) * 1 +    # Description matches are less important
+            features['main_product'][rows] * 5                  # Boost actual products over accessories
+        )
+
+
+class BM25Ranker:
+    """Field-weighted BM25 (BM25F) over the inverted index term statistics.
+
+    Term frequencies from each field are length-normalized, weighted and summed
+    before the usual k1 saturation. The main-product boost and the popularity
+    prior are added as static per-document priors, scaled by the query's
+    summed idf (the most a document can score) so they nudge ties instead of
+    outweighing the text match.
+    """
+    name = 'bm25'
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, field_weights: Dict[str, float] = None,
+                 prior_weight: float = 0.25, popularity_weight: float = 0.05):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights or {'product_name': 3.0, 'category': 2.0, 'about_product': 1.0}
+        self.prior_weight = prior_weight
+        self.popularity_weight = popularity_weight
+
+    def _length_norms(self, index: InvertedIndex, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        norms = {}
+        for field in self.field_weights:
+            lengths = index.lengths.get(field)
+            if lengths is None or not len(lengths):
+                continue
+            average = lengths.mean() or 1.0
+            norms[field] = 1 - self.b + self.b * lengths[rows] / average
+        return norms
+
+    def score(self, index: InvertedIndex, rows: np.ndarray, query: str,
+              matches: Dict[str, np.ndarray], features: Dict[str, np.ndarray]) -> np.ndarray:
+        scores = np.zeros(len(rows), dtype=np.float64)
+        norms = self._length_norms(index, rows)
+        total_docs = index.size
+        max_score = 0.0
+
+        for term in set(tokenize(query)):
+            doc_freq = index.document_frequency(term)
+            if doc_freq == 0:
+                continue
+            idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            max_score += idf
+            weighted_tf = np.zeros(len(rows), dtype=np.float64)
+            for field, weight in self.field_weights.items():
+                postings, frequencies = index.term_postings(term, field)
+                if not len(postings) or field not in norms:
+                    continue
+                # Locate each candidate row in the sorted postings
+                at = np.searchsorted(postings, rows)
+                at[at == len(postings)] = 0
+                present = postings[at] == rows
+                weighted_tf[present] += weight * frequencies[at[present]] / norms[field][present]
+            scores += idf * weighted_tf / (self.k1 + weighted_tf)
+
+        prior = (self.prior_weight * features['main_product'][rows] +
+                 self.popularity_weight * features['popularity'][rows])
+        return scores + max_score * prior
+
+
+RANKERS = {ranker.name: ranker for ranker in (FlagRanker(), BM25Ranker())}
+DEFAULT_RANKER = FlagRanker.name
+
+
+def get_ranker(name: str = None):
+    """Look up a ranker by name; raises ValueError for unknown names"""
+    ranker = RANKERS.get(name or DEFAULT_RANKER)
+    if ranker is None:
+        raise ValueError(f"Unknown ranker '{name}'. Choose one of: {', '.join(sorted(RANKERS))}")
+    return ranker
+
+
+def _select_smallest(k: int, keys: list) -> np.ndarray:
+    """Indices of the k lexicographically smallest rows of keys (primary key first), unordered"""
+    n = len(keys[0])
+    if k >= n:
+        return np.arange(n)
+    primary = keys[0]
+    kth = np.partition(primary, k - 1)[k - 1]
+    better = np.flatnonzero(primary < kth)
+    tied = np.flatnonzero(primary == kth)
+    if len(keys) == 1:
+        return np.concatenate([better, tied[:k - len(better)]])
+    # Only the rows tied with the k-th value need the next key to decide
+    chosen = _select_smallest(k - len(better), [key[tied] for key in keys[1:]])
+    return np.concatenate([better, tied[chosen]])
+
+
+def top_k(k: int, scores: np.ndarray, ratings: np.ndarray, tie_ranks: np.ndarray) -> np.ndarray:
+    """Indices of the k best rows in order: highest score, then highest rating
+    (missing last), then lowest tie rank.
+
+    Selects the winners with np.partition in O(n) and sorts only them, so a
+    page of a broad query does not pay for sorting every match.
+    """
+    k = min(int(k), len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    keys = [-np.asarray(scores, dtype=np.float64),
+            -np.nan_to_num(np.asarray(ratings, dtype=np.float64), nan=-np.inf),
+            np.asarray(tie_ranks)]
+    selected = _select_smallest(k, keys)
+    order = np.lexsort(tuple(key[selected] for key in reversed(keys)))
+    return selected[order]
+
+
+# /items/recommend relevance: a bonus per field containing the whole query,
+# plus one per distinct query word found anywhere in the row
+RECOMMEND_FIELD_BONUS = {'product_name': 3.0, 'category': 2.0, 'about_product': 1.0}
+RECOMMEND_WORD_BONUS = 0.5
+
+
+def keyword_scores(index: InvertedIndex, query: str) -> np.ndarray:
+    """Recommendation score of every row (0 for rows that do not match), read
+    from the text index: substring masks for the field bonuses, postings for
+    the word bonus"""
+    scores = np.zeros(index.size, dtype=np.float64)
+    for field, mask in index.match(query, RECOMMEND_FIELD_BONUS).items():
+        scores += RECOMMEND_FIELD_BONUS[field] * mask
+    for token in dict.fromkeys(tokenize(query)):
+        found = np.zeros(index.size, dtype=bool)
+        for field in index.fields:
+            found[index.term_postings(token, field)[0]] = True
+        scores += RECOMMEND_WORD_BONUS * found
+    return scores
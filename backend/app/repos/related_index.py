@@ -0,0 +1,300 @@
+"""Precomputed related products: the RELATED_K most similar products of every
+catalog row, served by a row lookup.
+
+Similarity is TEXT_WEIGHT * the cosine of TF-IDF vectors over the name,
+category path and description (field-weighted term frequencies, each vector
+pruned to its TOP_TERMS strongest terms) plus CATEGORY_WEIGHT * the category
+path overlap (leading path segments in common / the deeper path's depth).
+Products are only related within their top-level category.
+
+Rows are never compared with the whole catalog. The candidates of a row are the
+POSTING_DEPTH strongest rows of each of its terms, plus the POSTING_DEPTH
+most reviewed rows of its category, so a build costs
+O(rows * TOP_TERMS * POSTING_DEPTH). The build sums term weights over those
+pruned postings; rows touched later by admin writes are scored exactly on
+the pruned vectors.
+
+Admin writes are applied incrementally on a fork: the touched row gets a new
+vector and neighbour list, the rows listing it are re-scored, and it is
+offered to its candidates' lists. Term statistics (vocabulary, idf) and the
+candidate postings stay those of the build; rows added later are only found
+through that last step.
+"""
+import copy
+from typing import Dict, Iterable
+import numpy as np
+import pandas as pd
+from .text_index import InvertedIndex, tokenize
+
+RELATED_K = 8
+TOP_TERMS = 8
+POSTING_DEPTH = 32
+MAX_DEPTH = 8
+
+FIELD_WEIGHTS = {'product_name': 3.0, 'category': 2.0, 'about_product': 1.0}
+TEXT_WEIGHT = 0.7
+CATEGORY_WEIGHT = 0.3
+
+# Rows per block of the bulk build (bounds its memory)
+_BLOCK = 4096
+
+
+def _csr(keys: np.ndarray, values: np.ndarray, weights: np.ndarray, size: int, depth: int):
+    """Per key, the `depth` values of highest weight: (offsets, values, weights)"""
+    # One stable sort on key, then descending weight (scaled to [0, 1]), ties in input order
+    top = weights.max() if len(weights) else 0
+    order = np.argsort(keys * 4.0 + (2.0 - weights / (top if top > 0 else 1)), kind='stable')
+    keys, values, weights = keys[order], values[order], weights[order]
+    starts = np.searchsorted(keys, np.arange(size + 1))
+    rank = np.arange(len(keys)) - np.repeat(starts[:-1], np.diff(starts))
+    keep = rank < depth
+    return np.searchsorted(keys[keep], np.arange(size + 1)), values[keep], weights[keep]
+
+
+def _expand(owners: np.ndarray, keys: np.ndarray, weights: np.ndarray, offsets: np.ndarray,
+            targets: np.ndarray, target_weights: np.ndarray):
+    """(owner, target, owner weight * target weight) for every target in the posting of each key"""
+    valid = (keys >= 0) & (keys < len(offsets) - 1)
+    owners, keys, weights = owners[valid], keys[valid], weights[valid]
+    starts = offsets[keys]
+    lengths = offsets[keys + 1] - starts
+    flat = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return np.repeat(owners, lengths), targets[flat], np.repeat(weights, lengths) * target_weights[flat]
+
+
+class RelatedIndex:
+    """int32 matrix of each row's related rows, best first (-1 pads short lists)"""
+
+    def __init__(self, text_index: InvertedIndex, categories: pd.Series, popularity: np.ndarray):
+        size = text_index.size
+        self._prefixes: Dict[str, int] = {}
+
+        # Field-weighted term frequencies, straight from the search index postings
+        vocabulary, rows, terms, counts = {}, [], [], []
+        for token, fields in text_index._postings.items():
+            for field, field_rows in fields.items():
+                if field in FIELD_WEIGHTS and len(field_rows):
+                    term = vocabulary.setdefault(token, len(vocabulary))
+                    rows.append(field_rows)
+                    terms.append(np.full(len(field_rows), term, dtype=np.int32))
+                    counts.append(text_index._frequencies[token][field] * FIELD_WEIGHTS[field])
+        self.vocabulary = vocabulary
+        rows = np.concatenate(rows).astype(np.int64) if rows else np.zeros(0, dtype=np.int64)
+        terms = np.concatenate(terms) if terms else np.zeros(0, dtype=np.int32)
+        counts = np.concatenate(counts) if counts else np.zeros(0)
+        keys, inverse = np.unique(rows * max(len(vocabulary), 1) + terms, return_inverse=True)
+        rows, terms = keys // max(len(vocabulary), 1), (keys % max(len(vocabulary), 1)).astype(np.int32)
+        tf = np.bincount(inverse, weights=counts, minlength=len(keys))
+
+        document_frequency = np.bincount(terms, minlength=len(vocabulary))
+        self.idf = np.log((1 + size) / (1 + document_frequency)) + 1
+        self.terms, self.weights = self._pruned_vectors(rows, terms, np.log1p(tf) * self.idf[terms], size)
+
+        # Candidate postings: the strongest rows of every term, the most reviewed of every category
+        owners = np.repeat(np.arange(size), TOP_TERMS)
+        kept = self.terms.ravel() >= 0
+        self._term_postings = _csr(self.terms.ravel()[kept], owners[kept], self.weights.ravel()[kept],
+                                   len(vocabulary), POSTING_DEPTH)
+        self.levels = self._category_levels(categories)
+        leaves = self._leaves(self.levels)
+        popularity = np.asarray(popularity, dtype=np.float64)
+        self._category_postings = _csr(leaves[leaves >= 0], np.flatnonzero(leaves >= 0),
+                                       popularity[leaves >= 0], len(self._prefixes), POSTING_DEPTH)
+
+        self.neighbours = np.full((size, RELATED_K), -1, dtype=np.int32)
+        self.scores = np.zeros((size, RELATED_K), dtype=np.float32)
+        for start in range(0, size, _BLOCK):
+            self._build_block(start, min(start + _BLOCK, size))
+
+    def __len__(self) -> int:
+        return len(self.neighbours)
+
+    def related(self, position: int, limit: int = RELATED_K) -> np.ndarray:
+        """Positions of the rows most related to the row at position, best first"""
+        row = self.neighbours[position, :limit]
+        return row[row >= 0]
+
+    # -- vectors and categories ----------------------------------------------
+
+    @staticmethod
+    def _pruned_vectors(rows: np.ndarray, terms: np.ndarray, weights: np.ndarray, size: int):
+        """[size, TOP_TERMS] term ids (-1 padded) and weights of the L2-normalized vectors"""
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=size))
+        weights = weights / np.where(norms > 0, norms, 1)[rows]
+        offsets, kept_terms, kept_weights = _csr(rows, terms, weights, size, TOP_TERMS)
+        lengths = np.diff(offsets)
+        columns = np.arange(len(kept_terms)) - np.repeat(offsets[:-1], lengths)
+        matrix_terms = np.full((size, TOP_TERMS), -1, dtype=np.int32)
+        matrix_weights = np.zeros((size, TOP_TERMS), dtype=np.float32)
+        owner = np.repeat(np.arange(size), lengths)
+        matrix_terms[owner, columns] = kept_terms
+        matrix_weights[owner, columns] = kept_weights
+        return matrix_terms, matrix_weights
+
+    def _path_codes(self, category) -> np.ndarray:
+        """Code of each leading path of a category (1..MAX_DEPTH segments), -1 past its end"""
+        parts = [part.strip() for part in str(category or '').split('|') if part.strip()]
+        codes = np.full(MAX_DEPTH, -1, dtype=np.int32)
+        for depth in range(min(len(parts), MAX_DEPTH)):
+            codes[depth] = self._prefixes.setdefault('|'.join(parts[:depth + 1]), len(self._prefixes))
+        return codes
+
+    def _category_levels(self, categories: pd.Series) -> np.ndarray:
+        """[rows, MAX_DEPTH] path codes, computed once per distinct category"""
+        codes, uniques = pd.factorize(categories.fillna('').astype(str))
+        table = np.full((len(uniques) + 1, MAX_DEPTH), -1, dtype=np.int32)
+        for code, category in enumerate(uniques):
+            table[code] = self._path_codes(category)
+        return table[codes]
+
+    @staticmethod
+    def _leaves(levels: np.ndarray) -> np.ndarray:
+        """Code of each row's full category path (-1 without a category)"""
+        depth = (levels >= 0).sum(axis=1)
+        return np.where(depth > 0, levels[np.arange(len(levels)), np.maximum(depth - 1, 0)], -1)
+
+    def _row_vector(self, row: dict):
+        tf: Dict[int, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(row.get(field)):
+                term = self.vocabulary.get(token)
+                if term is not None:
+                    tf[term] = tf.get(term, 0.0) + weight
+        terms = np.fromiter(tf, dtype=np.int32, count=len(tf))
+        weights = np.log1p(np.fromiter(tf.values(), dtype=np.float64, count=len(tf))) * self.idf[terms]
+        return self._pruned_vectors(np.zeros(len(terms), dtype=np.int64), terms, weights, 1)
+
+    # -- scoring ---------------------------------------------------------------
+
+    def _candidates(self, rows: np.ndarray):
+        """(row, candidate, summed posting weight) for every candidate of rows in
+        the same top-level category, self pairs excluded"""
+        owners = np.repeat(rows, TOP_TERMS)
+        pairs = [
+            _expand(owners, self.terms[rows].ravel(), self.weights[rows].ravel(), *self._term_postings),
+            _expand(rows, self._leaves(self.levels[rows]), np.zeros(len(rows)),
+                    self._category_postings[0], self._category_postings[1],
+                    np.zeros(len(self._category_postings[1]))),
+        ]
+        owner = np.concatenate([pair[0] for pair in pairs]).astype(np.int64)
+        target = np.concatenate([pair[1] for pair in pairs]).astype(np.int64)
+        weight = np.concatenate([pair[2] for pair in pairs])
+        department = self.levels[owner, 0]
+        related = (department == self.levels[target, 0]) & (department >= 0)
+        owner, target, weight = owner[related], target[related], weight[related]
+        keys, inverse = np.unique(owner * len(self) + target, return_inverse=True)
+        text = np.bincount(inverse, weights=weight, minlength=len(keys))
+        owner, target = keys // len(self), keys % len(self)
+        distinct = owner != target
+        return owner[distinct], target[distinct], text[distinct]
+
+    def _text_similarity(self, rows: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Exact cosine of the pruned vectors of row pairs"""
+        same = (self.terms[rows][:, :, None] == self.terms[others][:, None, :]) & (self.terms[rows][:, :, None] >= 0)
+        return np.einsum('pi,pij,pj->p', self.weights[rows], same, self.weights[others])
+
+    def _score(self, rows: np.ndarray, others: np.ndarray, text: np.ndarray) -> np.ndarray:
+        """Similarity of row pairs; NaN for pairs in different top-level categories"""
+        left, right = self.levels[rows], self.levels[others]
+        common = ((left == right) & (left >= 0)).sum(axis=1)
+        depth = np.maximum((left >= 0).sum(axis=1), (right >= 0).sum(axis=1))
+        score = TEXT_WEIGHT * text + CATEGORY_WEIGHT * common / np.maximum(depth, 1)
+        return np.where(common > 0, score, np.nan)
+
+    def _store(self, owner: np.ndarray, target: np.ndarray, score: np.ndarray):
+        """Write the best RELATED_K targets of each owner into its neighbour row"""
+        related = ~np.isnan(score)
+        owner, target, score = owner[related], target[related], score[related]
+        # Pairs come ordered by (owner, target); a stable sort on owner, then
+        # descending score (score < 2) keeps ties in target order
+        order = np.argsort(owner * 4.0 + (2.0 - score), kind='stable')
+        owner, target, score = owner[order], target[order], score[order]
+        starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        rank = np.arange(len(owner)) - np.repeat(starts, np.diff(np.r_[starts, len(owner)]))
+        keep = rank < RELATED_K
+        self.neighbours[owner[keep], rank[keep]] = target[keep]
+        self.scores[owner[keep], rank[keep]] = score[keep]
+
+    def _build_block(self, start: int, end: int):
+        owner, target, text = self._candidates(np.arange(start, end))
+        self._store(owner, target, self._score(owner, target, text))
+
+    # -- incremental maintenance (only on an unpublished fork) ----------------
+
+    def fork(self) -> 'RelatedIndex':
+        """Copy that can be edited without affecting this index"""
+        forked = copy.copy(self)
+        forked._prefixes = dict(self._prefixes)
+        return forked
+
+    def _recompute(self, rows: Iterable[int]):
+        """Neighbour lists of rows, from their candidates and current neighbours scored exactly"""
+        rows = np.unique(np.asarray(list(rows), dtype=np.int64))
+        if not len(rows):
+            return
+        current = self.neighbours[rows].ravel()
+        owner, target, _ = self._candidates(rows)
+        owner = np.r_[owner, np.repeat(rows, RELATED_K)[current >= 0]]
+        target = np.r_[target, current[current >= 0]]
+        keys = np.unique(owner * len(self) + target)
+        owner, target = keys // len(self), keys % len(self)
+        self.neighbours[rows] = -1
+        self.scores[rows] = 0
+        if len(owner):
+            self._store(owner, target, self._score(owner, target, self._text_similarity(owner, target)))
+
+    def _offer(self, position: int):
+        """Insert position into the lists of its candidates it now beats"""
+        _, others, _ = self._candidates(np.array([position]))
+        if not len(others):
+            return
+        mine = np.full(len(others), position)
+        score = self._score(others, mine, self._text_similarity(others, mine))
+        better = score > np.where(self.neighbours[others, -1] >= 0, self.scores[others, -1], -1)
+        for other, value in zip(others[better], score[better]):
+            row = self.neighbours[other]
+            if position in row:
+                continue
+            slot = int(np.searchsorted(-self.scores[other][row >= 0], -value, side='right'))
+            self.neighbours[other, slot + 1:] = row[slot:-1].copy()
+            self.scores[other, slot + 1:] = self.scores[other, slot:-1].copy()
+            self.neighbours[other, slot] = position
+            self.scores[other, slot] = value
+
+    def _copy_arrays(self, grow: int = 0):
+        def grown(array, fill):
+            padding = np.full((grow,) + array.shape[1:], fill, dtype=array.dtype)
+            return np.concatenate((array, padding)) if grow else array.copy()
+        self.terms, self.weights = grown(self.terms, -1), grown(self.weights, 0)
+        self.levels = grown(self.levels, -1)
+        self.neighbours, self.scores = grown(self.neighbours, -1), grown(self.scores, 0)
+
+    def set_row(self, position: int, row: dict):
+        """(Re)index the product at position (appended when position == len(self))"""
+        self._copy_arrays(grow=max(0, position + 1 - len(self)))
+        terms, weights = self._row_vector(row)
+        self.terms[position], self.weights[position] = terms[0], weights[0]
+        self.levels[position] = self._path_codes(row.get('category'))
+        listing = np.flatnonzero((self.neighbours == position).any(axis=1))
+        self._recompute(np.r_[listing, position])
+        self._offer(position)
+
+    def remove_row(self, position: int):
+        """Drop the row at position; later rows shift down by one"""
+        size = len(self)
+        remap = np.arange(size, dtype=np.int32) - (np.arange(size) > position)
+        remap[position] = -1
+        keep = np.arange(size) != position
+        listing = np.flatnonzero(((self.neighbours == position).any(axis=1))[keep])
+
+        def remapped(offsets, targets, weights):
+            mapped = remap[targets]
+            valid = mapped >= 0
+            return np.r_[0, np.cumsum(valid)][offsets], mapped[valid], weights[valid]
+
+        self._term_postings = remapped(*self._term_postings)
+        self._category_postings = remapped(*self._category_postings)
+        self.terms, self.weights, self.levels = self.terms[keep], self.weights[keep], self.levels[keep]
+        neighbours = np.where(self.neighbours >= 0, remap[self.neighbours], -1)[keep]
+        self.neighbours, self.scores = neighbours, self.scores[keep]
+        self._recompute(listing)
@@ -0,0 +1,140 @@
+"""LRU + TTL cache of ranked search results.
+
+The repository caches the row positions of every match of a normalized search
+(query, filters, ranker) together with the catalog version it was computed
+from. Only the head of the list is in result order (the pages served so far,
+ranked with a partial top-k selection); deeper pages order more of it and
+replace the entry. Paging through a result set then slices the cached list
+instead of re-running filter and rank for every page.
+
+Entries are only valid for their catalog version: once a newer version is
+seen (an admin write was published) all older entries are dropped.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+import numpy as np
+
+# Defaults sized for the Amazon catalog: a broad query caches one int32 position
+# (plus a float64 score for text queries) per product, so the row budget bounds
+# memory (~24 MB) regardless of entry count.
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 300.0
+SEARCH_CACHE_MAX_ROWS = 2_000_000
+
+
+def search_key(query: str = None, category: str = None, min_rating: float = None,
+               max_rating: float = None, min_price: float = None, max_price: float = None,
+               min_discount: float = None, rank: str = None, fuzzy: bool = False) -> tuple:
+    """Normalized cache key of a search.
+
+    Text matching and ranking are case-insensitive, so the query is
+    lowercased; the category filter is a regex and is kept verbatim.
+    """
+    def number(value):
+        return None if value is None else float(value)
+
+    return (
+        query.lower() if query else None,
+        category or None,
+        number(min_rating), number(max_rating),
+        number(min_price), number(max_price),
+        number(min_discount),
+        rank if query and not fuzzy else None,  # the ranker only matters for exact text queries
+        bool(query and fuzzy),
+    )
+
+
+class SearchCache:
+    """Thread-safe LRU cache of (catalog version, search key) -> (row positions, scores, ordered head length)"""
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE, ttl: float = SEARCH_CACHE_TTL,
+                 max_rows: int = SEARCH_CACHE_MAX_ROWS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._rows = 0
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _drop(self, key):
+        _, (positions, _, _) = self._entries.pop(key)
+        self._rows -= len(positions)
+
+    def _see_version(self, version: int) -> bool:
+        """Track the newest catalog version; False if version is older than it"""
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._rows = 0
+            self._version = version
+        return version == self._version
+
+    def get(self, version: int, key: Hashable) -> Optional[tuple]:
+        """Cached (positions, scores, ranked) for key at catalog version, or None"""
+        with self._lock:
+            if not self._see_version(version) or key not in self._entries:
+                self.misses += 1
+                return None
+            stored_at, ranked = self._entries[key]
+            if self._clock() - stored_at > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ranked
+
+    def put(self, version: int, key: Hashable, positions: np.ndarray, scores: np.ndarray = None,
+            ranked: int = None):
+        """Store positions (and their scores) computed from catalog version, the
+        first ranked of which are in result order (all of them by default)"""
+        if self.max_entries <= 0 or len(positions) > self.max_rows:
+            return
+        # Shared between requests
+        for array in (positions, scores):
+            if array is not None:
+                array.setflags(write=False)
+        with self._lock:
+            # Results computed from an older, pinned version are not cached
+            if not self._see_version(version):
+                return
+            if key in self._entries:
+                self._drop(key)
+            ranked = len(positions) if ranked is None else ranked
+            self._entries[key] = (self._clock(), (positions, scores, ranked))
+            self._rows += len(positions)
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self) -> dict:
+        """Counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'cached_rows': self._rows,
+                'catalog_version': self._version,
+            }
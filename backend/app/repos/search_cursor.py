@@ -0,0 +1,68 @@
+"""Opaque keyset cursors for paging through search results.
+
+A cursor records where the previous page ended: the sort key of its last
+product (relevance score, rating, product_id), that product's row position,
+how many results had been served, and the catalog version the page came
+from. It is bound to the search it was issued for, so it cannot be replayed
+with different filters.
+
+While the catalog version is unchanged the next page starts right at the
+recorded count. After an admin write the repository resumes from the first
+result whose sort key comes after the recorded one instead, so products are
+neither repeated nor skipped when rows shift.
+"""
+import base64
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    version: int
+    served: int
+    product_id: str
+    position: int
+    score: Optional[float] = None   # None for searches without a text query
+    rating: Optional[float] = None  # None when the product has no rating
+
+
+def _fingerprint(search_key: tuple) -> str:
+    return hashlib.sha1(repr(search_key).encode()).hexdigest()[:12]
+
+
+def _number(value) -> Optional[float]:
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def encode_cursor(cursor: SearchCursor, search_key: tuple) -> str:
+    payload = {
+        'v': cursor.version, 'n': cursor.served, 'id': cursor.product_id, 'p': cursor.position,
+        's': _number(cursor.score), 'r': _number(cursor.rating), 'q': _fingerprint(search_key),
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str, search_key: tuple) -> SearchCursor:
+    """Parse a cursor issued for search_key; raises ValueError if it is invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        cursor = SearchCursor(
+            version=int(payload['v']), served=int(payload['n']), product_id=str(payload['id']),
+            position=int(payload['p']), score=_number(payload['s']), rating=_number(payload['r']),
+        )
+        fingerprint = payload['q']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid search cursor") from None
+    if fingerprint != _fingerprint(search_key):
+        raise ValueError("Search cursor does not belong to this search")
+    if cursor.served < 0:
+        raise ValueError("Invalid search cursor")
+    return cursor
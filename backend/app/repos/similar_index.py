@@ -0,0 +1,272 @@
+"""Approximate nearest-neighbour ("more like this") search over product text.
+
+Every product is a fixed-size vector: its field-weighted TF-IDF bag of words,
+hashed into HASH_BUCKETS buckets (crc32 of the word) and reduced to DIMENSIONS
+by a fixed random projection, then L2-normalized. Free-text queries go
+through the same steps, so any text can be compared with the catalog.
+
+Search uses random-hyperplane LSH: each of TABLES tables hashes a vector to
+the BITS signs of its dot products with random hyperplanes. A query probes its
+own bucket and the BITS buckets one bit away in every table, and ranks only
+those candidates by exact cosine. Catalogs under EXACT_BELOW rows are simply
+scanned, which is as fast and exact.
+
+The vectors are built when the catalog loads and saved next to the CSV
+(data/amazon.csv -> data/amazon.similar.npz), keyed on the CSV fingerprint
+like the Feather snapshot. The projection and hyperplanes come from SEED and
+are not stored.
+"""
+import copy
+import json
+import logging
+import os
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .catalog_snapshot import is_fresh, source_info
+from .related_index import FIELD_WEIGHTS
+from .text_index import InvertedIndex, tokenize
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 128
+HASH_BUCKETS = 1 << 14
+TABLES = 16
+BITS = 18
+EXACT_BELOW = 20_000
+SEED = 1_000_003
+
+SIMILAR_SUFFIX = '.similar.npz'
+
+# Bumped whenever the stored vectors would come out differently
+_FORMAT = 1
+# Rows projected at a time: small blocks keep each dense product cache-sized
+_BLOCK = 16
+
+
+def similar_path(csv_path) -> Path:
+    """Sidecar location for a catalog CSV (data/amazon.csv -> data/amazon.similar.npz)"""
+    return Path(csv_path).with_suffix(SIMILAR_SUFFIX)
+
+
+def _parameters() -> dict:
+    return {'format': _FORMAT, 'dimensions': DIMENSIONS, 'hash_buckets': HASH_BUCKETS,
+            'seed': SEED, 'field_weights': FIELD_WEIGHTS}
+
+
+@lru_cache(maxsize=1)
+def _projection() -> np.ndarray:
+    """[HASH_BUCKETS, DIMENSIONS] random projection of the hashed bag of words"""
+    rng = np.random.default_rng(SEED)
+    return rng.standard_normal((HASH_BUCKETS, DIMENSIONS), dtype=np.float32) / np.sqrt(DIMENSIONS)
+
+
+@lru_cache(maxsize=8)
+def _hyperplanes(tables: int, bits: int) -> np.ndarray:
+    """[DIMENSIONS, tables * bits] random LSH hyperplanes"""
+    rng = np.random.default_rng([SEED, tables, bits])
+    return rng.standard_normal((DIMENSIONS, tables * bits), dtype=np.float32)
+
+
+def _bucket(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8')) % HASH_BUCKETS
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+class SimilarIndex:
+    """Product vectors plus their LSH signatures, rows in catalog order"""
+
+    def __init__(self, vectors: np.ndarray, idf: np.ndarray, tables: int = TABLES, bits: int = BITS):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.n_tables, self.bits = tables, bits
+        self.signatures = self._sign(self.vectors)
+        self._tables: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @classmethod
+    def build(cls, text_index: InvertedIndex) -> 'SimilarIndex':
+        """Vectors of every row of the search index, from its postings"""
+        size = text_index.size
+        rows, buckets, counts = [], [], []
+        for token, fields in text_index._postings.items():
+            bucket = _bucket(token)
+            for field, field_rows in fields.items():
+                if field in FIELD_WEIGHTS and len(field_rows):
+                    rows.append(field_rows)
+                    buckets.append(np.full(len(field_rows), bucket, dtype=np.int64))
+                    counts.append(text_index._frequencies[token][field] * FIELD_WEIGHTS[field])
+        if not rows:
+            return cls(np.zeros((size, DIMENSIONS), dtype=np.float32), np.ones(HASH_BUCKETS, dtype=np.float32))
+        keys, inverse = np.unique(np.concatenate(rows).astype(np.int64) * HASH_BUCKETS + np.concatenate(buckets),
+                                  return_inverse=True)
+        tf = np.bincount(inverse, weights=np.concatenate(counts), minlength=len(keys))
+        rows, buckets = keys // HASH_BUCKETS, keys % HASH_BUCKETS
+        document_frequency = np.bincount(buckets, minlength=HASH_BUCKETS)
+        idf = (np.log((1 + size) / (1 + document_frequency)) + 1).astype(np.float32)
+        return cls(cls._project(rows, buckets, np.log1p(tf) * idf[buckets], size), idf)
+
+    @staticmethod
+    def _project(rows: np.ndarray, buckets: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+        """Normalized [size, DIMENSIONS] vectors of distinct (row, bucket, weight) entries sorted by row.
+
+        Each block of rows becomes a dense [rows, buckets used] matrix that is
+        multiplied with the projection rows of those buckets.
+        """
+        projection = _projection()
+        vectors = np.zeros((size, DIMENSIONS), dtype=np.float32)
+        bounds = np.searchsorted(rows, np.arange(0, size + _BLOCK, _BLOCK))
+        for base, start, end in zip(range(0, size, _BLOCK), bounds[:-1], bounds[1:]):
+            if start == end:
+                continue
+            used, columns = np.unique(buckets[start:end], return_inverse=True)
+            block = np.zeros((min(_BLOCK, size - base), len(used)), dtype=np.float32)
+            block[rows[start:end] - base, columns] = weights[start:end]
+            vectors[base:base + len(block)] = block @ projection[used]
+        return _normalized(vectors)
+
+    def text_vector(self, fields: Dict[str, str]) -> np.ndarray:
+        """Normalized vector of some text, given as {field: text}; fields
+        outside FIELD_WEIGHTS count with weight 1"""
+        tf: Counter = Counter()
+        for field, text in fields.items():
+            for token in tokenize(text):
+                tf[_bucket(token)] += FIELD_WEIGHTS.get(field, 1.0)
+        if not tf:
+            return np.zeros(DIMENSIONS, dtype=np.float32)
+        buckets = np.fromiter(tf, dtype=np.int64, count=len(tf))
+        weights = np.log1p(np.fromiter(tf.values(), dtype=np.float64, count=len(tf))) * self.idf[buckets]
+        return _normalized(weights.astype(np.float32) @ _projection()[buckets])
+
+    # -- LSH -----------------------------------------------------------------
+
+    def _sign(self, vectors: np.ndarray) -> np.ndarray:
+        """[rows, tables] bucket codes: the hyperplane sign bits of each table"""
+        signs = vectors @ _hyperplanes(self.n_tables, self.bits) > 0
+        bits = signs.reshape(len(vectors), self.n_tables, self.bits)
+        return bits.astype(np.int32) @ (1 << np.arange(self.bits, dtype=np.int32))
+
+    @property
+    def tables(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Per table, rows sorted by bucket code and the sorted codes (built on first use)"""
+        if self._tables is None:
+            tables = []
+            for table in range(self.n_tables):
+                order = np.argsort(self.signatures[:, table], kind='stable').astype(np.int32)
+                tables.append((order, self.signatures[order, table]))
+            self._tables = tables
+        return self._tables
+
+    def candidates(self, vector: np.ndarray) -> np.ndarray:
+        """Rows sharing a bucket, or a bucket one bit away, with vector in some table"""
+        codes = self._sign(vector[None, :])[0]
+        flips = np.r_[0, 1 << np.arange(self.bits, dtype=np.int32)]
+        found = np.zeros(len(self), dtype=bool)
+        for table, (order, sorted_codes) in enumerate(self.tables):
+            probes = codes[table] ^ flips
+            starts = np.searchsorted(sorted_codes, probes, side='left')
+            ends = np.searchsorted(sorted_codes, probes, side='right')
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                found[order[start:end]] = True
+        return np.flatnonzero(found)
+
+    def search(self, vector: np.ndarray, limit: int = 10, exclude: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, cosine similarities) of the approximate `limit` nearest rows, best first"""
+        if not vector.any():
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if len(self) < EXACT_BELOW:
+            return self.exact(vector, limit, exclude)
+        rows = self.candidates(vector)
+        if exclude is not None:
+            rows = rows[rows != exclude]
+        return self._best(rows, self.vectors[rows] @ vector, limit)
+
+    def exact(self, vector: np.ndarray, limit: int = 10, exclude: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact cosine search over every row (the reference for search())"""
+        scores = self.vectors @ vector
+        if exclude is not None:
+            scores[exclude] = 0
+        return self._best(np.arange(len(self)), scores, limit)
+
+    @staticmethod
+    def _best(rows: np.ndarray, scores: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The `limit` rows of highest positive score, ties by position"""
+        keep = scores > 0
+        rows, scores = rows[keep], scores[keep]
+        if len(rows) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            rows, scores = rows[top], scores[top]
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    # -- incremental maintenance (only on an unpublished fork) ----------------
+
+    def fork(self) -> 'SimilarIndex':
+        """Copy that can be edited without affecting this index"""
+        return copy.copy(self)
+
+    def set_row(self, position: int, row: dict):
+        """(Re)index the product at position (appended when position == len(self))"""
+        vector = self.text_vector({field: row.get(field) for field in FIELD_WEIGHTS})
+        grow = max(0, position + 1 - len(self))
+        self.vectors = np.concatenate((self.vectors, np.zeros((grow, DIMENSIONS), dtype=np.float32)))
+        self.signatures = np.concatenate((self.signatures, np.zeros((grow, self.n_tables), dtype=np.int32)))
+        self.vectors[position] = vector
+        self.signatures[position] = self._sign(vector[None, :])[0]
+        self._tables = None
+
+    def remove_row(self, position: int):
+        """Drop the row at position; later rows shift down by one"""
+        self.vectors = np.delete(self.vectors, position, axis=0)
+        self.signatures = np.delete(self.signatures, position, axis=0)
+        self._tables = None
+
+    # -- persistence -----------------------------------------------------------
+
+    def save(self, csv_path, product_ids: List[str], source: dict = None) -> bool:
+        """Write the vectors as the sidecar of csv_path. Returns False if it could not be written.
+
+        product_ids are the ids of the rows, in order; source is the CSV's
+        size/mtime/sha256 as of when the rows were read from it.
+        """
+        path = similar_path(csv_path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        try:
+            meta = {**_parameters(), 'source': source or source_info(csv_path)}
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, vectors=self.vectors, idf=self.idf,
+                         product_ids=np.asarray(product_ids, dtype=str), meta=np.asarray(json.dumps(meta)))
+            os.replace(tmp_path, path)
+            return True
+        except OSError as exc:
+            logger.warning("Could not write similar-products index %s: %s", path, exc)
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return False
+
+    @classmethod
+    def load(cls, csv_path, product_ids: List[str]) -> Optional['SimilarIndex']:
+        """The saved index of csv_path if it is fresh and holds exactly product_ids, else None"""
+        path = similar_path(csv_path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if {key: meta.get(key) for key in _parameters()} != _parameters() \
+                        or not is_fresh(meta.get('source', {}), csv_path) \
+                        or data['product_ids'].tolist() != [str(product_id) for product_id in product_ids]:
+                    return None
+                return cls(data['vectors'], data['idf'])
+        except Exception as exc:
+            logger.warning("Ignoring unreadable similar-products index %s: %s", path, exc)
+            return None
@@ -0,0 +1,665 @@
+"""SQLite storage backend for the catalog.
+
+SQLiteRepository answers the same calls as CSVRepository from a SQLite file
+instead of an in-memory DataFrame:
+
+  * products holds the display columns exactly as in amazon.csv plus a parsed
+    num_<column> copy of each NUMERIC_COLUMNS entry, with B-tree indexes on
+    the parsed price/rating/discount and on product_id and category
+  * reviews holds the per-review columns (see csv_repo.split_reviews)
+  * products_fts is an FTS5 index over product_name/category/about_product.
+    It uses the trigram tokenizer because search is a case-insensitive
+    substring match ("cable" must find "USBCables"), not a word match.
+
+Build a database once from the CSV with
+
+    python -m app.repos.sqlite_repo data/amazon.csv data/amazon.db
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from ..core.errors import Conflict
+from .csv_repo import (CSVRepository, DEFAULT_CSV_PATH, NUMERIC_COLUMNS, REVIEW_COLUMNS, FieldProjection,
+                       catalog_fields, parse_numeric, split_reviews, with_similarity)
+from .catalog_snapshot import load_catalog
+from .ranking import StaticFeatures, get_ranker, keyword_scores, top_k
+from .facets import FacetCache, FacetCodes
+from .similar_index import SimilarIndex
+from .suggest_index import MAX_SUGGESTIONS, SuggestIndex
+from .text_index import InvertedIndex
+from .search_cache import search_key
+from .search_cursor import SearchCursor, decode_cursor, encode_cursor
+
+DEFAULT_DB_PATH = DEFAULT_CSV_PATH.with_suffix('.db')
+
+# FTS5 trigram queries need at least three characters
+_MIN_FTS_QUERY = 3
+# Stay under SQLite's bound-parameter limit for IN (...) lookups
+_MAX_PARAMS = 900
+# Sort value standing in for a missing rating (missing ratings sort last)
+_NO_RATING = -1e308
+# Columns the schema (FTS index, lookups) relies on even if the CSV lacks them
+_REQUIRED_COLUMNS = ('product_id', 'product_name', 'category', 'about_product')
+
+
+def _quote(name: str) -> str:
+    """Quote a column name taken from the CSV header"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _regexp(pattern: str, value) -> int:
+    """REGEXP operator: case-insensitive re.search, like str.contains(case=False)"""
+    if value is None:
+        return 0
+    return int(_compile(pattern).search(str(value)) is not None)
+
+
+def _plain(value):
+    """Python value SQLite can bind (NaN -> NULL)"""
+    if isinstance(value, float) and value != value:
+        return None
+    if hasattr(value, 'item'):
+        return _plain(value.item())
+    return value
+
+
+class SQLiteRepository:
+    """Catalog repository backed by SQLite with FTS5 text search"""
+    _lock = threading.RLock()  # Serializes writers; readers use their own connection
+
+    def __init__(self, db_path: str = None):
+        if db_path is None:
+            db_path = DEFAULT_DB_PATH
+        self.db_path = str(db_path)
+        if not Path(self.db_path).exists():
+            raise FileNotFoundError(
+                f"Catalog database {self.db_path} does not exist; "
+                f"create it with SQLiteRepository.import_csv()"
+            )
+        self._local = threading.local()
+        self._columns = json.loads(self._meta('columns'))
+        self._product_columns = [col for col in self._columns if col not in REVIEW_COLUMNS]
+        self.facet_cache = FacetCache()
+        self._suggest_index: Optional[tuple] = None  # (version, SuggestIndex)
+        self._text_index: Optional[tuple] = None  # (version, InvertedIndex, ids, ratings, id ranks)
+        self._similar_index: Optional[tuple] = None  # (version, SimilarIndex)
+
+    # -- connection and schema ----------------------------------------------
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.create_function('regexp', 2, _regexp, deterministic=True)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside a writer"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect(self.db_path)
+        return conn
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute('SELECT value FROM catalog_meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def _create_schema(cls, conn: sqlite3.Connection, columns: List[str]):
+        columns = columns + [col for col in _REQUIRED_COLUMNS if col not in columns]
+        product_columns = [col for col in columns if col not in REVIEW_COLUMNS]
+        raw = ', '.join(_quote(col) for col in product_columns)
+        numeric = ', '.join(f'num_{col} {"INTEGER" if col == "rating_count" else "REAL"}' for col in NUMERIC_COLUMNS)
+        conn.executescript(f"""
+            CREATE TABLE catalog_meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE products (rowid INTEGER PRIMARY KEY, {raw}, {numeric}, main_product INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE reviews (product_id, {', '.join(REVIEW_COLUMNS)});
+            CREATE VIRTUAL TABLE products_fts USING fts5(
+                product_name, category, about_product,
+                content='products', content_rowid='rowid', tokenize='trigram'
+            );
+        """)
+        conn.executemany('INSERT INTO catalog_meta VALUES (?, ?)',
+                         [('columns', json.dumps(columns)), ('version', '1')])
+
+    @staticmethod
+    def _create_indexes(conn: sqlite3.Connection):
+        """Secondary indexes and the triggers that keep products_fts in sync.
+        Created after the bulk load, which fills products_fts in one pass."""
+        conn.executescript("""
+            INSERT INTO products_fts(products_fts) VALUES ('rebuild');
+            CREATE TRIGGER products_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts(rowid, product_name, category, about_product)
+                VALUES (new.rowid, new.product_name, new.category, new.about_product);
+            END;
+            CREATE TRIGGER products_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, product_name, category, about_product)
+                VALUES ('delete', old.rowid, old.product_name, old.category, old.about_product);
+            END;
+            CREATE TRIGGER products_au AFTER UPDATE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, product_name, category, about_product)
+                VALUES ('delete', old.rowid, old.product_name, old.category, old.about_product);
+                INSERT INTO products_fts(rowid, product_name, category, about_product)
+                VALUES (new.rowid, new.product_name, new.category, new.about_product);
+            END;
+            CREATE INDEX idx_products_product_id ON products(product_id);
+            CREATE INDEX idx_products_category ON products(category);
+            CREATE INDEX idx_products_price ON products(num_discounted_price);
+            CREATE INDEX idx_products_rating ON products(num_rating);
+            CREATE INDEX idx_products_discount ON products(num_discount_percentage);
+            CREATE INDEX idx_reviews_product_id ON reviews(product_id);
+        """)
+
+    @classmethod
+    def import_csv(cls, csv_path: str = None, db_path: str = None) -> 'SQLiteRepository':
+        """Build a new catalog database from a catalog CSV (replacing an existing one)"""
+        csv_path = csv_path or DEFAULT_CSV_PATH
+        db_path = str(db_path or DEFAULT_DB_PATH)
+        raw = load_catalog(csv_path)
+        products, reviews = split_reviews(raw)
+
+        tmp_path = db_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path, isolation_level=None)
+        try:
+            cls._create_schema(conn, list(raw.columns))
+            product_columns = list(products.columns)
+            values = {col: products[col].tolist() for col in product_columns}
+            for col, dtype in NUMERIC_COLUMNS.items():
+                if col in products.columns:
+                    values[f'num_{col}'] = parse_numeric(products[col], dtype).tolist()
+            values['main_product'] = StaticFeatures().main_product(products['category']).tolist() \
+                if 'category' in products.columns else [0] * len(products)
+            names = list(values)
+            placeholders = ', '.join('?' * len(names))
+            conn.execute('BEGIN')
+            conn.executemany(
+                f'INSERT INTO products ({", ".join(_quote(n) for n in names)}) VALUES ({placeholders})',
+                ([_plain(v) for v in row] for row in zip(*(values[n] for n in names))),
+            )
+            review_columns = [col for col in ['product_id'] + REVIEW_COLUMNS if col in reviews.columns]
+            conn.executemany(
+                f'INSERT INTO reviews ({", ".join(review_columns)}) VALUES ({", ".join("?" * len(review_columns))})',
+                ([_plain(v) for v in row] for row in zip(*(reviews[c].tolist() for c in review_columns))),
+            )
+            conn.execute('COMMIT')
+            cls._create_indexes(conn)
+            conn.execute('PRAGMA journal_mode=WAL')
+        finally:
+            conn.close()
+        os.replace(tmp_path, db_path)
+        return cls(db_path)
+
+    # -- reads --------------------------------------------------------------
+
+    @property
+    def version_id(self) -> int:
+        """Incremented by every admin write"""
+        return int(self._meta('version'))
+
+    def pinned(self) -> 'SQLiteRepository':
+        """Each read runs in one SQLite read transaction, which already sees a
+        single consistent state, so there is nothing to pin"""
+        return self
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The product table as a DataFrame (for code that scans the whole catalog)"""
+        return pd.read_sql_query(f'SELECT {self._select_list()} FROM products ORDER BY rowid', self._conn)
+
+    @property
+    def product_fields(self) -> List[str]:
+        """Columns of the product table (what fields= projections may name)"""
+        return list(self._product_columns)
+
+    def _select_list(self, fields: List[str] = None) -> str:
+        return ', '.join(_quote(col) for col in (self._product_columns if fields is None else fields))
+
+    def _records(self, sql: str, params=()) -> List[dict]:
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def get_all_products(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        """Get all products with pagination"""
+        return self._records(f'SELECT {self._select_list()} FROM products ORDER BY rowid LIMIT ? OFFSET ?',
+                             (limit, offset))
+
+    def get_product_by_id(self, product_id: str, fields: List[str] = None) -> Optional[dict]:
+        """Get a single product by ID (only the given fields, if any)"""
+        records = self._records(
+            f'SELECT {self._select_list(fields)} FROM products WHERE product_id = ? ORDER BY rowid LIMIT 1',
+            (product_id,))
+        return records[0] if records else None
+
+    def get_products_by_ids(self, product_ids: List[str], fields: List[str] = None) -> List[dict]:
+        """Get multiple products by their IDs, in catalog order (only the given fields, if any)"""
+        ids = list(dict.fromkeys(product_ids or []))
+        rows = []
+        for start in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[start:start + _MAX_PARAMS]
+            rows += self._conn.execute(
+                f'SELECT rowid AS _rowid, {self._select_list(fields)} FROM products '
+                f'WHERE product_id IN ({", ".join("?" * len(chunk))})', chunk).fetchall()
+        rows.sort(key=lambda row: row['_rowid'])
+        return [{key: row[key] for key in row.keys() if key != '_rowid'} for row in rows]
+
+    def get_reviews(self, product_id: str, limit: int = 10, offset: int = 0) -> tuple[List[dict], int]:
+        """Get one page of a product's reviews and the product's total review count"""
+        conn = self._conn
+        conn.execute('BEGIN')
+        try:
+            total = conn.execute('SELECT COUNT(*) FROM reviews WHERE product_id = ?', (product_id,)).fetchone()[0]
+            page = self._records('SELECT * FROM reviews WHERE product_id = ? ORDER BY rowid LIMIT ? OFFSET ?',
+                                 (product_id, limit, offset))
+        finally:
+            conn.execute('COMMIT')
+        return page, total
+
+    def search_products(self,
+                       query: str = None,
+                       category: str = None,
+                       min_rating: float = None,
+                       max_rating: float = None,
+                       min_price: float = None,
+                       max_price: float = None,
+                       min_discount: float = None,
+                       limit: int = 100,
+                       offset: int = 0,
+                       return_total: bool = False,
+                       rank: str = None,
+                       cursor: str = None,
+                       return_cursor: bool = False,
+                       fuzzy: bool = False,
+                       as_frame: bool = False,
+                       fields: List[str] = None) -> List[dict] | pd.DataFrame | tuple:
+        """Search products with filters; same arguments and ordering as CSVRepository.search_products.
+
+        'relevance' computes the FlagRanker weights in SQL. 'bm25' uses FTS5's
+        built-in bm25() with the same field weights; it scores trigrams rather
+        than words, so its order can differ from ranking.BM25Ranker.
+        A cursor always resumes by its sort key (rowids are stable here), so
+        pages never rescan the rows before it.
+        Fuzzy search is not supported (raises ValueError): FTS5 trigrams only
+        answer substring queries, not similarity.
+        """
+        if fuzzy and query:
+            raise ValueError("Fuzzy search is not supported by the SQLite catalog backend")
+        ranker = get_ranker(rank) if query else None
+        key = search_key(query, category, min_rating, max_rating, min_price, max_price, min_discount,
+                         ranker.name if ranker else None)
+        resume = decode_cursor(cursor, key) if cursor else None
+
+        source, score, params = self._search_source(query, category, min_rating, max_rating,
+                                                    min_price, max_price, min_discount, ranker)
+        # product_id is always selected: it is the last sort key and the cursor's tie-break
+        selected = self._product_columns if fields is None else fields
+        internal = ('_relevance', '_rating', '_rowid') + (() if 'product_id' in selected else ('product_id',))
+        columns = ', '.join(f'p.{_quote(col)}' for col in dict.fromkeys([*selected, 'product_id']))
+        order = '_relevance DESC, _rating DESC, product_id' if query else '_rowid'
+
+        # Keyset pagination: continue after the cursor's sort key
+        after = ''
+        if resume is not None:
+            offset = 0
+            if query:
+                after = ('WHERE _relevance < :c_score OR _relevance = :c_score AND '
+                         '(_rating < :c_rating OR _rating = :c_rating AND product_id > :c_id)')
+                params.update(c_score=resume.score or 0.0, c_id=resume.product_id,
+                              c_rating=_NO_RATING if resume.rating is None else resume.rating)
+            else:
+                after = 'WHERE _rowid > :c_rowid'
+                params['c_rowid'] = resume.position
+        params.update(limit=limit, offset=offset, no_rating=_NO_RATING)
+
+        conn = self._conn
+        conn.execute('BEGIN')
+        try:
+            rows = self._records(
+                f'SELECT * FROM (SELECT {columns}, {score} AS _relevance, '
+                f'ifnull(p.num_rating, :no_rating) AS _rating, p.rowid AS _rowid {source}) {after} '
+                f'ORDER BY {order} LIMIT :limit OFFSET :offset', params)
+            need_total = return_total or return_cursor
+            total_count = conn.execute(f'SELECT COUNT(*) {source}', params).fetchone()[0] if need_total else None
+            version_id = int(self._meta('version'))
+        finally:
+            conn.execute('COMMIT')
+        results = [{k: v for k, v in row.items() if k not in internal} for row in rows]
+        if as_frame:
+            results = pd.DataFrame(results, columns=selected, dtype=object)
+
+        output = (results,)
+        if return_total:
+            output += (total_count,)
+        if return_cursor:
+            served = (resume.served if resume else offset) + len(rows)
+            next_cursor = None
+            if rows and served < total_count:
+                last = rows[-1]
+                next_cursor = encode_cursor(SearchCursor(
+                    version=version_id, served=served, product_id=str(last.get('product_id')),
+                    position=last['_rowid'], score=last['_relevance'] if query else None,
+                    rating=None if last['_rating'] == _NO_RATING else last['_rating'],
+                ), key)
+            output += (next_cursor,)
+        return output if len(output) > 1 else results
+
+    format_for_display = CSVRepository.format_for_display
+
+    def _search_source(self, query, category, min_rating, max_rating, min_price, max_price, min_discount,
+                       ranker) -> tuple[str, str, dict]:
+        """FROM/WHERE clause matching a search, its relevance expression and parameters"""
+        joins, where, params = '', [], {}
+        score = '0'
+        if query:
+            params['needle'] = query.lower()
+            params['word'] = r'\b' + re.escape(query) + r'\b'
+            contains = {
+                field: f"instr(lower(ifnull(p.{field}, '')), :needle) > 0"
+                for field in ('product_name', 'category', 'about_product')
+            }
+            if len(query) >= _MIN_FTS_QUERY:
+                joins = 'JOIN products_fts ON products_fts.rowid = p.rowid'
+                where.append('products_fts MATCH :fts')
+                params['fts'] = '"' + query.replace('"', '""') + '"'
+            else:
+                where.append('(' + ' OR '.join(contains.values()) + ')')
+            if ranker.name == 'bm25' and joins:
+                score = '-bm25(products_fts, 3.0, 2.0, 1.0) + 0.25 * p.main_product'
+            else:
+                score = (
+                    f"(p.product_name REGEXP :word) * 10 + ({contains['product_name']}) * 3 + "
+                    f"(p.category REGEXP :word) * 5 + ({contains['category']}) * 2 + "
+                    f"({contains['about_product']}) + p.main_product * 5"
+                )
+
+        if category:
+            where.append('p.category REGEXP :category')
+            params['category'] = category
+        for value, condition in (
+            (min_rating, 'p.num_rating >= :min_rating'),
+            (max_rating, 'p.num_rating <= :max_rating'),
+            (min_price, 'p.num_discounted_price >= :min_price'),
+            (max_price, 'p.num_discounted_price <= :max_price'),
+            (min_discount, 'p.num_discount_percentage >= :min_discount'),
+        ):
+            if value is not None:
+                where.append(condition)
+                params[condition.rsplit(':', 1)[1]] = value
+
+        source = f'FROM products p {joins} ' + (f'WHERE {" AND ".join(where)}' if where else '')
+        return source, score, params
+
+    def facet_counts(self,
+                     query: str = None,
+                     category: str = None,
+                     min_rating: float = None,
+                     max_rating: float = None,
+                     min_price: float = None,
+                     max_price: float = None,
+                     min_discount: float = None) -> dict:
+        """Facet counts of a search; same arguments and result as CSVRepository.facet_counts"""
+        version_id = self.version_id
+        key = search_key(query, category, min_rating, max_rating, min_price, max_price, min_discount)
+        facets = self.facet_cache.get(version_id, key)
+        if facets is None:
+            source, _, params = self._search_source(query, category, min_rating, max_rating,
+                                                    min_price, max_price, min_discount,
+                                                    get_ranker(None) if query else None)
+            rows = pd.read_sql_query(
+                f'SELECT p.category, p.num_discounted_price, p.num_rating, p.num_discount_percentage {source}',
+                self._conn, params=params)
+            codes = FacetCodes(rows['category'], rows['num_discounted_price'].to_numpy(dtype=np.float64),
+                               rows['num_rating'].to_numpy(dtype=np.float64),
+                               rows['num_discount_percentage'].to_numpy(dtype=np.float64))
+            facets = codes.count()
+            self.facet_cache.put(version_id, key, facets)
+        return facets
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+        """Typeahead suggestions; the index is rebuilt from the table when the version changes"""
+        version_id = self.version_id
+        cached = self._suggest_index
+        if cached is None or cached[0] != version_id:
+            rows = pd.read_sql_query('SELECT product_id, product_name, category, num_rating_count FROM products '
+                                     'ORDER BY rowid', self._conn)
+            cached = (version_id, SuggestIndex(rows, rows['num_rating_count'].fillna(0).to_numpy()))
+            self._suggest_index = cached
+        return cached[1].suggest(prefix, limit)
+
+    def _recommend_source(self) -> tuple:
+        """In-memory text index over the table, rebuilt when the version changes"""
+        version_id = self.version_id
+        cached = self._text_index
+        if cached is None or cached[0] != version_id:
+            rows = pd.read_sql_query('SELECT product_id, product_name, category, about_product, num_rating '
+                                     'FROM products ORDER BY rowid', self._conn)
+            ids = rows['product_id'].astype(str).to_numpy()
+            id_ranks = np.empty(len(ids), dtype=np.int64)
+            id_ranks[np.argsort(ids, kind='stable')] = np.arange(len(ids))
+            cached = (version_id, InvertedIndex(rows), ids,
+                      rows['num_rating'].to_numpy(dtype=np.float64), id_ranks)
+            self._text_index = cached
+        return cached[1:]
+
+    def recommend(self, query: str, limit: int = 10) -> tuple[List[dict], int]:
+        """Recommendations for a query; same result as CSVRepository.recommend"""
+        index, ids, ratings, id_ranks = self._recommend_source()
+        scores = keyword_scores(index, query)
+        matches = np.flatnonzero(scores > 0)
+        scores = np.round(scores[matches], 2)
+        order = top_k(limit, scores, ratings[matches], id_ranks[matches])
+        products = self._products_in_order(ids[matches[order]].tolist())
+        items = [{**product, 'score': score} for product, score in zip(products, scores[order].tolist())]
+        return items, len(matches)
+
+    def _similar_source(self) -> tuple:
+        """Similar-products index over the table, rebuilt when the version changes
+        (in memory only; the CSV backend is the one that saves it)"""
+        index, ids, _, _ = self._recommend_source()
+        version_id = self.version_id
+        cached = self._similar_index
+        if cached is None or cached[0] != version_id:
+            cached = self._similar_index = (version_id, SimilarIndex.build(index))
+        return cached[1], ids
+
+    def _products_in_order(self, product_ids: List[str], fields: List[str] = None) -> List[dict]:
+        """get_products_by_ids, but in the order of product_ids"""
+        projection = FieldProjection(fields)
+        found = {product['product_id']: product for product in self.get_products_by_ids(product_ids, projection.read)}
+        return [projection.apply(found[product_id]) for product_id in product_ids]
+
+    def similar_to_text(self, text: str, limit: int = 10, fields: List[str] = None) -> List[dict]:
+        """Products whose text is most like text; same result as CSVRepository.similar_to_text"""
+        index, ids = self._similar_source()
+        positions, similarities = index.search(index.text_vector({'text': text}), limit)
+        records = self._products_in_order(ids[positions].tolist(), catalog_fields(fields))
+        return with_similarity(records, similarities, fields)
+
+    def similar_to_product(self, product_id: str, limit: int = 10,
+                           fields: List[str] = None) -> Optional[List[dict]]:
+        """Products whose text is most like that of product_id (None if it is unknown)"""
+        index, ids = self._similar_source()
+        positions = np.flatnonzero(ids == product_id)
+        if not len(positions):
+            return None
+        found, similarities = index.search(index.vectors[positions[0]], limit + len(positions), exclude=positions[0])
+        keep = ~np.isin(found, positions)
+        records = self._products_in_order(ids[found[keep][:limit]].tolist(), catalog_fields(fields))
+        return with_similarity(records, similarities[keep][:limit], fields)
+
+    def get_related_products(self, product_id: str, limit: int = 4, fields: List[str] = None) -> List[dict]:
+        """Get related products based on category (only the given fields, if any)"""
+        product = self.get_product_by_id(product_id, ['category'])
+        if not product:
+            return []
+        return self._records(
+            f'SELECT {self._select_list(fields)} FROM products WHERE category = ? AND product_id != ? '
+            f'ORDER BY rowid LIMIT ?', (product.get('category'), product_id, limit))
+
+    def get_categories(self) -> List[str]:
+        """Get unique categories, in order of first appearance"""
+        rows = self._conn.execute('SELECT category FROM products GROUP BY category ORDER BY MIN(rowid)')
+        return [row[0] for row in rows]
+
+    # -- admin writes -------------------------------------------------------
+
+    def _ensure_columns(self, conn: sqlite3.Connection, names):
+        """Add product columns that the catalog has not seen yet (like a new DataFrame column)"""
+        for name in names:
+            if name not in self._product_columns and name not in REVIEW_COLUMNS:
+                conn.execute(f'ALTER TABLE products ADD COLUMN {_quote(name)}')
+                self._product_columns.append(name)
+                self._columns.append(name)
+                conn.execute("UPDATE catalog_meta SET value = ? WHERE key = 'columns'", (json.dumps(self._columns),))
+
+    @staticmethod
+    def _derived(values: dict) -> dict:
+        """num_* and main_product values for a product's raw fields"""
+        derived = {}
+        for col, dtype in NUMERIC_COLUMNS.items():
+            if col in values:
+                derived[f'num_{col}'] = _plain(parse_numeric(pd.Series([values[col]]), dtype)[0])
+        if 'category' in values:
+            derived['main_product'] = int(StaticFeatures().main_product(pd.Series([values['category']], dtype=object))[0])
+        return derived
+
+    def _bump_version(self, conn: sqlite3.Connection):
+        conn.execute("UPDATE catalog_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+
+    def add_product(self, product_data: dict) -> dict:
+        """Add a new product"""
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Generate new product_id if not provided: one past the highest
+                # numeric P-suffix in use (as CatalogVersion.next_product_id)
+                if 'product_id' not in product_data or not product_data['product_id']:
+                    highest = conn.execute(
+                        "SELECT MAX(CAST(SUBSTR(product_id, 2) AS INTEGER)) FROM products "
+                        "WHERE product_id GLOB 'P[0-9]*' AND SUBSTR(product_id, 2) NOT GLOB '*[^0-9]*'"
+                    ).fetchone()[0]
+                    product_data['product_id'] = f"P{(highest or 0) + 1:08d}"
+                elif conn.execute('SELECT 1 FROM products WHERE product_id = ?',
+                                  (_plain(product_data['product_id']),)).fetchone():
+                    raise Conflict(f"Product {product_data['product_id']} already exists")
+
+                product_row = {key: _plain(value) for key, value in product_data.items() if key not in REVIEW_COLUMNS}
+                self._ensure_columns(conn, product_row)
+                product_row.update(self._derived(product_row))
+                conn.execute(
+                    f'INSERT INTO products ({", ".join(_quote(k) for k in product_row)}) '
+                    f'VALUES ({", ".join("?" * len(product_row))})', list(product_row.values()))
+
+                review_data = {key: _plain(product_data[key]) for key in REVIEW_COLUMNS
+                               if product_data.get(key) is not None}
+                if review_data:
+                    review_row = {'product_id': product_data['product_id'], **review_data}
+                    conn.execute(
+                        f'INSERT INTO reviews ({", ".join(review_row)}) VALUES ({", ".join("?" * len(review_row))})',
+                        list(review_row.values()))
+                self._bump_version(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            return product_data
+
+    def update_product(self, product_id: str, update_data: dict) -> Optional[dict]:
+        """Update an existing product"""
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT rowid FROM products WHERE product_id = ? ORDER BY rowid LIMIT 1',
+                                   (product_id,)).fetchone()
+                if row is None:
+                    conn.execute('ROLLBACK')
+                    return None
+                # Update only provided fields that are catalog columns
+                changes = {key: _plain(value) for key, value in update_data.items()
+                           if value is not None and key in self._product_columns}
+                changes.update(self._derived(changes))
+                if changes:
+                    assignments = ', '.join(f'{_quote(key)} = ?' for key in changes)
+                    conn.execute(f'UPDATE products SET {assignments} WHERE rowid = ?',
+                                 list(changes.values()) + [row['rowid']])
+                self._bump_version(conn)
+                updated = dict(conn.execute(f'SELECT {self._select_list()} FROM products WHERE rowid = ?',
+                                            (row['rowid'],)).fetchone())
+                conn.execute('COMMIT')
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            return updated
+
+    def delete_product(self, product_id: str) -> bool:
+        """Delete a product and its reviews"""
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                deleted = conn.execute('DELETE FROM products WHERE product_id = ?', (product_id,)).rowcount
+                if deleted:
+                    conn.execute('DELETE FROM reviews WHERE product_id = ?', (product_id,))
+                    self._bump_version(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            return bool(deleted)
+
+
+_shared_repos: dict = {}
+_shared_repos_lock = threading.Lock()
+
+
+def get_shared_sqlite_repository(db_path: str = None, csv_path: str = None) -> SQLiteRepository:
+    """Return the shared SQLite repository for db_path, importing csv_path
+    (default data/amazon.csv) first if the database does not exist yet"""
+    key = str(db_path or DEFAULT_DB_PATH)
+    with _shared_repos_lock:
+        repo = _shared_repos.get(key)
+        if repo is None:
+            if Path(key).exists():
+                repo = SQLiteRepository(key)
+            else:
+                repo = SQLiteRepository.import_csv(csv_path, key)
+            _shared_repos[key] = repo
+        return repo
+
+
+def reset_shared_sqlite_repositories():
+    """Drop all shared SQLite repositories (used by tests)"""
+    with _shared_repos_lock:
+        _shared_repos.clear()
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Import a catalog CSV into a SQLite catalog database')
+    parser.add_argument('csv_path', nargs='?', default=str(DEFAULT_CSV_PATH))
+    parser.add_argument('db_path', nargs='?', default=str(DEFAULT_DB_PATH))
+    args = parser.parse_args()
+    start = time.perf_counter()
+    imported = SQLiteRepository.import_csv(args.csv_path, args.db_path)
+    count = imported._conn.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+    print(f"Imported {count} products into {args.db_path} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,181 @@
+"""Prefix index for search-box typeahead.
+
+Suggestions are product names and category terms (the '|' separated parts
+of the category path), weighted by rating_count: a product name by its own
+count, a category term by the total count of its products.
+
+Terms are numbered best first (highest weight, then alphabetically), so the
+best N terms of any candidate set are simply its N smallest ids. Every word
+of a term maps to the term ids containing it; words are kept sorted, so the
+words starting with a prefix form one contiguous block of the vocabulary.
+A single-word prefix is answered from the best MAX_SUGGESTIONS terms of each
+word in its block (precomputed for prefixes of up to PRECOMPUTED_PREFIX
+characters, whose blocks are the largest). A multi-word prefix walks the
+terms of its rarest complete word best first and keeps those that contain
+the other words, stopping once it has enough.
+"""
+import re
+from bisect import bisect_left
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from .text_index import TOKEN_PATTERN, tokenize
+
+MAX_SUGGESTIONS = 10
+PRECOMPUTED_PREFIX = 2
+
+# "SmartTelevisions" -> "Smart Televisions", "USBCables" -> "USB Cables"
+_CAMEL_CASE = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+
+class SuggestIndex:
+    """Weighted prefix index over product names and category terms"""
+
+    def __init__(self, df: pd.DataFrame, rating_counts: np.ndarray):
+        weights = pd.Series(np.asarray(rating_counts, dtype=np.int64), index=df.index)
+        terms = []
+        if 'product_name' in df.columns:
+            names = pd.DataFrame({
+                'text': df['product_name'].astype('string').str.strip(),
+                'weight': weights,
+                'product_id': df['product_id'].astype(str) if 'product_id' in df.columns else None,
+            }).dropna(subset=['text'])
+            names = names[names['text'] != '']
+            # A name shared by several listings is suggested once, for its most reviewed one
+            names = names.sort_values('weight', ascending=False, kind='stable')
+            names = names.drop_duplicates(subset='text')
+            names['type'] = 'product'
+            terms.append(names)
+        if 'category' in df.columns:
+            parts = pd.DataFrame({'text': df['category'].astype('string').str.split('|'), 'weight': weights})
+            parts = parts.explode('text').dropna(subset=['text'])
+            parts['text'] = parts['text'].str.strip()
+            parts = parts[parts['text'] != '']
+            categories = parts.groupby('text', sort=False)['weight'].sum().reset_index()
+            categories['product_id'] = None
+            categories['type'] = 'category'
+            terms.append(categories)
+
+        terms = pd.concat(terms, ignore_index=True) if terms else \
+            pd.DataFrame(columns=['text', 'weight', 'product_id', 'type'])
+        # Term id == rank: best weight first, then alphabetical
+        terms = terms.assign(_key=terms['text'].str.lower()).sort_values(
+            ['weight', '_key'], ascending=[False, True], kind='stable')
+        self.texts = terms['text'].tolist()
+        self.types = terms['type'].tolist()
+        self.product_ids = terms['product_id'].tolist()
+        self.weights = terms['weight'].to_numpy(dtype=np.int64)
+
+        # word <-> term pairs as two CSR tables: word -> ascending term ids, term -> ascending word ids
+        texts = pd.Series(self.texts, dtype=object)
+        words = pd.concat([texts.str.lower().str.findall(TOKEN_PATTERN).explode(),
+                           texts.str.replace(_CAMEL_CASE, ' ', regex=True).str.lower()
+                           .str.findall(TOKEN_PATTERN).explode()]).dropna()
+        words = words[~pd.DataFrame({'term': words.index, 'word': words.to_numpy()}).duplicated().to_numpy()]
+        pair_words = pd.Categorical(words.to_numpy(dtype=object))
+        self.vocabulary: List[str] = list(pair_words.categories)  # sorted
+        word_ids = pair_words.codes.astype(np.int32)
+        term_ids = words.index.to_numpy(dtype=np.int32)
+        by_word = np.lexsort((term_ids, word_ids))
+        self.postings = term_ids[by_word]
+        self.offsets = np.searchsorted(word_ids[by_word], np.arange(len(self.vocabulary) + 1))
+        by_term = np.lexsort((word_ids, term_ids))
+        self.term_words = word_ids[by_term]
+        self.term_offsets = np.searchsorted(term_ids[by_term], np.arange(len(self.texts) + 1))
+
+        # The best MAX_SUGGESTIONS terms of each word (padded with len(self)), enough to answer
+        # a single-word prefix from the words it covers
+        self.heads = np.full((len(self.vocabulary), MAX_SUGGESTIONS), len(self.texts), dtype=np.int32)
+        lengths = np.minimum(np.diff(self.offsets), MAX_SUGGESTIONS)
+        rows = np.repeat(np.arange(len(self.vocabulary)), lengths)
+        columns = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        self.heads[rows, columns] = self.postings[self.offsets[rows] + columns]
+
+        self._precomputed = {}
+        prefixes = {word[:length] for word in self.vocabulary for length in range(1, PRECOMPUTED_PREFIX + 1)}
+        for prefix in prefixes:
+            self._precomputed[prefix] = self._prefix_head(*self._word_range(prefix))
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _word_range(self, prefix: str) -> tuple[int, int]:
+        """Ids [lo, hi) of the vocabulary words starting with prefix"""
+        lo = bisect_left(self.vocabulary, prefix)
+        return lo, bisect_left(self.vocabulary, prefix + '\uffff', lo)
+
+    def _prefix_head(self, lo: int, hi: int) -> np.ndarray:
+        """Best MAX_SUGGESTIONS terms with a word in [lo, hi)"""
+        terms = np.unique(self.heads[lo:hi])[:MAX_SUGGESTIONS]
+        return terms[terms < len(self.texts)]
+
+    def _word_terms(self, word: str) -> Optional[np.ndarray]:
+        """Ascending ids of the terms containing word (None if no term does)"""
+        lo, hi = self._word_range(word)
+        if lo == hi or self.vocabulary[lo] != word:
+            return None
+        return self.postings[self.offsets[lo]:self.offsets[lo + 1]]
+
+    def _has_word_in(self, terms: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        """For each term, whether one of its words has an id in [lo, hi)"""
+        starts, ends = self.term_offsets[terms], self.term_offsets[terms + 1]
+        lengths = ends - starts
+        flat = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        words = self.term_words[flat]
+        inside = ((words >= lo) & (words < hi)).astype(np.int32)
+        return np.add.reduceat(inside, np.cumsum(lengths) - lengths) > 0
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+        """Best terms matching prefix: every complete word of it, and a word
+        starting with its last word"""
+        words = tokenize(prefix)
+        if not words or limit <= 0:
+            return []
+        if prefix[-1:].isspace() or not prefix[-1:].isalnum():
+            # The last word is complete too
+            complete, partial = words, None
+        else:
+            complete, partial = words[:-1], words[-1]
+
+        limit = min(limit, MAX_SUGGESTIONS)
+        if not complete:
+            terms = self._precomputed.get(partial)
+            if terms is None:
+                terms = self._prefix_head(*self._word_range(partial))
+        else:
+            # Walk the rarest complete word's terms best first, in growing chunks,
+            # until enough of them also contain the other words
+            postings = [self._word_terms(word) for word in complete]
+            if any(terms is None for terms in postings):
+                return []
+            word_range = self._word_range(partial) if partial is not None else None
+            if word_range is not None:
+                lo, hi = word_range
+                if self.offsets[hi] - self.offsets[lo] <= min(map(len, postings)):
+                    # Few terms start a word with the partial word: intersect with them instead
+                    postings.append(np.unique(self.postings[self.offsets[lo]:self.offsets[hi]]))
+                    word_range = None
+            postings.sort(key=len)
+            driver, others = postings[0], postings[1:]
+            found, start, chunk = [], 0, 4 * limit
+            while start < len(driver) and sum(map(len, found)) < limit:
+                candidates = driver[start:start + chunk]
+                keep = np.ones(len(candidates), dtype=bool)
+                for other in others:
+                    at = np.searchsorted(other, candidates)
+                    keep &= other[np.minimum(at, len(other) - 1)] == candidates
+                if word_range is not None and keep.any():
+                    keep[keep] = self._has_word_in(candidates[keep], *word_range)
+                found.append(candidates[keep])
+                start += chunk
+                chunk *= 2
+            terms = np.concatenate(found) if found else np.zeros(0, dtype=np.int32)
+        return [
+            {
+                'text': self.texts[term],
+                'type': self.types[term],
+                'product_id': self.product_ids[term],
+                'weight': int(self.weights[term]),
+            }
+            for term in terms[:limit]
+        ]
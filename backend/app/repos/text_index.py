@@ -0,0 +1,298 @@
+import copy
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .trigram_index import TrigramIndex
+
+# Same notion of a "word" as the \b anchors the search used to run
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Searchable columns and the tag each posting carries
+TEXT_FIELDS = ('product_name', 'category', 'about_product')
+
+# Columns whose words typo-tolerant (fuzzy) search compares against
+FUZZY_FIELDS = ('product_name', 'category')
+
+# Query fragments whose matching vocabulary tokens are remembered (LRU)
+SUBSTRING_CACHE_SIZE = 1024
+
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase word tokens of a single value (NaN/None -> no tokens)"""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class InvertedIndex:
+    """token -> {field: sorted row positions} over the catalog text columns.
+
+    Each posting list has a parallel term-frequency array, and per-field
+    document lengths are kept so rankers (BM25) can score without re-reading
+    the text.
+
+    Matching keeps the semantics of the old str.contains scans:
+      * match(query) is a case-insensitive substring test per field
+      * exact_word(query) is the case-insensitive \\bquery\\b test per field
+
+    A query that is a single word is answered from postings alone: a word can
+    only occur inside one token, so the vocabulary tokens containing it give the
+    exact answer. Other queries (phrases, punctuation) use postings
+    intersections to find candidates and verify only those rows.
+
+    add_row/remove_row never modify a posting array or token entry in place,
+    so fork() only has to copy the top-level maps: the repository edits the
+    fork while readers keep using the published index.
+    """
+
+    def __init__(self, frame: pd.DataFrame, fields: Iterable[str] = TEXT_FIELDS):
+        self.fields = tuple(fields)
+        self._frame = frame
+        self._size = len(frame)
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {}
+        self._frequencies: Dict[str, Dict[str, np.ndarray]] = {}
+        self.lengths: Dict[str, np.ndarray] = {field: np.zeros(self._size, dtype=np.int32) for field in self.fields}
+        self._substring_cache: OrderedDict = OrderedDict()
+        self._vocabulary: Optional[List[str]] = None
+        self._trigrams: Optional[TrigramIndex] = None
+        for field in self.fields:
+            if field in frame.columns:
+                self._index_column(field, frame[field])
+
+    @property
+    def size(self) -> int:
+        """Number of catalog rows covered by the index"""
+        return self._size
+
+    def _index_column(self, field: str, values: pd.Series):
+        """Tokenize a whole column in one vectorized pass and add its postings"""
+        tokens = values.astype('string').str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+        if tokens.empty:
+            return
+        rows = tokens.index.to_numpy(dtype=np.int64)
+        self.lengths[field] = np.bincount(rows, minlength=self._size).astype(np.int32)
+        codes, uniques = pd.factorize(tokens.to_numpy())
+        # One sortable key per (token, row): unique() groups by token, then by
+        # row, and its counts are the term frequencies
+        keys, counts = np.unique(codes.astype(np.int64) * self._size + rows, return_counts=True)
+        token_codes = keys // self._size
+        bounds = np.flatnonzero(np.diff(token_codes)) + 1
+        starts = np.concatenate(([0], bounds))
+        row_groups = np.split((keys % self._size).astype(np.int32), bounds)
+        count_groups = np.split(counts.astype(np.int32), bounds)
+        for start, token_rows, token_counts in zip(starts, row_groups, count_groups):
+            token = uniques[token_codes[start]]
+            self._postings.setdefault(token, {})[field] = token_rows
+            self._frequencies.setdefault(token, {})[field] = token_counts
+
+    # -- maintenance -------------------------------------------------------
+
+    def fork(self) -> 'InvertedIndex':
+        """Copy that can be edited without affecting this index"""
+        forked = copy.copy(self)
+        forked._postings = dict(self._postings)
+        forked._frequencies = dict(self._frequencies)
+        forked.lengths = {field: lengths.copy() for field, lengths in self.lengths.items()}
+        return forked
+
+    def _invalidate_vocabulary(self):
+        # Replace rather than clear: a fork may still share the old cache
+        self._vocabulary = None
+        self._substring_cache = OrderedDict()
+
+    def add_row(self, position: int, row: dict, frame: pd.DataFrame):
+        """Index a row appended at position; frame is the catalog including it"""
+        self._frame = frame
+        if len(frame) > self._size:
+            grow = len(frame) - self._size
+            for field in self.fields:
+                self.lengths[field] = np.concatenate((self.lengths[field], np.zeros(grow, dtype=np.int32)))
+        self._size = len(frame)
+        for field in self.fields:
+            tokens = tokenize(row.get(field))
+            self.lengths[field][position] = len(tokens)
+            for token, count in Counter(tokens).items():
+                if field in FUZZY_FIELDS and field not in self._postings.get(token, {}):
+                    # New fuzzy vocabulary word; removed words need no rebuild
+                    # since their postings are empty
+                    self._trigrams = None
+                postings = self._postings[token] = dict(self._postings.get(token, {}))
+                frequencies = self._frequencies[token] = dict(self._frequencies.get(token, {}))
+                current = postings.get(field, _EMPTY)
+                at = np.searchsorted(current, position)
+                postings[field] = np.insert(current, at, position).astype(np.int32)
+                frequencies[field] = np.insert(frequencies.get(field, _EMPTY), at, count).astype(np.int32)
+        self._invalidate_vocabulary()
+
+    def remove_row(self, position: int, row: dict):
+        """Drop the postings of a row's old values (before it is edited)"""
+        for field in self.fields:
+            self.lengths[field][position] = 0
+            for token in set(tokenize(row.get(field))):
+                postings = self._postings.get(token)
+                if not postings or field not in postings:
+                    continue
+                keep = postings[field] != position
+                if keep.all():
+                    continue
+                postings = self._postings[token] = dict(postings)
+                self._frequencies[token] = dict(self._frequencies[token])
+                if keep.any():
+                    postings[field] = postings[field][keep]
+                    self._frequencies[token][field] = self._frequencies[token][field][keep]
+                else:
+                    del postings[field]
+                    del self._frequencies[token][field]
+                    if not postings:
+                        del self._postings[token]
+                        del self._frequencies[token]
+        self._invalidate_vocabulary()
+
+    # -- term statistics ---------------------------------------------------
+
+    def term_postings(self, token: str, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(row positions, term frequencies) of token in field"""
+        postings = self._postings.get(token)
+        if not postings or field not in postings:
+            return _EMPTY, _EMPTY
+        return postings[field], self._frequencies[token][field]
+
+    def document_frequency(self, token: str) -> int:
+        """Number of rows containing token in any field"""
+        postings = self._postings.get(token)
+        if not postings:
+            return 0
+        if len(postings) == 1:
+            return len(next(iter(postings.values())))
+        return len(np.unique(np.concatenate(list(postings.values()))))
+
+    # -- lookups -----------------------------------------------------------
+
+    def _tokens_containing(self, fragment: str) -> List[str]:
+        """Vocabulary tokens that contain fragment (scan of the vocabulary, not the catalog)"""
+        cache = self._substring_cache
+        cached = cache.get(fragment)
+        if cached is not None:
+            try:
+                cache.move_to_end(fragment)
+            except KeyError:  # evicted by a concurrent reader
+                pass
+            return cached
+        if self._vocabulary is None:
+            self._vocabulary = list(self._postings)
+        matches = [token for token in self._vocabulary if fragment in token]
+        cache[fragment] = matches
+        while len(cache) > SUBSTRING_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+        return matches
+
+    @property
+    def trigrams(self) -> TrigramIndex:
+        """Trigram index over the words of FUZZY_FIELDS"""
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex(
+                token for token, postings in self._postings.items()
+                if any(field in postings for field in FUZZY_FIELDS))
+        return self._trigrams
+
+    def fuzzy_scores(self, query: str, fields: Iterable[str] = FUZZY_FIELDS) -> np.ndarray:
+        """Typo-tolerant match: per row, the mean over query words of the best
+        trigram similarity of a word in fields (0 where some query word has
+        no similar word in the row)"""
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        scores = np.zeros(self._size, dtype=np.float64)
+        if not query_tokens:
+            return scores
+        matched = np.ones(self._size, dtype=bool)
+        for token in query_tokens:
+            best = np.zeros(self._size, dtype=np.float64)
+            for word, similarity in self.trigrams.similar(token):
+                for field in fields:
+                    rows = self._postings.get(word, {}).get(field)
+                    if rows is not None:
+                        best[rows] = np.maximum(best[rows], similarity)
+            matched &= best > 0
+            scores += best
+        return np.where(matched, scores / len(query_tokens), 0.0)
+
+    def _mask(self, tokens: Iterable[str], field: str) -> np.ndarray:
+        mask = np.zeros(self._size, dtype=bool)
+        postings = [self._postings[token][field] for token in tokens if field in self._postings.get(token, {})]
+        if postings:
+            mask[np.concatenate(postings)] = True
+        return mask
+
+    def _candidates(self, query_tokens: List[str], field: str) -> np.ndarray:
+        """Rows whose field contains every query token as a substring of some word"""
+        mask = np.ones(self._size, dtype=bool)
+        for token in query_tokens:
+            mask &= self._mask(self._tokens_containing(token), field)
+        return mask
+
+    def _verify(self, candidates: np.ndarray, field: str, pattern: str, regex: bool) -> np.ndarray:
+        """Run the exact str.contains test on the candidate rows only"""
+        mask = np.zeros(self._size, dtype=bool)
+        rows = np.flatnonzero(candidates)
+        if len(rows) and field in self._frame.columns:
+            values = self._frame[field].iloc[rows].astype('string')
+            mask[rows] = values.str.contains(pattern, case=False, na=False, regex=regex).to_numpy(dtype=bool)
+        return mask
+
+    @staticmethod
+    def answers_from_postings(query: str) -> bool:
+        """True if match(query) reads postings only (a single word), so it costs
+        the same whichever rows are asked for"""
+        return bool(TOKEN_PATTERN.fullmatch(query.lower()))
+
+    def match(self, query: str, fields: Iterable[str] = None, rows: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """Case-insensitive substring match of query, as a boolean mask per field.
+
+        With rows, only those row positions are tested (the masks are False
+        elsewhere), so phrase queries verify just the surviving candidates.
+        """
+        fields = tuple(fields or self.fields)
+        needle = query.lower()
+        query_tokens = tokenize(needle)
+        if TOKEN_PATTERN.fullmatch(needle):
+            matching = self._tokens_containing(needle)
+            return {field: self._mask(matching, field) for field in fields}
+        allowed = np.ones(self._size, dtype=bool)
+        if rows is not None:
+            allowed = np.zeros(self._size, dtype=bool)
+            allowed[rows] = True
+        if not query_tokens:
+            # Nothing to look up (e.g. only punctuation): verify every allowed row
+            return {field: self._verify(allowed, field, query, regex=False) for field in fields}
+        return {
+            field: self._verify(self._candidates(query_tokens, field) & allowed, field, query, regex=False)
+            for field in fields
+        }
+
+    def exact_word(self, query: str, fields: Iterable[str] = None, rows: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """Case-insensitive whole-word (\\bquery\\b) match, as a boolean mask per field.
+
+        With rows, only those row positions are tested (the masks are False
+        elsewhere).
+        """
+        fields = tuple(fields or self.fields)
+        needle = query.lower()
+        if TOKEN_PATTERN.fullmatch(needle):
+            return {field: self._mask([needle], field) for field in fields}
+        pattern = r'\b' + re.escape(query) + r'\b'
+        query_tokens = tokenize(needle)
+        allowed = np.ones(self._size, dtype=bool)
+        if rows is not None:
+            allowed = np.zeros(self._size, dtype=bool)
+            allowed[rows] = True
+        result = {}
+        for field in fields:
+            candidates = self._candidates(query_tokens, field) & allowed if query_tokens else allowed
+            result[field] = self._verify(candidates, field, pattern, regex=True)
+        return result
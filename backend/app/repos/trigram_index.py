@@ -0,0 +1,63 @@
+"""Character trigram index over a vocabulary, for typo-tolerant search.
+
+Words are compared by the Jaccard similarity of their padded trigram sets
+(the pg_trgm measure): "hedphones" shares 8 of 13 distinct trigrams with
+"headphones" (0.62), "chargr" 5 of 10 with "charger" (0.5).
+
+The index maps each trigram to the ids of the vocabulary words containing
+it, so finding the words similar to a query word only touches the postings
+of that word's own trigrams: the cost depends on the vocabulary, never on
+the number of catalog rows.
+"""
+from typing import Iterable, List, Tuple
+import numpy as np
+
+# Same default as pg_trgm's similarity_threshold
+FUZZY_THRESHOLD = 0.3
+# Vocabulary words a single query word may expand to
+FUZZY_EXPANSIONS = 8
+
+
+def trigrams(word: str) -> set:
+    """Distinct trigrams of a word padded with two leading and one trailing space"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """trigram -> ids of the vocabulary words containing it"""
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = sorted(set(words))
+        codes = {}
+        pairs_gram, pairs_word = [], []
+        self.sizes = np.zeros(len(self.words), dtype=np.int32)
+        for word_id, word in enumerate(self.words):
+            grams = trigrams(word)
+            self.sizes[word_id] = len(grams)
+            for gram in grams:
+                pairs_gram.append(codes.setdefault(gram, len(codes)))
+                pairs_word.append(word_id)
+        self._codes = codes
+        gram_ids = np.asarray(pairs_gram, dtype=np.int32)
+        order = np.argsort(gram_ids, kind='stable')
+        self._postings = np.asarray(pairs_word, dtype=np.int32)[order]
+        self._offsets = np.searchsorted(gram_ids[order], np.arange(len(codes) + 1))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def similar(self, word: str, threshold: float = FUZZY_THRESHOLD,
+                limit: int = FUZZY_EXPANSIONS) -> List[Tuple[str, float]]:
+        """Vocabulary words with trigram similarity >= threshold to word, most similar first"""
+        grams = trigrams(word)
+        slices = [self._postings[self._offsets[code]:self._offsets[code + 1]]
+                  for code in (self._codes.get(gram) for gram in grams) if code is not None]
+        if not slices:
+            return []
+        word_ids, common = np.unique(np.concatenate(slices), return_counts=True)
+        similarity = common / (len(grams) + self.sizes[word_ids] - common)
+        keep = similarity >= threshold
+        word_ids, similarity = word_ids[keep], similarity[keep]
+        order = np.lexsort((word_ids, -similarity))[:limit]
+        return [(self.words[i], float(s)) for i, s in zip(word_ids[order], similarity[order])]
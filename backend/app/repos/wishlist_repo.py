@@ -4,12 +4,14 @@ from pathlib import Path
 import threading
 from typing import List, Optional
 from ..core.errors import NotFound
+from . import co_occurrence
+
+WISHLIST_FILE = Path(__file__).parent.parent.parent / "data" / "wishlists.csv"
 
 class WishlistRepo:
     def __init__(self, csv_path: str = None):
         if csv_path is None:
-            base_path = Path(__file__).parent.parent.parent
-            csv_path = base_path / "data" / "wishlists.csv"
+            csv_path = WISHLIST_FILE
         
         self.csv_path = Path(csv_path)
         self._lock = threading.RLock()
@@ -63,6 +65,7 @@ class WishlistRepo:
             new_row = pd.DataFrame([new_item])
             self.df = pd.concat([self.df, new_row], ignore_index=True)
             self._save()
+            co_occurrence.record(self.csv_path, user_id, product_id, held=True)
             
             return new_item
     
@@ -75,6 +78,7 @@ class WishlistRepo:
             
             if len(self.df) < initial_len:
                 self._save()
+                co_occurrence.record(self.csv_path, user_id, product_id, held=False)
                 return True
             return False
     
@@ -1,5 +1,6 @@
+from typing import List
 from app.repos.cart_repo import CartRepo
-from app.repos.csv_repo import CSVRepository
+from app.repos.csv_repo import CSVRepository, FieldProjection, get_shared_repository
 from app.models.dto import CartItemAddRequest
 
 class CartService:
@@ -10,7 +11,7 @@ class CartService:
         return {"user_id": request.user_id, "product_id": request.product_id}
 
     @staticmethod
-    def get_items(user_id: str):
+    def get_items(user_id: str, csv_repo: CSVRepository = None, fields: List[str] = None):
         cart_items = CartRepo.get_items(user_id)
         
         # If cart is empty, return empty list
@@ -18,17 +19,17 @@ class CartService:
             return []
         
         # Fetch full product details for each cart item
-        csv_repo = CSVRepository()
+        if csv_repo is None:
+            csv_repo = get_shared_repository()
+        projection = FieldProjection(fields, 'quantity')
         enriched_items = []
         
         for cart_item in cart_items:
             product_id = cart_item['product_id']
-            product = csv_repo.get_product_by_id(product_id)
+            product = csv_repo.get_product_by_id(product_id, projection.read)
             
-            if product:
-                # Add quantity to the product object
-                product['quantity'] = cart_item['quantity']
-                enriched_items.append(product)
+            if product is not None:
+                enriched_items.append(projection.apply(product, cart_item['quantity']))
         
         return enriched_items
 
@@ -1,14 +1,14 @@
-from ..repos.csv_repo import CSVRepository
+from ..repos.csv_repo import CSVRepository, get_shared_repository
 from ..models.dto import ExportSelectionRequest, ExportPayload, ItemOut
 
 
 class ExportService:
-    def __init__(self, db=None):
+    def __init__(self, db=None, repo: CSVRepository = None):
         """
         db parameter kept for backwards compatibility with tests.
-        Uses CSVRepository for actual data access.
+        Uses the shared CSVRepository unless a repo is injected.
         """
-        self.repo = CSVRepository()
+        self.repo = repo if repo is not None else get_shared_repository()
 
     def _prepare_ids(self, ids):
         return [str(id) for id in ids]
@@ -1,52 +1,38 @@
-from typing import List
-from ..repos.csv_repo import CSVRepository
+from typing import List, Tuple
+from ..repos.co_occurrence import get_co_occurrence_index
+from ..repos.csv_repo import CSVRepository, FieldProjection, get_shared_repository
 
-def recommend_items_for_query(query: str, limit: int = 10) -> tuple[List[dict], int]:
+def recommend_items_for_query(query: str, limit: int = 10, repo: CSVRepository = None) -> tuple[List[dict], int]:
+    """Top `limit` products for a query, each with its score, and the number of matching products
+    (scoring: ranking.keyword_scores)"""
     if not query or not query.strip():
         return [], 0
     
-    repo = CSVRepository()
-    query_lower = query.strip().lower()
-    query_tokens = set(query_lower.split())
-    
-    all_products = repo.df.to_dict('records')
-    scored_items = []
-    
-    for product in all_products:
-        score = 0.0
-        
-        product_name = str(product.get('product_name', '')).lower()
-        category = str(product.get('category', '')).lower()
-        description = str(product.get('about_product', '')).lower()
-        
-        if query_lower in product_name:
-            score += 3.0
-        
-        if query_lower in category:
-            score += 2.0
-        
-        if query_lower in description:
-            score += 1.0
-        
-        name_tokens = set(product_name.split())
-        category_tokens = set(category.split())
-        desc_tokens = set(description.split())
-        
-        all_item_tokens = name_tokens | category_tokens | desc_tokens
-        
-        matching_tokens = query_tokens & all_item_tokens
-        token_bonus = len(matching_tokens) * 0.5
-        score += token_bonus
-        
-        if score > 0:
-            product_with_score = product.copy()
-            product_with_score['score'] = round(score, 2)
-            scored_items.append(product_with_score)
-    
-    scored_items.sort(key=lambda x: x['score'], reverse=True)
-    
-    total_found = len(scored_items)
-    limited_items = scored_items[:limit]
-    
-    return limited_items, total_found
+    if repo is None:
+        repo = get_shared_repository()
+    return repo.recommend(query.strip(), limit)
+
+def recommend_items_for_user(user_id, limit: int = 10, repo: CSVRepository = None,
+                             fields: List[str] = None) -> tuple[List[dict], int]:
+    """Products other users save together with the user's wishlist and cart items, each
+    with its score, and the number of the user's own saved products they are based on"""
+    index = get_co_occurrence_index()
+    return _products(index.for_user(user_id, limit), repo, fields), len(index.user_items(user_id))
+
+def users_also_saved(product_id: str, limit: int = 4, repo: CSVRepository = None,
+                     fields: List[str] = None) -> List[dict]:
+    """Products most often saved (wishlist or cart) by the users who saved product_id"""
+    return _products(get_co_occurrence_index().neighbours(product_id)[:limit], repo, fields)
 
+def _products(scored: List[Tuple[str, float]], repo: CSVRepository, fields: List[str]) -> List[dict]:
+    """Catalog rows of (product_id, score) pairs in that order, with the score;
+    products no longer in the catalog are skipped"""
+    if not scored:
+        return []
+    if repo is None:
+        repo = get_shared_repository()
+    projection = FieldProjection(fields, 'score')
+    products = {product['product_id']: product
+                for product in repo.get_products_by_ids([product_id for product_id, _ in scored], projection.read)}
+    return [projection.apply(products[product_id], round(score, 4))
+            for product_id, score in scored if product_id in products]
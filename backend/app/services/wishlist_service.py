@@ -1,11 +1,11 @@
 from ..repos.wishlist_repo import WishlistRepo
-from ..repos.csv_repo import CSVRepository
+from ..repos.csv_repo import CSVRepository, get_shared_repository
 from typing import List, Dict
 
 class WishlistService:
-    def __init__(self):
+    def __init__(self, product_repo: CSVRepository = None):
         self.wishlist_repo = WishlistRepo()
-        self.product_repo = CSVRepository()
+        self.product_repo = product_repo if product_repo is not None else get_shared_repository()
     
     def add_to_wishlist(self, user_id: int, product_id: str) -> Dict:
         item = self.wishlist_repo.add_to_wishlist(user_id, product_id)
@@ -18,12 +18,12 @@ class WishlistService:
     def remove_from_wishlist(self, user_id: int, product_id: str) -> bool:
         return self.wishlist_repo.remove_from_wishlist(user_id, product_id)
     
-    def get_user_wishlist(self, user_id: int) -> List[Dict]:
+    def get_user_wishlist(self, user_id: int, fields: List[str] = None) -> List[Dict]:
         product_ids = self.wishlist_repo.get_user_wishlist(user_id)
         if not product_ids:
             return []
         
-        products = self.product_repo.get_products_by_ids(product_ids)
+        products = self.product_repo.get_products_by_ids(product_ids, fields=fields)
         return products
     
     def is_in_wishlist(self, user_id: int, product_id: str) -> bool:
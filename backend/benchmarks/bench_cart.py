@@ -0,0 +1,109 @@
+"""Cart stress test: the journaled in-memory cart index against the previous
+CSV-scanning CartRepo.
+
+Events are adds (85%) and removals of products drawn from a skewed popularity
+distribution, for users drawn uniformly. The index replays all of them with
+its journal and background compactions. The legacy repo appended a row per
+add and rewrote the file per removal, so it is only timed on a sample of reads
+and removals against the file its adds would have produced.
+
+    cd backend
+    python -m benchmarks.bench_cart --users 100000 --events 1000000
+"""
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.repos.cart_repo import CartIndex, journal_path
+
+SAMPLES = 5
+
+
+def _legacy_get_items(path: Path, user_id: str):
+    items = []
+    with open(path, "r") as f:
+        for row in csv.DictReader(f):
+            if row["user_id"] == user_id:
+                items.append({"user_id": row["user_id"], "product_id": row["product_id"],
+                              "quantity": int(row["quantity"])})
+    return items
+
+
+def _legacy_remove_item(path: Path, user_id: str, product_id: str):
+    with open(path, "r") as f:
+        rows = [row for row in csv.DictReader(f)
+                if not (row["user_id"] == user_id and row["product_id"] == product_id)]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["user_id", "product_id", "quantity"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--products', type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    users = rng.integers(1, args.users + 1, args.events).astype(str).tolist()
+    products = [f'P{rank:06d}' for rank in np.minimum(rng.zipf(1.3, args.events), args.products)]
+    removals = (rng.random(args.events) < 0.15).tolist()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'cart.csv'
+        index = CartIndex(csv_path)
+        latencies = np.empty(args.events)
+        start = time.perf_counter()
+        for event, (user_id, product_id, remove) in enumerate(zip(users, products, removals)):
+            began = time.perf_counter()
+            if remove:
+                index.remove(user_id, product_id)
+            else:
+                index.add(user_id, product_id)
+            latencies[event] = time.perf_counter() - began
+        elapsed = time.perf_counter() - start
+        print(f"{args.events:,} events over {args.users:,} users: {args.events / elapsed:,.0f} events/s, "
+              f"p50 {np.median(latencies) * 1e6:.1f} us, p99 {np.percentile(latencies, 99) * 1e6:.1f} us, "
+              f"max {latencies.max() * 1e3:.0f} ms")
+
+        sample = rng.choice(users, 10_000).tolist()
+        start = time.perf_counter()
+        for user_id in sample:
+            index.items(user_id)
+        read = (time.perf_counter() - start) / len(sample)
+        if index._compaction is not None:
+            index._compaction.join()
+        start = time.perf_counter()
+        reloaded = CartIndex(csv_path)
+        reload = time.perf_counter() - start
+        assert all(reloaded.items(user_id) == index.items(user_id) for user_id in sample)
+        journal_size = journal_path(csv_path).stat().st_size if journal_path(csv_path).exists() else 0
+        print(f"  index: get_items {read * 1e6:.1f} us, reload {reload:.2f} s, {len(index):,} cart lines, "
+              f"cart.csv {csv_path.stat().st_size / 2 ** 20:.1f} MiB + journal {journal_size / 2 ** 20:.1f} MiB")
+
+        legacy_path = Path(tmp) / 'legacy_cart.csv'
+        with open(legacy_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["user_id", "product_id", "quantity"])
+            writer.writerows((user_id, product_id, 1) for user_id, product_id, remove
+                             in zip(users, products, removals) if not remove)
+        start = time.perf_counter()
+        for user_id in sample[:SAMPLES]:
+            _legacy_get_items(legacy_path, user_id)
+        legacy_read = (time.perf_counter() - start) / SAMPLES
+        start = time.perf_counter()
+        for user_id in sample[:SAMPLES]:
+            _legacy_remove_item(legacy_path, user_id, products[0])
+        legacy_remove = (time.perf_counter() - start) / SAMPLES
+        print(f"  legacy CSV: get_items {legacy_read * 1e3:.0f} ms, remove_item {legacy_remove * 1e3:.0f} ms, "
+              f"cart.csv {legacy_path.stat().st_size / 2 ** 20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Cold-start benchmark: catalog load from CSV vs. the binary snapshot.
+
+Each measurement runs in a fresh interpreter so time and peak RSS reflect a
+worker starting up.
+
+    cd backend
+    python -m benchmarks.bench_catalog_load --rows 1000000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .synthetic import write_catalog
+
+_CHILD = '''
+import json, resource, sys, time
+from app.repos.catalog_snapshot import load_catalog
+import pandas as pd
+mode, path = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+df = pd.read_csv(path) if mode == "csv" else load_catalog(path)
+elapsed = time.perf_counter() - start
+try:
+    # VmHWM belongs to this exec'd image; ru_maxrss can include the parent's peak
+    status = open("/proc/self/status").read()
+    peak_kb = int(status.split("VmHWM:")[1].split()[0])
+except (OSError, IndexError):
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"rows": len(df), "seconds": elapsed, "peak_rss_mb": peak_kb / 1024}))
+'''
+
+
+def _measure(mode: str, csv_path: str) -> dict:
+    backend_dir = Path(__file__).resolve().parent.parent
+    output = subprocess.run(
+        [sys.executable, '-c', _CHILD, mode, csv_path],
+        cwd=backend_dir, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_catalog(Path(tmp) / 'amazon.csv', args.rows)
+        size_mb = Path(csv_path).stat().st_size / 2**20
+        print(f"synthetic catalog: {args.rows:,} rows, {size_mb:,.0f} MB CSV")
+
+        _measure('snapshot', csv_path)  # first snapshot load writes the sidecar
+        snapshot_mb = Path(csv_path).with_suffix('.feather').stat().st_size / 2**20
+        print(f"snapshot sidecar: {snapshot_mb:,.0f} MB")
+
+        for mode in ('csv', 'snapshot'):
+            runs = [_measure(mode, csv_path) for _ in range(args.repeat)]
+            best = min(runs, key=lambda run: run['seconds'])
+            print(f"{mode:>8}: cold load {best['seconds']:.2f}s, peak RSS {max(r['peak_rss_mb'] for r in runs):,.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Search throughput with and without a concurrent stream of admin PATCHes.
+
+Reader threads run search_products against pinned catalog versions while a
+writer thread applies update_product (what PATCH /admin/items/{id} calls) at
+a fixed rate. With copy-on-write versions the readers never wait for the
+writer, so throughput should only drop by the CPU the writes themselves use.
+
+    cd backend
+    python -m benchmarks.bench_concurrent_search --rows 100000 --patch-rate 20
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.repos.csv_repo import CSVRepository
+from .synthetic import WORDS, write_catalog
+
+
+def _readers(repo: CSVRepository, threads: int, seconds: float) -> dict:
+    latencies = [[] for _ in range(threads)]
+    stop = threading.Event()
+
+    def run(out, seed):
+        rng = np.random.default_rng(seed)
+        while not stop.is_set():
+            query = str(WORDS[rng.integers(len(WORDS))])
+            view = repo.pinned()
+            start = time.perf_counter()
+            view.search_products(query=query, min_rating=3.0, limit=10, return_total=True)
+            out.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=run, args=(latencies[i], i)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    merged = np.array([value for values in latencies for value in values])
+    return {
+        'searches': len(merged),
+        'qps': len(merged) / seconds,
+        'p50_ms': float(np.percentile(merged, 50) * 1000),
+        'p95_ms': float(np.percentile(merged, 95) * 1000),
+    }
+
+
+def _patches(repo: CSVRepository, rate: float, stop: threading.Event, done: list):
+    rng = np.random.default_rng(42)
+    ids = repo.df['product_id'].to_numpy()
+    interval = 1.0 / rate
+    while not stop.is_set():
+        start = time.perf_counter()
+        product_id = ids[rng.integers(len(ids))]
+        repo.update_product(product_id, {'rating': round(float(rng.uniform(2, 5)), 1),
+                                         'product_name': f'Edited product {len(done)}'})
+        done.append(time.perf_counter() - start)
+        stop.wait(max(0.0, interval - (time.perf_counter() - start)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--patch-rate', type=float, default=20.0, help='admin PATCHes per second')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_catalog(Path(tmp) / 'amazon.csv', args.rows)
+        repo = CSVRepository(csv_path=csv_path)
+        print(f"synthetic catalog: {args.rows:,} rows, {args.threads} reader threads, {args.seconds:.0f}s per phase")
+
+        idle = _readers(repo, args.threads, args.seconds)
+
+        stop, done = threading.Event(), []
+        writer = threading.Thread(target=_patches, args=(repo, args.patch_rate, stop, done))
+        writer.start()
+        busy = _readers(repo, args.threads, args.seconds)
+        stop.set()
+        writer.join()
+
+        for label, run in (('no writes', idle), ('with PATCHes', busy)):
+            print(f"{label:>13}: {run['qps']:8.1f} searches/s  p50 {run['p50_ms']:7.2f} ms  p95 {run['p95_ms']:7.2f} ms")
+        print(f"{len(done)} PATCHes applied ({len(done) / args.seconds:.1f}/s, "
+              f"median {np.median(done) * 1000:.1f} ms each), catalog version {repo.version.id}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Per-stage memory of the search filter pipeline: DataFrame chain vs. position masks.
+
+"frame chain" replays how search used to filter: every stage indexed the
+previous DataFrame with a boolean mask, copying all columns of the rows
+that survived, with the text match first and the numeric filters last.
+"predicates" is CSVRepository._matching: every stage tests only the
+surviving int32 positions, ordered cheapest-per-rejected-row first.
+
+For each stage this prints rows in -> rows out, the peak bytes allocated
+while it ran and its time (tracemalloc on, so times are inflated).
+
+    cd backend
+    python -m benchmarks.bench_filter_pipeline --rows 100000
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.repos.csv_repo import CSVRepository
+from .synthetic import write_catalog
+
+SEARCHES = {
+    'text + category + rating + price': dict(query='cable', category='Electronics', min_rating=4.0,
+                                             max_price=1_000),
+    'phrase + discount': dict(query='usb cable', min_discount=60),
+    'filters only': dict(min_rating=4.5, min_discount=50, category='Kitchen'),
+}
+
+
+class StageMeter:
+    """Peak traced allocation and time between consecutive marks"""
+
+    def __init__(self):
+        self.rows = []
+
+    def start(self):
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+        self._time = time.perf_counter()
+
+    def mark(self, name: str, rows_in: int, rows_out: int):
+        peak = tracemalloc.get_traced_memory()[1] - self._base
+        self.rows.append((name, rows_in, rows_out, peak, time.perf_counter() - self._time))
+        self.start()
+
+    def report(self, title: str):
+        print(f"  {title}")
+        for name, rows_in, rows_out, peak, seconds in self.rows:
+            print(f"    {name:<24} {rows_in:>8,} -> {rows_out:<8,} peak {peak / 1e6:8.2f} MB  {seconds * 1000:8.2f} ms")
+        print(f"    {'total':<24} {'':>21} peak {max(r[3] for r in self.rows) / 1e6:8.2f} MB  "
+              f"{sum(r[4] for r in self.rows) * 1000:8.2f} ms")
+
+
+def frame_chain(version, meter, query=None, category=None, min_rating=None, max_price=None, min_discount=None):
+    """The previous DataFrame-filtering implementation, one stage per filter"""
+    frame = version.df
+    meter.start()
+    if query:
+        matches = version.text_index.match(query)
+        rows_in, frame = len(frame), frame[matches['product_name'] | matches['about_product'] | matches['category']]
+        meter.mark('text', rows_in, len(frame))
+    if category:
+        rows_in, frame = len(frame), frame[frame['category'].str.contains(category, case=False, na=False)]
+        meter.mark('category', rows_in, len(frame))
+    for column, bound, at_least in (('rating', min_rating, True), ('discounted_price', max_price, False),
+                                    ('discount_percentage', min_discount, True)):
+        if bound is not None:
+            values = version.numeric_for(frame, column)
+            rows_in, frame = len(frame), frame[values >= bound if at_least else values <= bound]
+            meter.mark(column, rows_in, len(frame))
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = CSVRepository(csv_path=write_catalog(Path(tmp) / 'amazon.csv', args.rows))
+        version = repo.version
+        tracemalloc.start()
+        for label, kwargs in SEARCHES.items():
+            print(f"\n{label}: {kwargs}")
+            before = StageMeter()
+            expected = frame_chain(version, before, **kwargs)
+            before.report('frame chain')
+
+            after = StageMeter()
+            after.start()
+            positions, _ = repo._matching(
+                version, kwargs.get('query'), kwargs.get('category'), kwargs.get('min_rating'), None, None,
+                kwargs.get('max_price'), kwargs.get('min_discount'),
+                on_stage=lambda predicate, rows_in, rows_out: after.mark(predicate.name, rows_in, rows_out))
+            after.report('predicates')
+            assert positions.tolist() == expected.index.tolist()
+        tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Typo-tolerant (fuzzy=True) search latency as the catalog grows.
+
+For each catalog size this reports the median latency of misspelled
+queries in fuzzy mode next to the correctly spelled query in exact mode,
+plus the time spent in the trigram vocabulary lookup alone. The search
+cache is disabled so every call does the full work.
+
+    cd backend
+    python -m benchmarks.bench_fuzzy_search --rows 10000 50000 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.repos.csv_repo import CSVRepository
+from app.repos.search_cache import SearchCache
+from .synthetic import write_catalog
+
+QUERIES = [('hedphones', 'headphones'), ('chargr', 'charger'), ('wireles blutooth', 'wireless bluetooth'),
+           ('ketle', 'kettle')]
+
+
+def _median_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 50_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = CSVRepository(csv_path=write_catalog(Path(tmp) / 'amazon.csv', rows),
+                                 search_cache=SearchCache(max_entries=0))
+            index = repo.version.text_index
+            start = time.perf_counter()
+            trigrams = index.trigrams
+            build = time.perf_counter() - start
+
+            print(f"\n{rows:,} rows ({len(trigrams):,} words, trigram index built in {build * 1000:.1f} ms)")
+            for typo, correct in QUERIES:
+                lookup = _median_ms(lambda: [trigrams.similar(word) for word in typo.split()], args.repeat * 10)
+                fuzzy = _median_ms(lambda: repo.search_products(query=typo, limit=10, fuzzy=True), args.repeat)
+                exact = _median_ms(lambda: repo.search_products(query=correct, limit=10), args.repeat)
+                total = len(repo.search_products(query=typo, limit=rows, fuzzy=True))
+                print(f"  {typo!r:<20} lookup {lookup:6.3f} ms   fuzzy {fuzzy:8.2f} ms ({total:,} matches)   "
+                      f"exact {correct!r} {exact:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
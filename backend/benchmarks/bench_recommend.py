@@ -0,0 +1,84 @@
+"""/items/recommend scoring: the previous per-product Python loop against the
+index-backed scorer (ranking.keyword_scores + top_k on the catalog version).
+
+The legacy loop below is the old recommend_items_for_query body. It tokenizes
+on whitespace, so its word bonus can differ on punctuated text; the benchmark
+reports how many of the top items agree.
+
+    cd backend
+    python -m benchmarks.bench_recommend --rows 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.repos.csv_repo import CSVRepository
+from app.repos.ranking import top_k
+from .synthetic import write_catalog
+
+QUERIES = ['cable', 'usb cable', 'fast charging', 'laptop', 'noise cancelling headphones']
+
+
+def _legacy(repo: CSVRepository, query: str, limit: int):
+    query_lower = query.strip().lower()
+    query_tokens = set(query_lower.split())
+    scored_items = []
+    for product in repo.df.to_dict('records'):
+        score = 0.0
+        product_name = str(product.get('product_name', '')).lower()
+        category = str(product.get('category', '')).lower()
+        description = str(product.get('about_product', '')).lower()
+        if query_lower in product_name:
+            score += 3.0
+        if query_lower in category:
+            score += 2.0
+        if query_lower in description:
+            score += 1.0
+        all_item_tokens = set(product_name.split()) | set(category.split()) | set(description.split())
+        score += len(query_tokens & all_item_tokens) * 0.5
+        if score > 0:
+            product_with_score = product.copy()
+            product_with_score['score'] = round(score, 2)
+            scored_items.append(product_with_score)
+    scores = np.array([item['score'] for item in scored_items], dtype=np.float64)
+    ratings = pd.to_numeric(pd.Series([item.get('rating') for item in scored_items], dtype=object),
+                            errors='coerce').to_numpy(dtype=np.float64)
+    _, id_ranks = np.unique([str(item.get('product_id')) for item in scored_items], return_inverse=True)
+    return [scored_items[i] for i in top_k(limit, scores, ratings, id_ranks)], len(scored_items)
+
+
+def _time(fn, repeat: int) -> np.ndarray:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.asarray(timings) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = CSVRepository(csv_path=write_catalog(Path(tmp) / 'amazon.csv', args.rows))
+        print(f"{args.rows:,} rows, limit={args.limit}")
+        for query in QUERIES:
+            legacy_items, legacy_total = _legacy(repo, query, args.limit)
+            items, total = repo.recommend(query, args.limit)
+            same = len({item['product_id'] for item in items} & {item['product_id'] for item in legacy_items})
+            legacy = _time(lambda: _legacy(repo, query, args.limit), max(1, args.repeat // 10))
+            indexed = _time(lambda: repo.recommend(query, args.limit), args.repeat)
+            print(f"  {query!r:30} legacy {np.median(legacy):8.1f} ms -> indexed {np.median(indexed):6.2f} ms   "
+                  f"total {legacy_total} / {total}, top {same}/{len(items)} shared")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Related products: index build time, lookup latency and admin-write cost.
+
+Compares the precomputed RelatedIndex lookup with the previous per-request
+scan (a boolean mask of the whole product table on category), and times
+the incremental add / update / delete of one product on a fork.
+
+    cd backend
+    python -m benchmarks.bench_related --rows 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.repos.csv_repo import CSVRepository
+from app.repos.related_index import RelatedIndex
+from .synthetic import write_catalog
+
+
+def _scan(df, product_id: str, category, limit: int):
+    related = df[(df['category'] == category) & (df['product_id'] != product_id)]
+    return related.head(limit).to_dict('records')
+
+
+def _time(fn, repeat: int) -> np.ndarray:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.asarray(timings) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--limit', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = CSVRepository(csv_path=write_catalog(Path(tmp) / 'amazon.csv', args.rows))
+        version = repo.version
+        start = time.perf_counter()
+        index = RelatedIndex(version.text_index, version.df['category'], version.numeric['rating_count'])
+        build = time.perf_counter() - start
+        print(f"{args.rows:,} rows: build {build:.2f} s, "
+              f"{index.neighbours.nbytes / 2 ** 20:.1f} MiB neighbours")
+
+        rng = np.random.default_rng(0)
+        ids = version.df['product_id'].to_numpy()[rng.integers(0, len(version.df), args.repeat)]
+        categories = {pid: version.df.at[version.positions_for(pid)[0], 'category'] for pid in ids}
+        picks = iter(np.tile(ids, 2))
+        lookup = _time(lambda: repo.get_related_products(next(picks), limit=args.limit), args.repeat)
+        picks = iter(np.tile(ids, 2))
+        scan = _time(lambda: _scan(version.df, pid := next(picks), categories[pid], args.limit),
+                     min(args.repeat, 50))
+        print(f"  lookup p50 {np.median(lookup):.3f} ms   scan p50 {np.median(scan):.2f} ms")
+
+        product = version.df.iloc[0].to_dict()
+        draft = version.fork()
+        add = _time(lambda: draft.related_index.set_row(len(draft.related_index), product), 5)
+        update = _time(lambda: draft.related_index.set_row(0, product), 5)
+        delete = _time(lambda: draft.related_index.remove_row(len(draft.related_index) - 1), 5)
+        print(f"  incremental add {np.median(add):.1f} ms   update {np.median(update):.1f} ms   "
+              f"delete {np.median(delete):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
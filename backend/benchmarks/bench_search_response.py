@@ -0,0 +1,89 @@
+"""Response building cost of /items/search at size=100.
+
+Times the whole request through the ASGI app, and separately the part after
+the search itself: the legacy chain (to_dict('records') -> format_for_display
+-> clean_nan_values -> jsonable_encoder -> json.dumps) against the columnar
+path (page frame -> format_for_display -> FastJSONResponse rendering). Search
+results are cached after the first request, so both mostly measure
+serialization.
+
+    cd backend
+    python -m benchmarks.bench_search_response --rows 100000
+"""
+import argparse
+import json
+import math
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.api import responses
+from app.api.deps import get_csv_repo
+from app.main import create_app
+from app.repos.csv_repo import CSVRepository
+from .synthetic import write_catalog
+
+QUERIES = [None, 'cable', 'usb cable', 'laptop']
+
+
+def _clean_nan_values(data):
+    if isinstance(data, list):
+        return [_clean_nan_values(item) for item in data]
+    elif isinstance(data, dict):
+        return {key: _clean_nan_values(value) for key, value in data.items()}
+    elif isinstance(data, float) and math.isnan(data):
+        return None
+    return data
+
+
+def _legacy(repo: CSVRepository, query, size: int) -> bytes:
+    products = repo.search_products(query=query, limit=size)
+    products = _clean_nan_values(repo.format_for_display(products, query=query))
+    return json.dumps(jsonable_encoder({"products": products}), ensure_ascii=False).encode('utf-8')
+
+
+def _columnar(repo: CSVRepository, query, size: int) -> bytes:
+    products = repo.search_products(query=query, limit=size, as_frame=True)
+    return responses.dumps({"products": repo.format_for_display(products, query=query)})
+
+
+def _time(fn, repeat: int) -> np.ndarray:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.asarray(timings) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = CSVRepository(csv_path=write_catalog(Path(tmp) / 'amazon.csv', args.rows))
+        app = create_app()
+        app.dependency_overrides[get_csv_repo] = lambda: repo
+        client = TestClient(app)
+
+        encoder = 'orjson' if responses.orjson is not None else 'json'
+        print(f"{args.rows:,} rows, size={args.size}, encoder={encoder}")
+        for query in QUERIES:
+            url = f"/items/search?size={args.size}" + (f"&q={query}" if query else "")
+            client.get(url)  # fill the search cache
+            request = _time(lambda: client.get(url), args.repeat)
+            legacy = _time(lambda: _legacy(repo, query, args.size), args.repeat)
+            columnar = _time(lambda: _columnar(repo, query, args.size), args.repeat)
+            print(f"  q={query!r:12} request p50 {np.median(request):6.2f} ms   "
+                  f"build+encode legacy {np.median(legacy):6.2f} ms -> columnar {np.median(columnar):6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
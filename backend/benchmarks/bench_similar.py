@@ -0,0 +1,77 @@
+""""More like this" search: recall and latency of the LSH index against exact
+cosine search over the same vectors.
+
+Queries are catalog products (their nearest other products). Recall@k is the
+share of the exact top-k the LSH search returns. Besides the configured
+TABLES x BITS, a few other table/bit counts are swept to show the trade-off.
+
+    cd backend
+    python -m benchmarks.bench_similar --rows 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.repos import similar_index
+from app.repos.csv_repo import CSVRepository
+from app.repos.similar_index import SimilarIndex
+from .synthetic import write_catalog
+
+CONFIGURATIONS = [(8, 12), (8, 16), (12, 16), (16, 16), (16, 18), (24, 18)]
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_catalog(Path(tmp) / 'amazon.csv', args.rows)
+        start = time.perf_counter()
+        repo = CSVRepository(csv_path=csv_path)
+        load = time.perf_counter() - start
+        version = repo.version
+        build = _time(lambda: SimilarIndex.build(version.text_index))
+        ids = version.df['product_id'].tolist()
+        reuse = _time(lambda: SimilarIndex.load(csv_path, ids))
+        size = similar_index.similar_path(csv_path).stat().st_size
+        print(f"{args.rows:,} rows: catalog load {load:.1f} s, vector build {build / 1e3:.2f} s, "
+              f"sidecar load {reuse:.0f} ms ({size / 2 ** 20:.1f} MiB)")
+
+        vectors, idf = version.similar_index.vectors, version.similar_index.idf
+        queries = np.random.default_rng(0).choice(len(vectors), args.queries, replace=False)
+        reference = SimilarIndex(vectors, idf)
+        exact, exact_ms = [], []
+        for position in queries:
+            exact_ms.append(_time(lambda: exact.append(set(reference.exact(vectors[position], args.limit,
+                                                                           exclude=position)[0].tolist()))))
+        print(f"  exact cosine    p50 {np.median(exact_ms):6.2f} ms")
+
+        for tables, bits in CONFIGURATIONS:
+            index = SimilarIndex(vectors, idf, tables=tables, bits=bits)
+            index.tables
+            recalls, latencies, candidates = [], [], []
+            for position, truth in zip(queries, exact):
+                found = []
+                latencies.append(_time(lambda: found.extend(index.search(vectors[position], args.limit,
+                                                                         exclude=position)[0].tolist())))
+                candidates.append(len(index.candidates(vectors[position])))
+                recalls.append(len(truth & set(found)) / max(len(truth), 1))
+            marker = '*' if (tables, bits) == (similar_index.TABLES, similar_index.BITS) else ' '
+            print(f" {marker}LSH {tables:2d} x {bits:2d} bits p50 {np.median(latencies):6.2f} ms   "
+                  f"recall@{args.limit} {np.mean(recalls):.3f}   candidates {np.median(candidates):,.0f}")
+
+
+if __name__ == '__main__':
+    main()
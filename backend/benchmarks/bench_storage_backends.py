@@ -0,0 +1,83 @@
+"""pandas (CSVRepository) vs. SQLite (SQLiteRepository) catalog backends.
+
+For each catalog size this reports the time to make the catalog queryable
+(CSV load + index build vs. one-shot SQLite import and reopen) and the median
+latency of typical reads and an admin PATCH on both backends.
+
+    cd backend
+    python -m benchmarks.bench_storage_backends --rows 10000 100000 1000000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.repos.csv_repo import CSVRepository
+from app.repos.sqlite_repo import SQLiteRepository
+from .synthetic import write_catalog
+
+QUERIES = {
+    'text "charger"': dict(query='charger', limit=10),
+    'text "usb cable"': dict(query='usb cable', limit=10),
+    'text + filters': dict(query='laptop', min_rating=4.0, max_price=20_000, limit=10),
+    'filters only': dict(min_rating=4.5, min_discount=50, limit=10),
+    'deep page': dict(limit=10, offset=5_000),
+}
+
+
+def _median_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def _run(repo, ids, repeat: int) -> dict:
+    results = {}
+    for label, kwargs in QUERIES.items():
+        results[label] = _median_ms(lambda: repo.search_products(return_total=True, **kwargs), repeat)
+    rng = np.random.default_rng(0)
+    results['get by id'] = _median_ms(lambda: repo.get_product_by_id(ids[rng.integers(len(ids))]), repeat * 10)
+    results['admin PATCH'] = _median_ms(
+        lambda: repo.update_product(ids[rng.integers(len(ids))], {'rating': 4.1, 'product_name': 'Edited'}), repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = write_catalog(Path(tmp) / 'amazon.csv', rows)
+            ids = [f'B{i:09d}' for i in range(rows)]
+
+            start = time.perf_counter()
+            pandas_repo = CSVRepository(csv_path=csv_path)
+            pandas_load = time.perf_counter() - start
+            pandas_results = _run(pandas_repo, ids, args.repeat)
+            del pandas_repo
+
+            start = time.perf_counter()
+            SQLiteRepository.import_csv(csv_path, Path(tmp) / 'amazon.db')
+            sqlite_import = time.perf_counter() - start
+            start = time.perf_counter()
+            sqlite_repo = SQLiteRepository(Path(tmp) / 'amazon.db')
+            sqlite_open = time.perf_counter() - start
+            sqlite_results = _run(sqlite_repo, ids, args.repeat)
+
+            print(f"\n{rows:,} rows")
+            print(f"  {'load':<18} pandas {pandas_load:9.2f} s    sqlite import {sqlite_import:.2f} s, "
+                  f"open {sqlite_open * 1000:.1f} ms")
+            for label in pandas_results:
+                print(f"  {label:<18} pandas {pandas_results[label]:9.2f} ms   sqlite {sqlite_results[label]:9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Typeahead (/items/suggest) index build time and lookup latency.
+
+Replays every prefix of a set of typed queries, as a search box would send
+them keystroke by keystroke, and reports latency percentiles.
+
+    cd backend
+    python -m benchmarks.bench_suggest --rows 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.repos.csv_repo import CSVRepository
+from app.repos.suggest_index import SuggestIndex
+from .synthetic import write_catalog
+
+TYPED = ['usb cable', 'laptop', 'smart tv', 'charger', 'wireless mouse', 'electronics', 'b', 'xq']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = CSVRepository(csv_path=write_catalog(Path(tmp) / 'amazon.csv', args.rows))
+        version = repo.version
+
+        start = time.perf_counter()
+        index = SuggestIndex(version.df, version.numeric['rating_count'])
+        build = time.perf_counter() - start
+
+        prefixes = [typed[:i] for typed in TYPED for i in range(1, len(typed) + 1)]
+        timings = []
+        for _ in range(args.repeat):
+            for prefix in prefixes:
+                start = time.perf_counter()
+                index.suggest(prefix)
+                timings.append(time.perf_counter() - start)
+        timings = np.asarray(timings) * 1e6
+
+        print(f"{args.rows:,} rows, {len(index):,} terms, {len(index.vocabulary):,} words")
+        print(f"  build   {build:.2f} s")
+        print(f"  lookup  p50 {np.percentile(timings, 50):.1f} us   p99 {np.percentile(timings, 99):.1f} us   "
+              f"max {timings.max():.1f} us")
+
+
+if __name__ == '__main__':
+    main()
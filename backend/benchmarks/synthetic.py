@@ -0,0 +1,69 @@
+"""Synthetic Amazon-style catalogs for benchmarks.
+
+Rows have the same columns and formatting as data/amazon.csv (₹ prices,
+"64%" discounts, comma-separated rating counts, long description and review
+text) so parsing and indexing costs are realistic.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORIES = [
+    'Computers&Accessories|Accessories&Peripherals|Cables&Accessories|Cables|USBCables',
+    'Electronics|Mobiles&Accessories|Smartphones&BasicMobiles|Smartphones',
+    'Electronics|HomeTheater,TV&Video|Televisions|SmartTelevisions',
+    'Computers&Accessories|Laptops|TraditionalLaptops',
+    'Electronics|Mobiles&Accessories|MobileAccessories|Chargers|WallChargers',
+    'Home&Kitchen|Kitchen&HomeAppliances|SmallKitchenAppliances|Kettles&HotWaterDispensers|ElectricKettles',
+    'Electronics|Headphones,Earbuds&Accessories|Headphones|In-Ear',
+    'Computers&Accessories|NetworkingDevices|Routers',
+    'Home&Kitchen|Heating,Cooling&AirQuality|RoomHeaters|FanHeaters',
+    'OfficeProducts|OfficePaperProducts|Paper|Stationery|Pens,Pencils&WritingSupplies|Pens&Refills',
+]
+
+WORDS = np.array([
+    'usb', 'cable', 'charger', 'fast', 'charging', 'wireless', 'headphones', 'bluetooth', 'smart',
+    'tv', 'led', 'kettle', 'laptop', 'phone', 'type-c', 'router', 'wifi', 'steel', 'black', 'portable',
+    'heater', 'pen', 'gel', 'ink', 'hdmi', '4k', 'ultra', 'hd', 'android', 'noise', 'cancelling',
+    'battery', 'power', 'bank', 'mah', 'braided', 'nylon', 'durable', 'compatible', 'iphone', 'samsung',
+    'warranty', 'premium', 'quality', 'design', 'lightweight', 'compact', 'home', 'office', 'travel',
+])
+
+
+def _sentences(rng, rows: int, words: int) -> np.ndarray:
+    picks = WORDS[rng.integers(0, len(WORDS), size=(rows, words))]
+    return np.array([' '.join(row) for row in picks], dtype=object)
+
+
+def make_catalog(rows: int, seed: int = 0, description_words: int = 60, review_words: int = 80) -> pd.DataFrame:
+    """Build a catalog frame with `rows` products (product ids are unique)"""
+    rng = np.random.default_rng(seed)
+    actual = rng.integers(200, 100_000, size=rows)
+    discount = rng.integers(0, 90, size=rows)
+    price = (actual * (100 - discount) // 100).astype(np.int64)
+    rating = np.round(rng.uniform(2.0, 5.0, size=rows), 1)
+    rating_count = rng.integers(1, 500_000, size=rows)
+    ids = np.char.add('B', np.char.zfill(np.arange(rows).astype(str), 9))
+    return pd.DataFrame({
+        'product_id': ids,
+        'product_name': [name.title() for name in _sentences(rng, rows, 6)],
+        'category': np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), size=rows)],
+        'discounted_price': [f'₹{value:,}' for value in price],
+        'actual_price': [f'₹{value:,}' for value in actual],
+        'discount_percentage': [f'{value}%' for value in discount],
+        'rating': rating,
+        'rating_count': [f'{value:,}' for value in rating_count],
+        'about_product': _sentences(rng, rows, description_words),
+        'user_id': 'AG3D6O4STAQKAY2UVGEUV46KN35Q,AHMY5CWJMMK5BJRBBSNLYT3ONILA',
+        'user_name': 'Manav,Adarsh gupta',
+        'review_id': 'R3HXWT0LRP0NMF,R2AJM3LFTLZHFO',
+        'review_title': 'Satisfied,Charging is really fast',
+        'review_content': _sentences(rng, rows, review_words),
+        'img_link': [f'https://m.media-amazon.com/images/I/{i}.jpg' for i in range(rows)],
+        'product_link': [f'https://www.amazon.in/dp/{pid}' for pid in ids],
+    })
+
+
+def write_catalog(path, rows: int, seed: int = 0) -> str:
+    """Write a synthetic catalog CSV and return its path"""
+    make_catalog(rows, seed=seed).to_csv(path, index=False)
+    return str(path)
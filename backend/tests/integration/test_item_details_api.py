@@ -62,7 +62,7 @@ def test_get_item_details_response_structure():
     data = response.json()
     
     # Test top-level structure
-    assert set(data.keys()) == {"product", "related"}
+    assert set(data.keys()) == {"product", "related", "also_saved"}
     
     # Test product structure contains expected fields
     product = data["product"]
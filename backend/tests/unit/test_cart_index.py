@@ -0,0 +1,97 @@
+"""Unit tests for the in-memory cart index and its journal"""
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.repos import cart_repo
+from app.repos.cart_repo import CartIndex, CartRepo, compacting_path, journal_path
+from app.services.cart_service import CartService
+
+
+@pytest.fixture
+def cart_csv(tmp_path, monkeypatch):
+    """A legacy cart file with a row per click"""
+    cart = tmp_path / "cart.csv"
+    pd.DataFrame({'user_id': [1, 1, 2], 'product_id': ['C1', 'C1', 'C2'], 'quantity': [1, 2, 1]}).to_csv(cart, index=False)
+    monkeypatch.setattr(cart_repo, 'CART_FILE', cart)
+    return cart
+
+
+def test_quantities_are_aggregated(cart_csv):
+    """Loading sums duplicate rows; adds increment instead of appending rows"""
+    assert CartRepo.get_items('1') == [{'user_id': '1', 'product_id': 'C1', 'quantity': 3}]
+    CartRepo.add_item('1', 'C1')
+    CartRepo.add_item('1', 'C3', 2)
+    assert CartRepo.get_items('1') == [{'user_id': '1', 'product_id': 'C1', 'quantity': 4},
+                                       {'user_id': '1', 'product_id': 'C3', 'quantity': 2}]
+    CartRepo.remove_item('1', 'C1')
+    CartRepo.remove_item('1', 'NOPE')
+    assert [item['product_id'] for item in CartRepo.get_items('1')] == ['C3']
+    assert CartRepo.get_items('9') == []
+    # the CSV is untouched until compaction
+    assert len(pd.read_csv(cart_csv)) == 3
+
+
+def test_journal_replay_and_compaction(cart_csv):
+    """A new index replays the journal; compaction folds it into one row per cart line"""
+    index = CartIndex(cart_csv)
+    index.add('1', 'C1')
+    index.add('2', 'C4', 3)
+    index.remove('2', 'C2')
+    with open(journal_path(cart_csv), 'a') as f:
+        f.write('{"user_id": "2", "product_id": "C')  # torn by a crash
+    reloaded = CartIndex(cart_csv)
+    assert reloaded.items('1') == {'C1': 4} and reloaded.items('2') == {'C4': 3}
+    assert (len(reloaded), reloaded.users()) == (2, 2)
+
+    assert reloaded.compact() and not reloaded.compact()
+    assert not journal_path(cart_csv).exists()
+    frame = pd.read_csv(cart_csv, dtype=str)
+    assert frame.values.tolist() == [['1', 'C1', '4'], ['2', 'C4', '3']]
+
+    # replaying journaled quantities over a CSV that already has them is harmless
+    with open(journal_path(cart_csv), 'w') as f:
+        f.write('{"user_id": "2", "product_id": "C4", "quantity": 3}\n')
+    assert CartIndex(cart_csv).items('2') == {'C4': 3}
+
+
+def test_compacts_once_the_journal_outgrows_the_carts(cart_csv):
+    """After max(compact_after, cart lines) entries the journal is folded in on a background thread"""
+    index = CartIndex(cart_csv, compact_after=5)
+    for _ in range(4):
+        index.add('3', 'C5')
+    assert journal_path(cart_csv).exists() and index._compaction is None
+    index.add('3', 'C5')
+    # the write only moved the journal aside; later writes start a new one
+    assert not journal_path(cart_csv).exists()
+    index.add('3', 'C6')
+    index._compaction.join(5)
+
+    assert not compacting_path(cart_csv).exists()
+    assert pd.read_csv(cart_csv, dtype=str).values.tolist()[-1] == ['3', 'C5', '5']
+    assert CartIndex(cart_csv).items('3') == {'C5': 5, 'C6': 1}
+    assert index.users() == 3
+
+
+def test_interrupted_compaction_is_finished_on_load(cart_csv):
+    """A journal left aside by a crash mid-compaction is replayed and folded on load"""
+    index = CartIndex(cart_csv)
+    index.add('1', 'C7', 2)
+    index.add('2', 'C2')
+    journal_path(cart_csv).rename(compacting_path(cart_csv))
+    with open(journal_path(cart_csv), 'w') as f:
+        f.write('{"user_id": "1", "product_id": "C7", "quantity": 1}\n')
+
+    reloaded = CartIndex(cart_csv)
+    assert reloaded.items('1') == {'C1': 3, 'C7': 1} and reloaded.items('2') == {'C2': 2}
+    assert not compacting_path(cart_csv).exists()
+    assert CartIndex(cart_csv).items('1') == {'C1': 3, 'C7': 1}
+
+
+def test_check_endpoint_reads_the_index(cart_csv, monkeypatch):
+    """/cart/{id}/check answers from the index without loading the cart's products"""
+    monkeypatch.setattr(CartService, 'get_items', staticmethod(lambda *args, **kwargs: pytest.fail("enriched the cart")))
+    client = TestClient(create_app())
+
+    assert client.get("/cart/C1/check", headers={"X-User-Id": "1"}).json() == {"is_in_cart": True}
+    assert client.get("/cart/C2/check", headers={"X-User-Id": "1"}).json() == {"is_in_cart": False}
@@ -0,0 +1,134 @@
+"""Unit tests for the admin mutation journal"""
+import json
+import pytest
+import pandas as pd
+from app.repos.csv_repo import CSVRepository
+from app.repos.catalog_journal import CatalogJournal, journal_path
+
+
+@pytest.fixture
+def journal_csv(tmp_path):
+    """Create a small catalog CSV"""
+    test_data = pd.DataFrame({
+        'product_id': ['J1', 'J2', 'J3'],
+        'product_name': ['USB Cable', 'Wireless Mouse', 'Laptop Stand'],
+        'category': ['Electronics|Cables', 'Electronics|Accessories', 'Computers|Stands'],
+        'discounted_price': ['₹299', '₹499', '₹999'],
+        'rating': [4.2, 4.5, 4.0],
+        'about_product': ['Fast charging cable', 'Ergonomic mouse', 'Aluminium stand'],
+    })
+    csv_path = tmp_path / "journal_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_mutations_append_to_journal_not_csv(journal_csv):
+    """Admin writes are journaled with increasing sequence numbers and leave the CSV alone"""
+    before = open(journal_csv).read()
+    repo = CSVRepository(csv_path=journal_csv)
+
+    repo.add_product({'product_id': 'J4', 'product_name': 'HDMI Cable', 'discounted_price': '₹199'})
+    repo.update_product('J1', {'product_name': 'Braided USB Cable'})
+    repo.delete_product('J2')
+
+    assert open(journal_csv).read() == before
+    lines = [json.loads(line) for line in open(journal_path(journal_csv))]
+    assert [(entry['seq'], entry['op'], entry['product_id']) for entry in lines] == [
+        (1, 'add', 'J4'), (2, 'update', 'J1'), (3, 'delete', 'J2')]
+    assert repo.get_product_by_id('J4')['product_name'] == 'HDMI Cable'
+    assert repo.search_products(max_price=250)[0]['product_id'] == 'J4'
+    assert not repo.is_stale()
+
+
+def test_journal_is_replayed_on_load(journal_csv):
+    """A fresh repository sees every journaled mutation"""
+    repo = CSVRepository(csv_path=journal_csv)
+    repo.add_product({'product_id': 'J4', 'product_name': 'HDMI Cable'})
+    repo.update_product('J1', {'product_name': 'Braided USB Cable'})
+    repo.delete_product('J2')
+
+    reloaded = CSVRepository(csv_path=journal_csv)
+
+    assert reloaded.get_product_by_id('J1')['product_name'] == 'Braided USB Cable'
+    assert reloaded.get_product_by_id('J2') is None
+    assert reloaded.get_product_by_id('J4')['product_name'] == 'HDMI Cable'
+    assert [p['product_id'] for p in reloaded.search_products(query='cable')] == ['J1', 'J4']
+
+
+def test_compaction_folds_journal_into_csv(journal_csv):
+    """compact() rewrites the CSV and empties the journal"""
+    repo = CSVRepository(csv_path=journal_csv)
+    repo.update_product('J3', {'rating': 4.8})
+    repo.delete_product('J2')
+
+    assert repo.compact()
+    assert not journal_path(journal_csv).exists()
+    saved = pd.read_csv(journal_csv)
+    assert saved['product_id'].tolist() == ['J1', 'J3']
+    assert saved.loc[saved['product_id'] == 'J3', 'rating'].item() == 4.8
+    assert not repo.is_stale()
+    assert not repo.compact()
+
+
+def test_replay_after_interrupted_compaction_is_idempotent(journal_csv):
+    """Entries already folded into the CSV do not apply twice"""
+    repo = CSVRepository(csv_path=journal_csv)
+    repo.add_product({'product_id': 'J4', 'product_name': 'HDMI Cable', 'review_id': 'RV1'})
+    repo.update_product('J1', {'product_name': 'Braided USB Cable'})
+    journal = open(journal_path(journal_csv)).read()
+    repo.compact()
+    # Simulate a crash after the CSV was replaced but before the journal was trimmed
+    open(journal_path(journal_csv), 'w').write(journal)
+
+    reloaded = CSVRepository(csv_path=journal_csv)
+
+    assert len(reloaded.df) == 4
+    assert reloaded.get_reviews('J4')[1] == 1
+    assert reloaded.get_product_by_id('J1')['product_name'] == 'Braided USB Cable'
+
+
+def test_torn_journal_tail_is_discarded(journal_csv):
+    """A partially written last line (crash mid-append) is ignored and trimmed"""
+    repo = CSVRepository(csv_path=journal_csv)
+    repo.update_product('J1', {'product_name': 'Braided USB Cable'})
+    with open(journal_path(journal_csv), 'a') as f:
+        f.write('{"seq": 2, "op": "delete", "produ')
+
+    journal = CatalogJournal(journal_csv)
+
+    assert len(journal) == 1
+    assert journal.last_seq == 1
+    assert open(journal_path(journal_csv)).read().endswith('\n')
+    assert CSVRepository(csv_path=journal_csv).get_product_by_id('J1')['product_name'] == 'Braided USB Cable'
+
+
+def test_background_compaction_after_threshold(journal_csv):
+    """Reaching compact_after folds the journal on a background thread"""
+    repo = CSVRepository(csv_path=journal_csv, compact_after=2)
+    repo.update_product('J1', {'rating': 3.9})
+    repo.update_product('J2', {'rating': 3.8})
+    repo._live.compaction.join(timeout=10)
+
+    assert len(repo._live.journal) == 0
+    assert pd.read_csv(journal_csv)['rating'].tolist() == [3.9, 3.8, 4.0]
+
+
+def test_generated_ids_survive_delete_reload_and_compaction(journal_csv):
+    """Adds after a delete get fresh ids, so replay and compaction keep every row and review"""
+    repo = CSVRepository(csv_path=journal_csv)
+    repo.add_product({'product_name': 'First new', 'review_id': 'RA'})
+    repo.delete_product('J2')
+    first = repo.add_product({'product_name': 'Second new', 'review_id': 'RB'})['product_id']
+    second = repo.add_product({'product_name': 'Third new', 'review_id': 'RC'})['product_id']
+    assert first != second and first != 'P00000001'
+
+    def state(catalog):
+        return (catalog.df['product_id'].tolist(), catalog.df['product_name'].tolist(),
+                {product_id: [review['review_id'] for review in catalog.get_reviews(product_id)[0]]
+                 for product_id in catalog.df['product_id']})
+
+    live = state(repo)
+    assert state(CSVRepository(csv_path=journal_csv)) == live
+    assert repo.compact()
+    assert state(CSVRepository(csv_path=journal_csv)) == live
+    assert live[2]['P00000001'] == ['RA'] and live[2][second] == ['RC']
@@ -0,0 +1,83 @@
+"""Unit tests for the binary catalog snapshot sidecar"""
+import os
+import pytest
+import pandas as pd
+from app.repos import catalog_snapshot
+from app.repos.catalog_snapshot import load_catalog, read_snapshot, snapshot_path
+from app.repos.csv_repo import CSVRepository
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def snapshot_csv(tmp_path):
+    """Create a small catalog CSV with formatted and missing values"""
+    test_data = pd.DataFrame({
+        'product_id': ['B1', 'B2'],
+        'product_name': ['USB Cable', 'Smart TV'],
+        'category': ['Electronics|Cables', 'Electronics|Televisions'],
+        'discounted_price': ['₹299', '₹24,999'],
+        'rating': ['4.2', '|'],
+        'rating_count': [1200, None],
+        'about_product': ['Fast charging cable', None],
+    })
+    csv_path = tmp_path / "amazon.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_first_load_writes_snapshot(snapshot_csv):
+    """Loading the CSV leaves a snapshot next to it"""
+    CSVRepository(csv_path=snapshot_csv)
+
+    assert snapshot_path(snapshot_csv).exists()
+    assert snapshot_path(snapshot_csv).name == 'amazon.feather'
+
+
+def test_snapshot_round_trips_the_frame(snapshot_csv):
+    """The snapshot holds exactly what pd.read_csv parsed"""
+    load_catalog(snapshot_csv)
+
+    pd.testing.assert_frame_equal(read_snapshot(snapshot_csv), pd.read_csv(snapshot_csv))
+
+
+def test_fresh_snapshot_skips_csv_parse(snapshot_csv, monkeypatch):
+    """A fresh snapshot is loaded without parsing the CSV"""
+    load_catalog(snapshot_csv)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV should not be parsed")
+    monkeypatch.setattr(catalog_snapshot.pd, 'read_csv', fail)
+
+    repo = CSVRepository(csv_path=snapshot_csv)
+    assert repo.get_product_by_id('B2')['product_name'] == 'Smart TV'
+
+
+def test_changed_csv_regenerates_snapshot(snapshot_csv):
+    """Editing the CSV makes the snapshot stale and the next load rebuilds it"""
+    load_catalog(snapshot_csv)
+
+    df = pd.read_csv(snapshot_csv)
+    df.loc[0, 'product_name'] = 'Braided USB Cable'
+    df.to_csv(snapshot_csv, index=False)
+
+    assert read_snapshot(snapshot_csv) is None
+    assert load_catalog(snapshot_csv).loc[0, 'product_name'] == 'Braided USB Cable'
+    assert read_snapshot(snapshot_csv).loc[0, 'product_name'] == 'Braided USB Cable'
+
+
+def test_touched_csv_with_same_content_stays_fresh(snapshot_csv):
+    """Only the checksum decides when the mtime moved but the bytes did not"""
+    load_catalog(snapshot_csv)
+    stat = os.stat(snapshot_csv)
+    os.utime(snapshot_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    assert read_snapshot(snapshot_csv) is not None
+
+
+def test_corrupt_snapshot_falls_back_to_csv(snapshot_csv):
+    """An unreadable sidecar is ignored and replaced"""
+    snapshot_path(snapshot_csv).write_bytes(b'not an arrow file')
+
+    assert len(load_catalog(snapshot_csv)) == 2
+    assert read_snapshot(snapshot_csv) is not None
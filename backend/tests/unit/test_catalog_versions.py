@@ -0,0 +1,136 @@
+"""Unit tests for copy-on-write catalog versions"""
+import threading
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import CATALOG_VERSION_HEADER
+from app.repos import csv_repo
+from app.repos.csv_repo import CSVRepository, get_shared_repository, reset_shared_repositories
+
+
+@pytest.fixture
+def versions_csv(tmp_path):
+    """Create a small catalog CSV"""
+    test_data = pd.DataFrame({
+        'product_id': ['V1', 'V2', 'V3'],
+        'product_name': ['USB Cable', 'Wireless Mouse', 'Laptop Stand'],
+        'category': ['Electronics|Cables', 'Electronics|Accessories', 'Computers|Stands'],
+        'discounted_price': ['₹299', '₹499', '₹999'],
+        'rating': [4.2, 4.5, 4.0],
+        'about_product': ['Fast charging cable', 'Ergonomic mouse', 'Aluminium stand'],
+    })
+    csv_path = tmp_path / "versions_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_writes_publish_new_versions(versions_csv):
+    """Every admin write publishes the next version id"""
+    repo = CSVRepository(csv_path=versions_csv)
+    first = repo.version.id
+
+    repo.update_product('V1', {'product_name': 'Braided USB Cable'})
+    repo.add_product({'product_id': 'V4', 'product_name': 'HDMI Cable'})
+    repo.delete_product('V2')
+    repo.update_product('missing', {'product_name': 'Nothing'})
+
+    assert repo.version.id == first + 3
+
+
+def test_pinned_view_keeps_its_version(versions_csv):
+    """A pinned reader sees one consistent catalog while writers move on"""
+    repo = CSVRepository(csv_path=versions_csv)
+    view = repo.pinned()
+
+    repo.update_product('V1', {'product_name': 'Braided Cable', 'discounted_price': '₹199'})
+    repo.delete_product('V3')
+
+    assert view.get_product_by_id('V1')['product_name'] == 'USB Cable'
+    assert view.get_product_by_id('V3') is not None
+    assert [p['product_id'] for p in view.search_products(query='usb')] == ['V1']
+    assert view.search_products(max_price=250) == []
+
+    assert repo.get_product_by_id('V1')['product_name'] == 'Braided Cable'
+    assert repo.get_product_by_id('V3') is None
+    assert repo.search_products(query='usb') == []
+    assert repo.search_products(max_price=250)[0]['product_id'] == 'V1'
+
+
+def test_published_version_is_never_modified(versions_csv):
+    """Writers edit a fork: the old frame, numeric arrays and text index stay as they were"""
+    repo = CSVRepository(csv_path=versions_csv)
+    old = repo.version
+    old_names = old.df['product_name'].tolist()
+    old_prices = old.numeric['discounted_price'].copy()
+
+    repo.update_product('V2', {'product_name': 'Gaming Mouse', 'discounted_price': '₹799'})
+    repo.add_product({'product_id': 'V4', 'product_name': 'Gaming Keyboard'})
+
+    assert old.df['product_name'].tolist() == old_names
+    assert list(old.numeric['discounted_price']) == list(old_prices)
+    assert not old.text_index.match('gaming')['product_name'].any()
+    assert old.text_index.match('wireless')['product_name'].tolist() == [False, True, False]
+
+
+def test_writes_through_a_view_are_shared(versions_csv):
+    """A view's writes reach the shared catalog and the view reads its own write"""
+    repo = CSVRepository(csv_path=versions_csv)
+    view = repo.pinned()
+
+    view.update_product('V3', {'product_name': 'Monitor Stand'})
+
+    assert view.get_product_by_id('V3')['product_name'] == 'Monitor Stand'
+    assert repo.get_product_by_id('V3')['product_name'] == 'Monitor Stand'
+    assert repo.pinned().version is repo.version
+
+
+def test_search_during_writes_sees_whole_versions(versions_csv):
+    """Concurrent searches never observe a half-applied write"""
+    repo = CSVRepository(csv_path=versions_csv)
+    errors = []
+    done = threading.Event()
+
+    def search():
+        while not done.is_set():
+            try:
+                results = repo.search_products(query='cable')
+                names = {p['product_name'] for p in results}
+                # Exactly one of the two names exists in any version
+                assert len(names & {'USB Cable', 'USB-C Cable'}) == 1
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+                return
+
+    reader = threading.Thread(target=search)
+    reader.start()
+    for i in range(50):
+        repo.update_product('V1', {'product_name': 'USB-C Cable' if i % 2 == 0 else 'USB Cable'})
+    done.set()
+    reader.join()
+
+    assert errors == []
+
+
+@pytest.fixture
+def shared_versions_csv(versions_csv):
+    """Serve versions_csv as the shared catalog the routers use"""
+    reset_shared_repositories()
+    yield versions_csv
+    reset_shared_repositories()
+
+
+def test_responses_carry_catalog_version(shared_versions_csv, monkeypatch):
+    """Item endpoints report the version they were answered from"""
+    monkeypatch.setattr(csv_repo, 'DEFAULT_CSV_PATH', shared_versions_csv)
+    repo = get_shared_repository()
+    client = TestClient(create_app())
+
+    response = client.get("/items/search?q=cable")
+    before = response.json()["meta"]["catalog_version"]
+    assert response.headers[CATALOG_VERSION_HEADER] == str(before)
+
+    repo.update_product('V2', {'product_name': 'Wireless Mouse 2'})
+
+    assert client.get("/items/search?q=cable").json()["meta"]["catalog_version"] == before + 1
+    assert client.get("/items/V2").headers[CATALOG_VERSION_HEADER] == str(before + 1)
@@ -0,0 +1,120 @@
+"""Unit tests for the wishlist/cart co-occurrence recommendations"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos import cart_repo, co_occurrence, wishlist_repo
+from app.repos.cart_repo import CartRepo
+from app.repos.co_occurrence import CoOccurrenceIndex
+from app.repos.csv_repo import CSVRepository
+from app.repos.wishlist_repo import WishlistRepo
+
+
+@pytest.fixture
+def saved(tmp_path, monkeypatch):
+    """Wishlist and cart files, with the shared index built over them"""
+    wishlist = tmp_path / "wishlists.csv"
+    pd.DataFrame({
+        'user_id': [1, 1, 2, 2, 3],
+        'product_id': ['S1', 'S2', 'S1', 'S2', 'S1'],
+        'added_at': ['2025-01-01'] * 5,
+    }).to_csv(wishlist, index=False)
+    cart = tmp_path / "cart.csv"
+    pd.DataFrame({'user_id': [2, 2, 3], 'product_id': ['S3', 'S3', 'S3'], 'quantity': [1, 1, 2]}).to_csv(cart, index=False)
+
+    monkeypatch.setattr(cart_repo, 'CART_FILE', cart)
+    index = CoOccurrenceIndex({'wishlist': wishlist, 'cart': cart})
+    monkeypatch.setattr(co_occurrence, '_shared', index)
+    return wishlist, cart, index
+
+
+@pytest.fixture
+def catalog_csv(tmp_path):
+    """Create a catalog holding the saved products"""
+    csv_path = tmp_path / "products.csv"
+    pd.DataFrame({
+        'product_id': ['S1', 'S2', 'S3', 'S4'],
+        'product_name': ['Mouse', 'Keyboard', 'Monitor', 'Webcam'],
+        'category': ['Electronics'] * 4,
+        'rating': [4.1, 4.2, 4.3, 4.4],
+    }).to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_neighbours_from_both_sources(saved):
+    """Pairs count users holding both products; neighbours rank by cosine"""
+    _, _, index = saved
+    assert index.neighbours('S1') == [('S2', pytest.approx(2 / 6 ** 0.5)), ('S3', pytest.approx(2 / 6 ** 0.5))]
+    assert index.neighbours('S2') == [('S1', pytest.approx(2 / 6 ** 0.5)), ('S3', pytest.approx(0.5))]
+    assert index.neighbours('S4') == []
+    assert index.for_user(3) == [('S2', pytest.approx(2 / 6 ** 0.5 + 0.5))]
+
+
+def test_repo_writes_update_the_index(saved):
+    """Saves and removals through the repos update the counts without a rebuild"""
+    wishlist, cart, index = saved
+    index.neighbours('S4')  # cached, must be invalidated by the writes below
+
+    WishlistRepo(csv_path=str(wishlist)).add_to_wishlist(3, 'S4')
+    CartRepo.add_item('3', 'S4')
+    CartRepo.remove_item('2', 'S3')
+    WishlistRepo(csv_path=str(wishlist)).remove_from_wishlist(3, 'S4')
+
+    cart_repo.get_cart_index().compact()
+    rebuilt = CoOccurrenceIndex({'wishlist': wishlist, 'cart': cart})
+    for product_id in ('S1', 'S2', 'S3', 'S4'):
+        assert index.neighbours(product_id) == rebuilt.neighbours(product_id)
+    # S4 is still in user 3's cart after leaving the wishlist
+    assert [other for other, _ in index.neighbours('S4')] == ['S3', 'S1']
+    assert index.user_items(2) == ['S1', 'S2']
+
+
+def test_holder_changes_rescore_cached_neighbours(saved):
+    """A new holder of S1 changes its similarity in the cached lists of its co-holders"""
+    _, _, index = saved
+    before = index.neighbours('S2')
+    index.hold('wishlist', 4, 'S1')
+    assert index.neighbours('S2') != before
+    assert index.neighbours('S2')[0] == ('S1', pytest.approx(2 / 8 ** 0.5))
+
+
+def test_shared_index_reads_carts_from_memory(saved, monkeypatch):
+    """The process-wide build sees journaled cart lines without compacting cart.csv"""
+    wishlist, cart, _ = saved
+    monkeypatch.setattr(co_occurrence, '_shared', None)
+    monkeypatch.setattr(wishlist_repo, 'WISHLIST_FILE', wishlist)
+    CartRepo.add_item('1', 'S4')  # before the build: only in the cart journal
+
+    index = co_occurrence.get_co_occurrence_index()
+    assert cart_repo.journal_path(cart).exists()
+    assert 'S4' in [other for other, _ in index.neighbours('S1')]
+    CartRepo.remove_item('1', 'S4')  # after the build: reported through record()
+    assert index.neighbours('S4') == []
+
+
+def test_other_files_are_ignored(saved, tmp_path):
+    """A wishlist file the index is not built from does not change it"""
+    _, _, index = saved
+    WishlistRepo(csv_path=str(tmp_path / "other.csv")).add_to_wishlist(1, 'S4')
+    assert index.neighbours('S4') == []
+
+
+def test_endpoints(saved, catalog_csv):
+    """/items/recommend/for-me and the also_saved block of /items/{id}"""
+    app = create_app()
+    repo = CSVRepository(csv_path=catalog_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    body = client.get("/items/recommend/for-me", headers={"X-User-Id": "3"}).json()
+    assert body["based_on"] == 2
+    assert [(item['product_id'], item['product_name']) for item in body["items"]] == [('S2', 'Keyboard')]
+    assert body["items"][0]["score"] == pytest.approx(2 / 6 ** 0.5 + 0.5, abs=1e-4)
+
+    body = client.get("/items/recommend/for-me?fields=product_name,score", headers={"X-User-Id": "3"}).json()
+    assert list(body["items"][0]) == ['product_name', 'score']
+    assert client.get("/items/recommend/for-me", headers={"X-User-Id": "9"}).json() == {"items": [], "based_on": 0}
+
+    detail = client.get("/items/S2?fields=product_id").json()
+    assert detail["also_saved"] == [{'product_id': 'S1'}, {'product_id': 'S3'}]
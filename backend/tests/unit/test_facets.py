@@ -0,0 +1,78 @@
+"""Unit tests for search facet counts"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.sqlite_repo import SQLiteRepository
+
+
+@pytest.fixture
+def facet_csv(tmp_path):
+    """Create a catalog spread over two top-level categories"""
+    test_data = pd.DataFrame({
+        'product_id': ['F1', 'F2', 'F3', 'F4', 'F5'],
+        'product_name': ['USB Cable', 'HDMI Cable', 'Dell Laptop', 'Laptop Sleeve', 'Smart TV'],
+        'category': ['Electronics|Cables|USB', 'Electronics|Cables|HDMI', 'Computers|Laptops',
+                     'Computers|LaptopAccessories|Sleeves', 'Electronics'],
+        'discounted_price': ['₹299', '₹1,499', '₹45,999', '₹799', '₹24,999'],
+        'discount_percentage': ['50%', '10%', '5%', '80%', None],
+        'rating': [4.2, 3.1, 4.6, None, 4.0],
+        'about_product': ['charging cable', 'video cable', 'laptop', 'sleeve', 'display'],
+    })
+    csv_path = tmp_path / "facet_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def _counts(buckets):
+    return {bucket['label']: bucket['count'] for bucket in buckets if bucket['count']}
+
+
+def test_facets_of_whole_catalog(facet_csv, monkeypatch):
+    """Two category levels and the three histograms, counted without running a search"""
+    repo = CSVRepository(csv_path=facet_csv)
+    monkeypatch.setattr(repo, '_matching', lambda *args: pytest.fail("unfiltered facets ran a search"))
+    facets = repo.facet_counts()
+
+    assert facets['total'] == 5
+    assert [(c['value'], c['count']) for c in facets['categories']] == [('Electronics', 3), ('Computers', 2)]
+    assert facets['categories'][0]['subcategories'] == [{'value': 'Electronics|Cables', 'count': 2}]
+    assert _counts(facets['price_bands']) == {'0-500': 1, '500-1000': 1, '1000-2000': 1, '10000-25000': 1,
+                                              '25000+': 1}
+    assert _counts(facets['rating']) == {'3-3.5': 1, '4-4.5': 2, '4.5+': 1}
+    assert _counts(facets['discount']) == {'0-10': 1, '10-25': 1, '50-75': 1, '75+': 1}
+
+
+def test_facets_follow_search_filters_and_catalog_version(facet_csv):
+    """Counts cover exactly what the same search matches, per catalog version"""
+    repo = CSVRepository(csv_path=facet_csv)
+    facets = repo.facet_counts(query='cable', min_rating=4.0)
+    assert facets['total'] == len(repo.search_products(query='cable', min_rating=4.0)) == 1
+    assert repo.facet_counts(query='cable', min_rating=4.0) is facets
+
+    repo.update_product('F2', {'rating': 4.8})
+
+    assert repo.facet_counts(query='cable', min_rating=4.0)['total'] == 2
+
+
+def test_sqlite_facets_match(facet_csv, tmp_path):
+    """The SQLite backend returns the same counts"""
+    csv_repo = CSVRepository(csv_path=facet_csv)
+    sqlite_repo = SQLiteRepository.import_csv(facet_csv, tmp_path / "catalog.db")
+    for kwargs in ({}, dict(query='laptop'), dict(category='Electronics', max_price=2000)):
+        assert sqlite_repo.facet_counts(**kwargs) == csv_repo.facet_counts(**kwargs)
+
+
+def test_facets_endpoint(facet_csv):
+    """GET /items/facets takes the search filters"""
+    app = create_app()
+    repo = CSVRepository(csv_path=facet_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    response = client.get("/items/facets?category=Computers")
+
+    assert response.status_code == 200
+    assert response.json()["facets"]["total"] == 2
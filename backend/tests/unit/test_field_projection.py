@@ -0,0 +1,106 @@
+"""Unit tests for the fields= projection of product responses"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.cart_repo import CartRepo
+from app.repos.csv_repo import CSVRepository, FieldProjection, parse_fields
+from app.repos.sqlite_repo import SQLiteRepository
+from app.repos.wishlist_repo import WishlistRepo
+
+LIST_FIELDS = 'product_id,product_name,discounted_price,rating,img_link'
+
+
+@pytest.fixture
+def projection_csv(tmp_path):
+    """Create a catalog with long descriptions and review columns"""
+    test_data = pd.DataFrame({
+        'product_id': ['P1', 'P2', 'P3'],
+        'product_name': ['USB Cable', 'HDMI Cable', 'Power Adapter'],
+        'category': ['Electronics|Cables', 'Electronics|Cables', 'Electronics|Adapters'],
+        'discounted_price': ['₹299', '₹599', '₹899'],
+        'rating': [4.2, 4.5, 4.0],
+        'about_product': ['Fast charging USB cable ' * 20, 'High quality HDMI cable', 'Cable free adapter'],
+        'review_content': ['Good product', 'Great product', 'Nice product'],
+        'img_link': ['img1.jpg', 'img2.jpg', 'img3.jpg'],
+    })
+    csv_path = tmp_path / "projection_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def client(request, projection_csv, tmp_path):
+    """API client over either catalog backend"""
+    if request.param == 'csv':
+        repo = CSVRepository(csv_path=projection_csv)
+    else:
+        repo = SQLiteRepository.import_csv(projection_csv, tmp_path / "catalog.db")
+    app = create_app()
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    return TestClient(app)
+
+
+def test_parse_fields():
+    """Names are trimmed and deduplicated in request order; unknown names are rejected"""
+    available = ['product_id', 'product_name', 'rating']
+    assert parse_fields(None, available) is None
+    assert parse_fields(' rating, product_id,rating ', available) == ['rating', 'product_id']
+    with pytest.raises(ValueError, match='review_content'):
+        parse_fields('product_id,review_content', available)
+    with pytest.raises(ValueError):
+        parse_fields(' , ', available)
+
+
+def test_field_projection_around_a_computed_field():
+    """product_id is always read; the computed field is added only when requested"""
+    product = {'product_id': 'P1', 'product_name': 'USB Cable', 'rating': 4.2}
+    projection = FieldProjection(['rating', 'score'], 'score')
+    assert projection.read == ['rating', 'product_id']
+    assert projection.apply(product, 1.5) == {'rating': 4.2, 'score': 1.5}
+    assert FieldProjection(['product_name'], 'score').apply(product, 1.5) == {'product_name': 'USB Cable'}
+    assert FieldProjection(None, 'score').apply(dict(product), 1.5) == {**product, 'score': 1.5}
+    assert FieldProjection(None).read is None
+
+
+def test_search_projection(client):
+    """Search returns exactly the requested fields, highlighted_fields included on request"""
+    products = client.get(f"/items/search?q=cable&fields={LIST_FIELDS}").json()["products"]
+    assert [list(p) for p in products] == [LIST_FIELDS.split(',')] * 3
+
+    products = client.get("/items/search?q=cable&fields=product_id,highlighted_fields").json()["products"]
+    highlighted = {p['product_id']: p['highlighted_fields'] for p in products}
+    assert all(list(p) == ['product_id', 'highlighted_fields'] for p in products)
+    assert highlighted == {'P1': ['product_name', 'category', 'about_product'],
+                           'P2': ['product_name', 'category', 'about_product'], 'P3': ['about_product']}
+
+    response = client.get("/items/search?q=cable&fields=product_id,review_content")
+    assert response.status_code == 400
+    assert 'review_content' in response.json()["detail"]
+
+
+def test_detail_projection(client):
+    """The product and its related products are both projected"""
+    body = client.get("/items/P1?fields=product_id,rating").json()
+    assert body["product"] == {'product_id': 'P1', 'rating': 4.2}
+    assert body["related"][0] == {'product_id': 'P2', 'rating': 4.5}
+    assert all(list(p) == ['product_id', 'rating'] for p in body["related"])
+    assert client.get("/items/P1?fields=bogus").status_code == 400
+
+
+def test_wishlist_and_cart_projection(client, monkeypatch):
+    """Saved products carry only the requested fields, the cart quantity included"""
+    monkeypatch.setattr(WishlistRepo, 'get_user_wishlist', lambda self, user_id: ['P3', 'P1'])
+    monkeypatch.setattr(CartRepo, 'get_items', staticmethod(lambda user_id: [{'product_id': 'P2', 'quantity': 2}]))
+
+    wishlist = client.get("/wishlist?fields=product_id,product_name").json()
+    assert wishlist["products"] == [{'product_id': 'P1', 'product_name': 'USB Cable'},
+                                    {'product_id': 'P3', 'product_name': 'Power Adapter'}]
+    assert 'about_product' in client.get("/wishlist").json()["products"][0]
+
+    assert client.get("/cart?fields=product_name,quantity").json() == [{'product_name': 'HDMI Cable', 'quantity': 2}]
+    assert client.get("/cart?fields=product_id").json() == [{'product_id': 'P2'}]
+    assert client.get("/cart").json()[0]['quantity'] == 2
+    assert client.get("/cart?fields=quantity").json() == [{'quantity': 2}]
+    assert client.get("/cart?fields=about").status_code == 400
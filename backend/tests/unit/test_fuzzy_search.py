@@ -0,0 +1,76 @@
+"""Unit tests for typo-tolerant (trigram) search"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.trigram_index import TrigramIndex, trigrams
+
+
+@pytest.fixture
+def fuzzy_csv(tmp_path):
+    """Create a catalog with headphones, chargers and a cable"""
+    test_data = pd.DataFrame({
+        'product_id': ['Z1', 'Z2', 'Z3', 'Z4'],
+        'product_name': ['Wireless Headphones', 'Wall Charger', 'USB Charger Cable', 'Laptop Stand'],
+        'category': ['Electronics|Headphones', 'Electronics|Chargers', 'Electronics|Cables',
+                     'Computers|LaptopAccessories'],
+        'rating': [4.1, 4.3, 4.0, 3.9],
+        'about_product': ['over-ear', 'fast', 'charges phones', 'aluminium'],
+    })
+    csv_path = tmp_path / "fuzzy_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def _ids(products):
+    return [product['product_id'] for product in products]
+
+
+def test_trigram_similarity():
+    """Similar words are found by trigram overlap, best first"""
+    index = TrigramIndex(['headphones', 'headphone', 'phones', 'charger', 'laptop'])
+
+    assert len(trigrams('charger')) == 8
+    words = [word for word, _ in index.similar('hedphones')]
+    assert words[:2] == ['headphones', 'headphone']
+    assert 'laptop' not in words
+    assert index.similar('charger')[0] == ('charger', 1.0)
+    assert index.similar('zzz') == []
+
+
+def test_misspelled_queries_find_products(fuzzy_csv):
+    """Typos that match nothing exactly still find the intended products"""
+    repo = CSVRepository(csv_path=fuzzy_csv)
+
+    assert repo.search_products(query='hedphones') == []
+    assert _ids(repo.search_products(query='hedphones', fuzzy=True)) == ['Z1']
+    # Both chargers match; the better rated one first on equal similarity
+    assert _ids(repo.search_products(query='chargr', fuzzy=True)) == ['Z2', 'Z3']
+    # Every query word must be matched
+    assert _ids(repo.search_products(query='usb chargr', fuzzy=True)) == ['Z3']
+
+
+def test_fuzzy_index_follows_admin_writes(fuzzy_csv):
+    """Words introduced by an edit become fuzzy-searchable"""
+    repo = CSVRepository(csv_path=fuzzy_csv)
+    repo.search_products(query='stand', fuzzy=True)
+
+    repo.update_product('Z4', {'product_name': 'Laptop Riser'})
+
+    assert _ids(repo.search_products(query='risr', fuzzy=True)) == ['Z4']
+    assert repo.search_products(query='stnd', fuzzy=True) == []
+
+
+def test_search_endpoint_fuzzy_flag(fuzzy_csv):
+    """GET /items/search?fuzzy=true enables typo tolerance"""
+    app = create_app()
+    repo = CSVRepository(csv_path=fuzzy_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    assert client.get("/items/search?q=hedphones").json()["pagination"]["total_results"] == 0
+    body = client.get("/items/search?q=hedphones&fuzzy=true").json()
+    assert _ids(body["products"]) == ['Z1']
+    assert body["meta"]["fuzzy"] is True
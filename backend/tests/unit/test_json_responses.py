@@ -0,0 +1,93 @@
+"""Unit tests for the columnar search formatting and the fast JSON responses"""
+import json
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api import responses
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.sqlite_repo import SQLiteRepository
+
+
+@pytest.fixture
+def sparse_csv(tmp_path):
+    """Create a catalog with missing values in text and numeric columns"""
+    test_data = pd.DataFrame({
+        'product_id': ['J1', 'J2', 'J3'],
+        'product_name': ['USB Cable', 'HDMI Cable', None],
+        'category': ['Electronics|Cables', None, 'Electronics|Adapters'],
+        'discounted_price': ['₹299', None, '₹899'],
+        'rating': [4.2, None, 4.0],
+        'rating_count': ['1,000', '500', None],
+        'about_product': ['Fast charging USB cable', None, 'Universal cable adapter'],
+        'img_link': ['img1.jpg', 'img2.jpg', None],
+    })
+    csv_path = tmp_path / "sparse_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_missing_values_are_none_after_load(sparse_csv):
+    """NaN becomes None once at load, also for added products and new columns"""
+    repo = CSVRepository(csv_path=sparse_csv)
+    assert repo.get_product_by_id('J2')['category'] is None
+    assert repo.get_product_by_id('J2')['rating'] is None
+
+    repo.add_product({'product_id': 'J4', 'product_name': 'Cable Tie', 'brand': 'Acme'})
+    added = repo.get_product_by_id('J4')
+    assert added['rating'] is None and added['brand'] == 'Acme'
+    assert repo.get_product_by_id('J1')['brand'] is None
+    assert repo.numeric['rating'][0] == pytest.approx(4.2)
+
+
+@pytest.mark.parametrize('query, compact', [(None, False), ('cable', False), ('CABLE', True)])
+def test_frame_formatting_matches_records(sparse_csv, query, compact):
+    """Formatting a page frame column by column gives the same rows as the dict path"""
+    repo = CSVRepository(csv_path=sparse_csv)
+    records = repo.search_products(query=query)
+    frame = repo.search_products(query=query, as_frame=True)
+
+    assert isinstance(frame, pd.DataFrame)
+    assert repo.format_for_display(frame, query=query, compact=compact) == \
+        repo.format_for_display(records, query=query, compact=compact)
+
+
+def test_search_response_is_rendered_directly(sparse_csv):
+    """/items/search renders missing values as null and keeps dependency headers"""
+    app = create_app()
+    repo = CSVRepository(csv_path=sparse_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    response = client.get("/items/search?q=cable&size=2")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert [p['product_id'] for p in body["products"]] == ['J1', 'J2']
+    assert body["products"][1]["category"] is None
+    assert body["products"][1]["highlighted_fields"] == ['product_name']
+    assert body["pagination"]["next_cursor"] is not None
+
+    detail = client.get("/items/J3").json()
+    assert detail["product"]["product_name"] is None
+
+
+def test_dumps_without_orjson(monkeypatch):
+    """The standard json fallback writes the same compact JSON, NaN as null"""
+    content = {"a": [1, 2.5, None, "₹299"], "b": float('nan')}
+    expected = {"a": [1, 2.5, None, "₹299"], "b": None}
+    assert json.loads(responses.dumps(content)) == expected
+
+    monkeypatch.setattr(responses, 'orjson', None)
+    assert responses.dumps(content) == '{"a":[1,2.5,null,"₹299"],"b":null}'.encode('utf-8')
+
+
+def test_sqlite_search_as_frame(sparse_csv, tmp_path):
+    """The SQLite backend returns the same page frame shape"""
+    repo = SQLiteRepository.import_csv(sparse_csv, tmp_path / "catalog.db")
+    frame = repo.search_products(query='cable', as_frame=True)
+
+    assert list(frame['product_id']) == ['J1', 'J2', 'J3']
+    assert repo.format_for_display(frame, query='cable') == \
+        repo.format_for_display(repo.search_products(query='cable'), query='cable')
@@ -0,0 +1,79 @@
+"""Unit tests for the numeric columns parsed at load time"""
+import math
+import pytest
+import pandas as pd
+from app.repos.csv_repo import CSVRepository
+
+
+@pytest.fixture
+def numeric_test_csv(tmp_path):
+    """Create a test CSV with formatted prices, discounts and counts"""
+    test_data = pd.DataFrame({
+        'product_id': ['N1', 'N2', 'N3'],
+        'product_name': ['Budget Kettle', 'Smart TV', 'Broken Listing'],
+        'category': ['Home|Kettles', 'Electronics|Televisions', 'Home|Kettles'],
+        'discounted_price': ['₹1,099', '₹24,999', 'n/a'],
+        'actual_price': ['₹1,999', '₹49,999', '₹500'],
+        'discount_percentage': ['45%', '50%', '0%'],
+        'rating': ['4.1', '4.4', '|'],
+        'rating_count': ['24,269', '1,200', None],
+        'about_product': ['Steel kettle', '55 inch smart tv', 'Missing price'],
+    })
+    csv_path = tmp_path / "numeric_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_numeric_columns_are_parsed(numeric_test_csv):
+    """Prices, discounts, ratings and counts are parsed once into typed arrays"""
+    repo = CSVRepository(csv_path=numeric_test_csv)
+
+    assert list(repo.numeric['discounted_price'][:2]) == [1099.0, 24999.0]
+    assert list(repo.numeric['actual_price']) == [1999.0, 49999.0, 500.0]
+    assert list(repo.numeric['discount_percentage']) == [45.0, 50.0, 0.0]
+    assert repo.numeric['rating'][0] == pytest.approx(4.1)
+    assert list(repo.numeric['rating_count']) == [24269, 1200, 0]
+    assert repo.numeric['rating_count'].dtype.kind == 'i'
+
+
+def test_unparseable_values_become_nan(numeric_test_csv):
+    """Malformed display values do not break parsing"""
+    repo = CSVRepository(csv_path=numeric_test_csv)
+
+    assert math.isnan(repo.numeric['discounted_price'][2])
+    assert math.isnan(repo.numeric['rating'][2])
+
+
+def test_display_strings_are_preserved(numeric_test_csv):
+    """Responses still carry the original formatted strings"""
+    repo = CSVRepository(csv_path=numeric_test_csv)
+    product = repo.get_product_by_id('N1')
+
+    assert product['discounted_price'] == '₹1,099'
+    assert product['discount_percentage'] == '45%'
+
+
+def test_filters_skip_unparseable_rows(numeric_test_csv):
+    """Rows with missing numbers are excluded from numeric filters instead of erroring"""
+    repo = CSVRepository(csv_path=numeric_test_csv)
+    results = repo.search_products(max_price=30000, min_rating=4.0)
+
+    assert [p['product_id'] for p in results] == ['N1', 'N2']
+    assert 'rating_float' not in results[0]
+
+
+def test_admin_writes_refresh_numeric_columns(numeric_test_csv):
+    """Updating, adding and deleting products keeps the arrays aligned"""
+    repo = CSVRepository(csv_path=numeric_test_csv)
+
+    repo.update_product('N2', {'discounted_price': '₹19,999'})
+    assert repo.numeric['discounted_price'][1] == 19999.0
+
+    repo.add_product({'product_id': 'N4', 'product_name': 'Mini Fridge',
+                      'discounted_price': '₹7,500', 'rating': 3.9})
+    assert len(repo.numeric['discounted_price']) == len(repo.df)
+    assert repo.numeric['discounted_price'][-1] == 7500.0
+
+    repo.delete_product('N1')
+    results = repo.search_products(max_price=10000)
+    assert [p['product_id'] for p in results] == ['N4']
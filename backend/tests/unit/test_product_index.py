@@ -0,0 +1,81 @@
+"""Unit tests for the product_id -> row position index"""
+import pytest
+import pandas as pd
+from app.core.errors import Conflict
+from app.repos.csv_repo import CSVRepository
+
+
+@pytest.fixture
+def duplicate_ids_csv(tmp_path):
+    """Create a test CSV that repeats an ASIN like the Amazon dataset does"""
+    test_data = pd.DataFrame({
+        'product_id': ['A1', 'A2', 'A1', 'A3'],
+        'product_name': ['Phone Case', 'Earbuds', 'Phone Case', 'Power Bank'],
+        'category': ['Mobiles|Cases', 'Audio|Earbuds', 'Mobiles|Cases', 'Mobiles|Chargers'],
+        'discounted_price': ['₹199', '₹999', '₹199', '₹1,299'],
+        'rating': [4.0, 4.3, 4.0, 4.1],
+        'about_product': ['Slim case', 'Wireless earbuds', 'Slim case', '10000mAh'],
+        'review_id': ['R1', 'R2', 'R3', 'R4'],
+    })
+    csv_path = tmp_path / "index_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_repeated_rows_load_as_one_product(duplicate_ids_csv):
+    """Repeated ASIN rows load as one product at its first position"""
+    repo = CSVRepository(csv_path=duplicate_ids_csv)
+
+    assert repo._positions_for('A1') == [0]
+    assert repo._positions_for('A3') == [2]
+    assert repo._positions_for('missing') == []
+    assert repo.get_product_by_id('A1')['product_name'] == 'Phone Case'
+
+
+def test_adding_a_taken_id_is_rejected(duplicate_ids_csv):
+    """A second product with an existing id is a 409, not a second row"""
+    repo = CSVRepository(csv_path=duplicate_ids_csv)
+
+    with pytest.raises(Conflict) as error:
+        repo.add_product({'product_id': 'A1', 'product_name': 'Phone Case v2'})
+    assert error.value.status_code == 409
+    assert repo._positions_for('A1') == [0]
+    assert len(repo.df) == 3
+
+
+def test_duplicate_add_leaves_journal_and_replay_in_step(duplicate_ids_csv):
+    """Only the accepted add is journaled, so a restart sees the live catalog"""
+    repo = CSVRepository(csv_path=duplicate_ids_csv)
+    repo.add_product({'product_id': 'A4', 'product_name': 'Stylus'})
+    with pytest.raises(Conflict):
+        repo.add_product({'product_id': 'A4', 'product_name': 'Stylus Pro'})
+
+    reloaded = CSVRepository(csv_path=duplicate_ids_csv)
+    assert reloaded.df['product_id'].tolist() == repo.df['product_id'].tolist() == ['A1', 'A2', 'A3', 'A4']
+    assert reloaded.get_product_by_id('A4')['product_name'] == 'Stylus'
+
+
+def test_multi_get_matches_catalog_order(duplicate_ids_csv):
+    """Batch lookups return every matching row in catalog order"""
+    repo = CSVRepository(csv_path=duplicate_ids_csv)
+    repo.add_product({'product_id': 'A4', 'product_name': 'Stylus'})
+    results = repo.get_products_by_ids(['A4', 'A1', 'A3', 'missing'])
+
+    assert [p['product_name'] for p in results] == ['Phone Case', 'Power Bank', 'Stylus']
+
+
+def test_index_follows_admin_writes(duplicate_ids_csv):
+    """add/update/delete keep the index in sync with the frame"""
+    repo = CSVRepository(csv_path=duplicate_ids_csv)
+
+    repo.add_product({'product_id': 'A4', 'product_name': 'Stylus'})
+    assert repo.get_product_by_id('A4')['product_name'] == 'Stylus'
+
+    repo.delete_product('A1')
+    assert repo.get_product_by_id('A1') is None
+    assert repo._positions_for('A2') == [0]
+    assert repo.get_product_by_id('A4')['product_name'] == 'Stylus'
+
+    repo.update_product('A2', {'product_id': 'A2-NEW'})
+    assert repo.get_product_by_id('A2') is None
+    assert repo.get_product_by_id('A2-NEW')['product_name'] == 'Earbuds'
@@ -0,0 +1,84 @@
+"""Unit tests for the pluggable search rankers"""
+import pytest
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.ranking import BM25Ranker, get_ranker
+
+
+@pytest.fixture
+def ranking_test_csv(tmp_path):
+    """Products where a boolean score ties but term statistics do not"""
+    test_data = pd.DataFrame({
+        'product_id': ['K1', 'K2', 'K3', 'K4'],
+        'product_name': ['Kettle', 'Electric Kettle Steel Body 1.5 Litre Auto Shutoff', 'Tea Cups', 'Smartphone 5G'],
+        'category': ['Home|Kitchen|Kettles', 'Home|Kitchen|Kettles', 'Home|Kitchen|Cups',
+                     'Electronics|Mobiles|Smartphones|Basic'],
+        'about_product': ['Kettle kettle kettle', 'Kettle that boils water', 'Goes well with a kettle', 'Phone with kettle app'],
+        'rating': [3.0, 4.9, 4.0, 4.1],
+    })
+    # Unrelated products so "kettle" is not in every document (keeps its idf meaningful)
+    filler = pd.DataFrame({
+        'product_id': [f'F{i}' for i in range(8)],
+        'product_name': ['Desk Lamp', 'Mouse Pad', 'HDMI Cable', 'Yoga Mat', 'Water Bottle', 'Notebook', 'Pen Set', 'Backpack'],
+        'category': ['Home|Lighting', 'Computers|Accessories', 'Electronics|Cables', 'Sports|Fitness',
+                     'Sports|Bottles', 'Office|Paper', 'Office|Pens', 'Bags|Backpacks'],
+        'about_product': ['Bright lamp', 'Smooth pad', 'Fast cable', 'Thick mat', 'Steel bottle', 'Ruled pages', 'Blue ink', 'Laptop bag'],
+        'rating': [4.0] * 8,
+    })
+    test_data = pd.concat([test_data, filler], ignore_index=True)
+    csv_path = tmp_path / "ranking_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_default_ranker_keeps_flag_scores(ranking_test_csv):
+    """Without rank= the original flag score orders results (ties broken by rating)"""
+    repo = CSVRepository(csv_path=ranking_test_csv)
+    results = repo.search_products(query='kettle')
+
+    # K1 and K2 tie on flags (name + category + description), so rating decides
+    assert [p['product_id'] for p in results][:2] == ['K2', 'K1']
+
+
+def test_bm25_uses_term_statistics(ranking_test_csv):
+    """BM25 rewards repeated terms in short fields over the higher rated tie"""
+    repo = CSVRepository(csv_path=ranking_test_csv)
+    results = repo.search_products(query='kettle', rank='bm25')
+
+    assert results[0]['product_id'] == 'K1'
+    assert {p['product_id'] for p in results} == {'K1', 'K2', 'K3', 'K4'}
+    assert 'relevance_score' not in results[0]
+
+
+def test_bm25_applies_main_product_prior(ranking_test_csv):
+    """The main-product boost is added as a static prior, scaled to the query"""
+    repo = CSVRepository(csv_path=ranking_test_csv)
+    rows = np.array([2, 3])  # both only mention kettle in the description
+    matches = repo.text_index.match('kettle')
+    features = repo.version.features
+
+    with_prior = BM25Ranker().score(repo.text_index, rows, 'kettle', matches, features)
+    without_prior = BM25Ranker(prior_weight=0).score(repo.text_index, rows, 'kettle', matches, features)
+
+    assert with_prior[1] > without_prior[1]
+    assert with_prior[0] == pytest.approx(without_prior[0])
+
+
+def test_unknown_ranker_is_rejected(ranking_test_csv):
+    """Unknown ranker names raise in the repo and return 400 from the API"""
+    with pytest.raises(ValueError):
+        get_ranker('pagerank')
+
+    app = create_app()
+    repo = CSVRepository(csv_path=ranking_test_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    assert client.get("/items/search?q=kettle&rank=pagerank").status_code == 400
+    response = client.get("/items/search?q=kettle&rank=bm25")
+    assert response.status_code == 200
+    assert response.json()["meta"]["rank"] == 'bm25'
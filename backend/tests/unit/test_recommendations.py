@@ -0,0 +1,75 @@
+"""Unit tests for the index-backed /items/recommend scorer"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.sqlite_repo import SQLiteRepository
+from app.services.items_recommendation_service import recommend_items_for_query
+
+
+@pytest.fixture
+def recommend_csv(tmp_path):
+    """Create a catalog where names, categories and descriptions match differently"""
+    test_data = pd.DataFrame({
+        'product_id': ['K1', 'K2', 'K3', 'K4', 'K5'],
+        'product_name': ['USB Cable', 'Braided Cable', 'Wall Charger', 'Desk Lamp', 'HDMI Adapter'],
+        'category': ['Electronics|Cables', 'Electronics|Cables', 'Electronics|Chargers', 'Home|Lighting',
+                     'Electronics|Adapters'],
+        'rating': [4.2, 4.6, 4.0, 3.9, None],
+        'about_product': ['Fast usb cable', 'Strong nylon', 'Charges a usb cable fast', 'Warm light',
+                          'Cable free'],
+    })
+    csv_path = tmp_path / "recommend_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def repo(request, recommend_csv, tmp_path):
+    """Either catalog backend"""
+    if request.param == 'csv':
+        return CSVRepository(csv_path=recommend_csv)
+    return SQLiteRepository.import_csv(recommend_csv, tmp_path / "catalog.db")
+
+
+def test_scores_and_order(repo):
+    """Field substring bonuses (3/2/1) plus 0.5 per query word, best first"""
+    items, total = recommend_items_for_query('usb cable', limit=10, repo=repo)
+
+    assert total == 4
+    assert [(item['product_id'], item['score']) for item in items] == [
+        ('K1', 5.0), ('K3', 2.0), ('K2', 0.5), ('K5', 0.5)]
+    assert items[0]['product_name'] == 'USB Cable'
+
+
+def test_substring_without_word_bonus(repo):
+    """A fragment of a word earns the field bonus but no word bonus"""
+    items, total = recommend_items_for_query('cabl', limit=10, repo=repo)
+
+    assert total == 4
+    assert {item['product_id']: item['score'] for item in items} == {'K1': 6.0, 'K2': 5.0, 'K3': 1.0, 'K5': 1.0}
+    assert [item['product_id'] for item in items][:2] == ['K1', 'K2']
+
+
+def test_limit_and_empty_queries(repo):
+    """Only `limit` items come back while total counts every match"""
+    items, total = recommend_items_for_query('cable', limit=1, repo=repo)
+    assert [item['product_id'] for item in items] == ['K1'] and total == 4
+    assert recommend_items_for_query('  ', repo=repo) == ([], 0)
+    assert recommend_items_for_query('zebra', repo=repo) == ([], 0)
+
+
+def test_recommendations_follow_admin_writes(recommend_csv):
+    """A write publishes a version whose index the scorer reads"""
+    repo = CSVRepository(csv_path=recommend_csv)
+    repo.update_product('K4', {'product_name': 'Cable Lamp'})
+    items, total = recommend_items_for_query('lamp', limit=10, repo=repo)
+    assert [item['product_id'] for item in items] == ['K4'] and total == 1
+
+    app = create_app()
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    body = TestClient(app).get("/items/recommend?query=cable%20lamp&limit=2").json()
+    assert body["total_found"] == 5
+    assert body["items"][0]["product_id"] == 'K4'
@@ -0,0 +1,113 @@
+"""Unit tests for the precomputed related-products index"""
+import numpy as np
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos import csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.related_index import RELATED_K, RelatedIndex
+
+
+@pytest.fixture
+def related_csv(tmp_path):
+    """Create a catalog of cables, chargers and books"""
+    test_data = pd.DataFrame({
+        'product_id': ['R1', 'R2', 'R3', 'R4', 'R5', 'R6'],
+        'product_name': ['USB C Cable', 'USB C Braided Cable', 'HDMI Cable',
+                         'Wall Charger', 'Python Cookbook', 'Cooking Basics'],
+        'category': ['Electronics|Cables|USB', 'Electronics|Cables|USB', 'Electronics|Cables|HDMI',
+                     'Electronics|Chargers', 'Books|Programming', 'Books|Cooking'],
+        'rating': [4.2, 4.5, 4.0, 3.9, 4.8, 4.1],
+        'rating_count': ['1,000', '500', '800', '300', '50', '20'],
+        'about_product': ['Fast charging USB C cable', 'Durable braided USB C cable for fast charging',
+                          'High speed HDMI cable', 'Fast charger for USB C phones',
+                          'Recipes for Python programmers', 'Everyday recipes'],
+    })
+    csv_path = tmp_path / "related_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def _ids(repo, product_id):
+    return [p['product_id'] for p in repo.get_related_products(product_id, limit=RELATED_K)]
+
+
+def test_related_by_text_and_category(related_csv):
+    """Neighbours are ranked by similarity and never cross the top-level category"""
+    repo = CSVRepository(csv_path=related_csv)
+    index = repo.version.related_index
+
+    assert index.neighbours.dtype == np.int32 and index.neighbours.shape == (6, RELATED_K)
+    assert _ids(repo, 'R1')[0] == 'R2'
+    assert set(_ids(repo, 'R1')) == {'R2', 'R3', 'R4'}
+    assert _ids(repo, 'R5') == ['R6']
+    assert [p['product_id'] for p in repo.get_related_products('R1', limit=2)] == _ids(repo, 'R1')[:2]
+    assert repo.get_related_products('MISSING') == []
+
+
+def test_loading_builds_no_derived_indexes(related_csv, monkeypatch):
+    """Loads and reloads leave the related, typeahead and similar indexes to first use"""
+    def no_build(*args, **kwargs):
+        raise AssertionError("built an index while loading")
+    for name in ('RelatedIndex', 'SuggestIndex'):
+        monkeypatch.setattr(csv_repo, name, no_build)
+    monkeypatch.setattr(csv_repo.SimilarIndex, 'build', staticmethod(no_build))
+    monkeypatch.setattr(csv_repo.SimilarIndex, 'load', staticmethod(no_build))
+
+    repo = CSVRepository(csv_path=related_csv)
+    repo.refresh_if_stale()
+    repo._reload()
+    assert repo.get_product_by_id('R1')['product_id'] == 'R1'
+
+    monkeypatch.undo()
+    assert _ids(repo, 'R1')
+
+
+def test_related_without_category(tmp_path):
+    """Rows without a category have no related products"""
+    csv_path = tmp_path / "plain.csv"
+    pd.DataFrame({'product_id': ['A', 'B'], 'product_name': ['Cable', 'Cable']}).to_csv(csv_path, index=False)
+    repo = CSVRepository(csv_path=str(csv_path))
+    assert repo.get_related_products('A') == []
+
+
+def test_incremental_writes_match_a_rebuild(related_csv):
+    """Adds, updates and deletes keep the index equal to one built from scratch"""
+    repo = CSVRepository(csv_path=related_csv)
+    repo.add_product({'product_id': 'R7', 'product_name': 'USB C Fast Cable',
+                      'category': 'Electronics|Cables|USB', 'about_product': 'Fast charging cable'})
+    repo.update_product('R4', {'category': 'Books|Cooking', 'about_product': 'Everyday recipes'})
+    repo.delete_product('R3')
+
+    version = repo.version
+    rebuilt = RelatedIndex(version.text_index, version.df['category'], version.numeric['rating_count'])
+    for position in range(len(version.df)):
+        assert set(version.related_index.related(position)) == set(rebuilt.related(position))
+    assert 'R7' in _ids(repo, 'R1')
+    assert 'R4' in _ids(repo, 'R6') and 'R4' not in _ids(repo, 'R2')
+    assert 'R3' not in _ids(repo, 'R1')
+
+
+def test_pinned_version_keeps_its_neighbours(related_csv):
+    """A write publishes a new index; a pinned reader keeps the old lists"""
+    repo = CSVRepository(csv_path=related_csv)
+    view = repo.pinned()
+    before = view.version.related_index.neighbours.copy()
+
+    repo.delete_product('R2')
+    assert np.array_equal(view.version.related_index.neighbours, before)
+    assert 'R2' in _ids(view, 'R1') and 'R2' not in _ids(repo, 'R1')
+
+
+def test_item_detail_related(related_csv):
+    """/items/{id} lists the related products, most similar first"""
+    app = create_app()
+    repo = CSVRepository(csv_path=related_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    body = client.get("/items/R1?fields=product_id").json()
+    assert body["related"][0] == {'product_id': 'R2'}
+    assert all(p['product_id'] not in ('R1', 'R5', 'R6') for p in body["related"])
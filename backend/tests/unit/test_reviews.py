@@ -0,0 +1,89 @@
+"""Unit tests for the separate product and review tables"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository, REVIEW_COLUMNS
+
+
+@pytest.fixture
+def review_test_csv(tmp_path):
+    """Create a CSV that repeats a product row once per review, like amazon.csv"""
+    rows = []
+    for i in range(3):
+        rows.append({'product_id': 'R1', 'product_name': 'USB Cable', 'category': 'Electronics|Cables',
+                     'rating': 4.2, 'about_product': 'Fast charging cable',
+                     'user_id': f'U{i}', 'user_name': f'User {i}', 'review_id': f'RV{i}',
+                     'review_title': 'Good', 'review_content': f'Review number {i}'})
+    rows.append({'product_id': 'R2', 'product_name': 'Smart TV', 'category': 'Electronics|Televisions',
+                 'rating': 4.5, 'about_product': '43 inch smart tv',
+                 'user_id': 'U9', 'user_name': 'User 9', 'review_id': 'RV9',
+                 'review_title': 'Great', 'review_content': 'Sharp picture'})
+    csv_path = tmp_path / "review_products.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_products_are_deduplicated(review_test_csv):
+    """Each product appears once and search totals count products, not reviews"""
+    repo = CSVRepository(csv_path=review_test_csv)
+    results, total = repo.search_products(query='cable', return_total=True)
+
+    assert len(repo.df) == 2
+    assert total == 1
+    assert not any(col in results[0] for col in REVIEW_COLUMNS)
+
+
+def test_reviews_are_paginated(review_test_csv):
+    """Reviews are served per product, in file order, one page at a time"""
+    repo = CSVRepository(csv_path=review_test_csv)
+
+    page, total = repo.get_reviews('R1', limit=2, offset=0)
+    assert total == 3
+    assert [r['review_id'] for r in page] == ['RV0', 'RV1']
+
+    page, _ = repo.get_reviews('R1', limit=2, offset=2)
+    assert [r['review_id'] for r in page] == ['RV2']
+
+    assert repo.get_reviews('missing') == ([], 0)
+
+
+def test_save_keeps_review_rows(review_test_csv):
+    """Writing the catalog restores the one-row-per-review file layout"""
+    repo = CSVRepository(csv_path=review_test_csv)
+    repo.update_product('R2', {'product_name': 'Smart LED TV'})
+    repo.compact()
+
+    saved = pd.read_csv(review_test_csv)
+    assert list(saved.columns) == list(pd.read_csv(review_test_csv, nrows=0).columns)
+    assert len(saved) == 4
+    assert saved.loc[saved['review_id'] == 'RV9', 'product_name'].item() == 'Smart LED TV'
+
+    reloaded = CSVRepository(csv_path=review_test_csv)
+    assert reloaded.get_reviews('R1')[1] == 3
+
+
+def test_delete_removes_reviews(review_test_csv):
+    """Deleting a product drops its reviews too"""
+    repo = CSVRepository(csv_path=review_test_csv)
+    repo.delete_product('R1')
+
+    assert repo.get_reviews('R1') == ([], 0)
+    assert repo.get_reviews('R2')[1] == 1
+
+
+def test_reviews_endpoint(review_test_csv):
+    """GET /items/{id}/reviews pages through reviews and 404s for unknown products"""
+    app = create_app()
+    repo = CSVRepository(csv_path=review_test_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    response = client.get("/items/R1/reviews?page=2&size=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [r['review_id'] for r in data['reviews']] == ['RV2']
+    assert data['pagination'] == {'page': 2, 'size': 2, 'total_results': 3, 'total_pages': 2, 'has_more': False}
+
+    assert client.get("/items/NOPE/reviews").status_code == 404
@@ -0,0 +1,110 @@
+"""Unit tests for the search result cache"""
+import pytest
+import pandas as pd
+import numpy as np
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.search_cache import SearchCache, search_key
+
+
+@pytest.fixture
+def cache_csv(tmp_path):
+    """Create a catalog with several cable products"""
+    test_data = pd.DataFrame({
+        'product_id': [f'C{i}' for i in range(6)],
+        'product_name': ['USB Cable', 'HDMI Cable', 'Laptop', 'Braided Cable', 'Mouse', 'Cable Organizer'],
+        'category': ['Electronics|Accessories'] * 6,
+        'discounted_price': ['₹299', '₹399', '₹45,999', '₹199', '₹499', '₹99'],
+        'rating': [4.2, 4.5, 4.0, 3.9, 4.1, 4.4],
+        'about_product': ['charging', 'video', 'computer', 'nylon', 'wireless', 'desk'],
+    })
+    csv_path = tmp_path / "cache_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_pages_slice_one_cached_ranking(cache_csv, monkeypatch):
+    """The first page ranks the whole result set; later pages reuse it"""
+    repo = CSVRepository(csv_path=cache_csv)
+    calls = []
+    original = repo._ranked_positions
+    monkeypatch.setattr(repo, '_ranked_positions', lambda *args: calls.append(1) or original(*args))
+
+    first, total = repo.search_products(query='cable', limit=2, return_total=True)
+    second = repo.search_products(query='CABLE', limit=2, offset=2)
+    expected = CSVRepository(csv_path=cache_csv, search_cache=SearchCache(max_entries=0)).search_products(query='cable')
+
+    assert calls == [1]
+    assert total == 4
+    assert [p['product_id'] for p in first + second] == [p['product_id'] for p in expected]
+    assert repo.search_cache.stats()['hits'] == 1
+
+
+def test_admin_write_invalidates_cached_results(cache_csv):
+    """Results cached for an older catalog version are never served"""
+    repo = CSVRepository(csv_path=cache_csv)
+    assert len(repo.search_products(query='cable')) == 4
+
+    repo.update_product('C4', {'product_name': 'Mouse Cable'})
+
+    assert len(repo.search_products(query='cable')) == 5
+    stats = repo.search_cache.stats()
+    assert stats['misses'] == 2
+    assert stats['invalidations'] == 1
+
+
+def test_different_filters_are_different_entries(cache_csv):
+    """Each normalized filter tuple is cached separately"""
+    repo = CSVRepository(csv_path=cache_csv)
+    repo.search_products(query='cable', min_rating=4.0)
+    repo.search_products(query='cable', min_rating=4)
+    repo.search_products(query='cable', min_rating=4.3)
+
+    assert search_key('Cable', min_rating=4) == search_key('cable', min_rating=4.0)
+    assert repo.search_cache.stats()['hits'] == 1
+    assert repo.search_cache.stats()['entries'] == 2
+
+
+def test_lru_eviction_and_ttl():
+    """Least recently used entries go first; expired entries miss"""
+    now = [0.0]
+    cache = SearchCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put(1, 'a', np.arange(3))
+    cache.put(1, 'b', np.arange(3))
+    cache.get(1, 'a')
+    cache.put(1, 'c', np.arange(3))
+
+    assert cache.get(1, 'b') is None
+    assert cache.get(1, 'a') is not None
+    now[0] = 11
+    assert cache.get(1, 'c') is None
+    stats = cache.stats()
+    assert (stats['evictions'], stats['expirations'], stats['hits']) == (1, 1, 2)
+
+
+def test_row_budget_and_old_versions():
+    """Entries over the row budget are evicted; older versions are not cached"""
+    cache = SearchCache(max_rows=5)
+    cache.put(2, 'a', np.arange(4))
+    cache.put(2, 'b', np.arange(4))
+    cache.put(1, 'old', np.arange(1))
+
+    assert cache.get(2, 'a') is None
+    assert cache.get(2, 'b') is not None
+    assert cache.stats()['entries'] == 1
+
+
+def test_cache_stats_endpoint(cache_csv):
+    """GET /admin/search-cache exposes the counters"""
+    app = create_app()
+    repo = CSVRepository(csv_path=cache_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    client.get("/items/search?q=cable&page=1&size=2")
+    client.get("/items/search?q=cable&page=2&size=2")
+    stats = client.get("/admin/search-cache").json()["search_cache"]
+
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
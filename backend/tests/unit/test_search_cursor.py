@@ -0,0 +1,110 @@
+"""Unit tests for keyset cursor pagination of search results"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.sqlite_repo import SQLiteRepository
+
+
+@pytest.fixture
+def cursor_csv(tmp_path):
+    """Create a catalog with rating ties among the cable products"""
+    test_data = pd.DataFrame({
+        'product_id': [f'K{i}' for i in range(8)],
+        'product_name': ['USB Cable', 'HDMI Cable', 'Laptop', 'Braided Cable', 'Mouse',
+                         'Cable Organizer', 'Audio Cable', 'Cable Ties'],
+        'category': ['Electronics|Accessories'] * 8,
+        'discounted_price': ['₹299', '₹399', '₹45,999', '₹199', '₹499', '₹99', '₹149', '₹49'],
+        'rating': [4.2, 4.5, 4.0, 4.2, 4.1, None, 4.2, 3.9],
+        'about_product': ['charging', 'video', 'computer', 'nylon', 'wireless', 'desk', 'aux', 'bundle'],
+    })
+    csv_path = tmp_path / "cursor_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def _ids(products):
+    return [product['product_id'] for product in products]
+
+
+def _walk(repo, size=2, between_pages=None, **kwargs):
+    """Follow next_cursor to the end, calling between_pages after the first page"""
+    seen, cursor = [], None
+    while True:
+        products, _, cursor = repo.search_products(limit=size, cursor=cursor, return_total=True,
+                                                   return_cursor=True, **kwargs)
+        if between_pages and not seen:
+            between_pages(repo)
+        seen += _ids(products)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize('kwargs', [dict(query='cable'), dict(min_rating=4.0), {}])
+def test_cursor_pages_match_offset_pages(cursor_csv, kwargs):
+    """Following cursors yields exactly the full ranked list"""
+    repo = CSVRepository(csv_path=cursor_csv)
+    assert _walk(repo, **kwargs) == _ids(repo.search_products(**kwargs))
+
+
+def test_text_ties_break_on_product_id(cursor_csv):
+    """Equal relevance and rating are ordered by product_id"""
+    repo = CSVRepository(csv_path=cursor_csv)
+    ranked = _ids(repo.search_products(query='cable'))
+    assert ranked.index('K0') < ranked.index('K3') < ranked.index('K6')
+
+
+def test_admin_write_between_pages_neither_repeats_nor_skips(cursor_csv):
+    """A cursor from an older version resumes after its last product"""
+    repo = CSVRepository(csv_path=cursor_csv)
+    first_page = _ids(repo.search_products(query='cable', limit=2))
+
+    def write(repo):
+        repo.delete_product(first_page[0])
+        repo.add_product({'product_id': 'K0a', 'product_name': 'Cable Clips', 'rating': 5.0})
+
+    seen = _walk(repo, query='cable', between_pages=write)
+    rest = [pid for pid in _ids(repo.search_products(query='cable')) if pid not in first_page]
+
+    assert len(seen) == len(set(seen))
+    # The new product ranks before the cursor and is not served; everything after it is
+    assert seen == first_page + [pid for pid in rest if pid != 'K0a']
+
+
+def test_invalid_or_foreign_cursor_is_rejected(cursor_csv):
+    """Garbage and cursors issued for another search raise ValueError"""
+    repo = CSVRepository(csv_path=cursor_csv)
+    _, _, cursor = repo.search_products(query='cable', limit=2, return_total=True, return_cursor=True)
+
+    with pytest.raises(ValueError):
+        repo.search_products(query='cable', cursor='not-a-cursor')
+    with pytest.raises(ValueError):
+        repo.search_products(query='cable', min_rating=4.0, cursor=cursor)
+
+
+def test_sqlite_cursor_pages_match(cursor_csv, tmp_path):
+    """The SQLite backend pages with keyset WHERE clauses"""
+    repo = SQLiteRepository.import_csv(cursor_csv, tmp_path / "catalog.db")
+    for kwargs in (dict(query='cable'), dict(min_rating=4.0)):
+        assert _walk(repo, **kwargs) == _ids(repo.search_products(**kwargs))
+
+
+def test_search_endpoint_returns_next_cursor(cursor_csv):
+    """GET /items/search exposes next_cursor and accepts it back"""
+    app = create_app()
+    repo = CSVRepository(csv_path=cursor_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    first = client.get("/items/search?q=cable&size=3").json()
+    cursor = first["pagination"]["next_cursor"]
+    second = client.get("/items/search", params={"q": "cable", "size": 3, "cursor": cursor}).json()
+
+    assert cursor is not None
+    assert second["pagination"]["next_cursor"] is None
+    assert second["pagination"]["has_more"] is False
+    assert len(first["products"]) + len(second["products"]) == first["pagination"]["total_results"]
+    bad = client.get("/items/search", params={"q": "laptop", "cursor": cursor})
+    assert bad.status_code == 400
@@ -0,0 +1,80 @@
+"""Unit tests for the process-wide shared catalog snapshot"""
+import os
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository, get_shared_repository, reset_shared_repositories
+
+
+@pytest.fixture
+def catalog_csv(tmp_path):
+    """Create a small catalog CSV and reset the shared snapshots around each test"""
+    test_data = pd.DataFrame({
+        'product_id': ['S1', 'S2'],
+        'product_name': ['USB Cable', 'Wireless Mouse'],
+        'category': ['Electronics|Cables', 'Electronics|Accessories'],
+        'discounted_price': ['₹299', '₹499'],
+        'actual_price': ['₹599', '₹899'],
+        'discount_percentage': ['50%', '44%'],
+        'rating': [4.2, 4.5],
+        'rating_count': [100, 200],
+        'about_product': ['Fast charging cable', 'Ergonomic mouse'],
+    })
+    csv_path = tmp_path / "catalog.csv"
+    test_data.to_csv(csv_path, index=False)
+    reset_shared_repositories()
+    yield str(csv_path)
+    reset_shared_repositories()
+
+
+def test_shared_repository_is_loaded_once(catalog_csv, monkeypatch):
+    """Repeated lookups return the same snapshot without re-reading the CSV"""
+    first = get_shared_repository(catalog_csv)
+
+    calls = []
+    monkeypatch.setattr(CSVRepository, '_reload', lambda self: calls.append(1))
+    second = get_shared_repository(catalog_csv)
+
+    assert first is second
+    assert calls == []
+
+
+def test_shared_repository_reloads_after_external_change(catalog_csv):
+    """Changing the file on disk invalidates the snapshot"""
+    repo = get_shared_repository(catalog_csv)
+    assert repo.get_product_by_id('S3') is None
+
+    df = pd.read_csv(catalog_csv)
+    extra = df.iloc[[0]].assign(product_id='S3', product_name='HDMI Cable')
+    pd.concat([df, extra], ignore_index=True).to_csv(catalog_csv, index=False)
+    stat = os.stat(catalog_csv)
+    os.utime(catalog_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert repo.is_stale()
+    refreshed = get_shared_repository(catalog_csv)
+    assert refreshed is repo
+    assert refreshed.get_product_by_id('S3')['product_name'] == 'HDMI Cable'
+
+
+def test_own_writes_do_not_invalidate_snapshot(catalog_csv):
+    """Writes through the repository update the snapshot in place"""
+    repo = get_shared_repository(catalog_csv)
+    repo.update_product('S1', {'product_name': 'Braided USB Cable'})
+
+    assert not repo.is_stale()
+    assert get_shared_repository(catalog_csv).get_product_by_id('S1')['product_name'] == 'Braided USB Cable'
+
+
+def test_routers_receive_repository_through_dependency(catalog_csv):
+    """The items router uses the injected repository"""
+    app = create_app()
+    repo = CSVRepository(csv_path=catalog_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    response = client.get("/items/S2")
+
+    assert response.status_code == 200
+    assert response.json()["product"]["product_name"] == 'Wireless Mouse'
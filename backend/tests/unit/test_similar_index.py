@@ -0,0 +1,124 @@
+"""Unit tests for the "more like this" LSH index"""
+import numpy as np
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.similar_index import DIMENSIONS, SimilarIndex, similar_path
+from app.repos.sqlite_repo import SQLiteRepository
+
+
+@pytest.fixture
+def similar_csv(tmp_path):
+    """Create a catalog with near-duplicate descriptions"""
+    test_data = pd.DataFrame({
+        'product_id': ['M1', 'M2', 'M3', 'M4', 'M5'],
+        'product_name': ['Stainless Steel Electric Kettle', 'Electric Kettle Stainless Steel 1.5L',
+                         'Noise Cancelling Headphones', 'Wireless Noise Cancelling Earbuds', 'Gel Ink Pen'],
+        'category': ['Home&Kitchen|Kettles', 'Home&Kitchen|Kettles', 'Electronics|Headphones',
+                     'Electronics|Headphones', 'OfficeProducts|Pens'],
+        'rating': [4.1, 4.3, 4.5, 4.0, 3.9],
+        'about_product': ['Boils water fast with auto shut off', 'Boils water fast, auto shut off and dry boil',
+                          'Over ear headphones with active noise cancelling', 'In ear buds with noise cancelling',
+                          'Smooth blue gel ink'],
+    })
+    csv_path = tmp_path / "similar_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def client(request, similar_csv, tmp_path):
+    """API client over either catalog backend"""
+    if request.param == 'csv':
+        repo = CSVRepository(csv_path=similar_csv)
+    else:
+        repo = SQLiteRepository.import_csv(similar_csv, tmp_path / "catalog.db")
+    app = create_app()
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    return TestClient(app)
+
+
+def test_vectors_and_search(similar_csv):
+    """Fixed-size normalized vectors; the LSH search agrees with exact cosine on the best match"""
+    index = CSVRepository(csv_path=similar_csv).version.similar_index
+    assert index.vectors.shape == (5, DIMENSIONS) and index.vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(index.vectors, axis=1), 1)
+
+    assert index.search(index.vectors[0], 1, exclude=0)[0].tolist() == [1]
+    assert index.search(index.text_vector({'text': '...'}), 3)[0].tolist() == []
+
+
+def test_lsh_recall():
+    """On a catalog large enough for LSH, the candidates hold nearly all exact neighbours"""
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((500, DIMENSIONS)).astype(np.float32)
+    vectors = centres[rng.integers(0, 500, 30_000)] + 0.3 * rng.standard_normal((30_000, DIMENSIONS)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = SimilarIndex(vectors, np.ones(1, dtype=np.float32))
+
+    found = 0
+    for position in range(0, 30_000, 300):
+        approximate, _ = index.search(vectors[position], 10, exclude=position)
+        exact, _ = index.exact(vectors[position], 10, exclude=position)
+        found += len(set(approximate.tolist()) & set(exact.tolist()))
+        assert len(index.candidates(vectors[position])) < 30_000 // 2
+    assert found / (100 * 10) > 0.9
+
+
+def test_similar_endpoints(client):
+    """/items/similar?text= and /items/{id}/similar, with projection"""
+    items = client.get("/items/similar?text=kettle that boils water&limit=2").json()["items"]
+    assert [item['product_id'] for item in items] == ['M1', 'M2'] or \
+        [item['product_id'] for item in items] == ['M2', 'M1']
+    assert items[0]['similarity'] >= items[1]['similarity'] > 0
+
+    items = client.get("/items/M3/similar?fields=product_id,similarity&limit=1").json()["items"]
+    assert [list(item) for item in items] == [['product_id', 'similarity']]
+    assert items[0]['product_id'] == 'M4'
+
+    items = client.get("/items/M5/similar?fields=product_name").json()["items"]
+    assert all(list(item) == ['product_name'] for item in items)
+    assert client.get("/items/NOPE/similar").status_code == 404
+    assert client.get("/items/similar?text=x&fields=bogus").status_code == 400
+
+
+def test_index_is_saved_and_reused(similar_csv, monkeypatch):
+    """The first use saves the vectors next to the CSV; later uses read them while fresh"""
+    first = CSVRepository(csv_path=similar_csv)
+    assert not similar_path(similar_csv).exists()  # nothing is built until it is needed
+    first.version.similar_index
+    assert similar_path(similar_csv).exists()
+
+    def no_build(text_index):
+        raise AssertionError("rebuilt a fresh index")
+    monkeypatch.setattr(SimilarIndex, 'build', staticmethod(no_build))
+    second = CSVRepository(csv_path=similar_csv)
+    assert np.array_equal(second.version.similar_index.vectors, first.version.similar_index.vectors)
+
+    monkeypatch.undo()
+    frame = pd.read_csv(similar_csv)
+    frame.loc[4, 'about_product'] = 'Kettle descaler for stainless steel kettles'
+    frame.to_csv(similar_csv, index=False)
+    third = CSVRepository(csv_path=similar_csv)
+    assert not np.array_equal(third.version.similar_index.vectors[4], first.version.similar_index.vectors[4])
+
+
+def test_admin_writes_are_incremental(similar_csv):
+    """Adds, updates and deletes edit the vectors of a new version only"""
+    repo = CSVRepository(csv_path=similar_csv)
+    view = repo.pinned()
+
+    repo.add_product({'product_id': 'M6', 'product_name': 'Blue Gel Pen Set', 'category': 'OfficeProducts|Pens',
+                      'about_product': 'Smooth gel ink pens'})
+    assert repo.similar_to_product('M5', limit=1)[0]['product_id'] == 'M6'
+    repo.update_product('M6', {'product_name': 'Electric Kettle', 'about_product': 'Boils water fast'})
+    assert repo.similar_to_product('M6', limit=1)[0]['product_id'] in ('M1', 'M2')
+    repo.delete_product('M1')
+    assert len(repo.version.similar_index) == len(repo.df) == 5
+    assert 'M1' not in [item['product_id'] for item in repo.similar_to_product('M2')]
+
+    assert len(view.version.similar_index) == 5
+    assert view.similar_to_product('M1', limit=1)[0]['product_id'] == 'M2'
@@ -0,0 +1,127 @@
+"""Unit tests for the SQLite catalog backend"""
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.core.errors import Conflict
+from app.repos.csv_repo import CSVRepository
+from app.repos.sqlite_repo import (SQLiteRepository, get_shared_sqlite_repository,
+                                   reset_shared_sqlite_repositories)
+
+
+@pytest.fixture
+def sqlite_csv(tmp_path):
+    """Create a catalog CSV with a repeated review row, like amazon.csv"""
+    test_data = pd.DataFrame({
+        'product_id': ['Q1', 'Q2', 'Q3', 'Q4', 'Q4'],
+        'product_name': ['USB Type-C Cable', 'Dell Laptop 15', 'Laptop Sleeve', 'Smart TV 43 inch', 'Smart TV 43 inch'],
+        'category': ['Electronics|Cables|USBCables', 'Computers|Laptops|Gaming',
+                     'Computers|LaptopAccessories|Sleeves', 'Electronics|Televisions|SmartTV',
+                     'Electronics|Televisions|SmartTV'],
+        'discounted_price': ['₹299', '₹45,999', '₹799', '₹24,999', '₹24,999'],
+        'discount_percentage': ['50%', '10%', '20%', '30%', '30%'],
+        'rating': [4.2, 4.5, 4.0, 4.4, 4.4],
+        'rating_count': ['1,200', '300', '85', '2,000', '2,000'],
+        'about_product': ['Fast charging cable for laptop', 'Powerful laptop', 'Protective sleeve',
+                          '4K display', '4K display'],
+        'review_id': ['R1', 'R2', 'R3', 'R4', 'R5'],
+        'review_content': ['Works', 'Fast', 'Fits', 'Great', 'Sharp'],
+    })
+    csv_path = tmp_path / "sqlite_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+@pytest.fixture
+def sqlite_repo(sqlite_csv, tmp_path):
+    return SQLiteRepository.import_csv(sqlite_csv, tmp_path / "catalog.db")
+
+
+def _ids(products):
+    return [product['product_id'] for product in products]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'query': 'laptop'},
+    {'query': 'LAPTOP', 'min_rating': 4.1},
+    {'query': 'tv'},
+    {'query': 'type-c cable'},
+    {'category': 'televisions|cables'},
+    {'min_price': 500, 'max_price': 30000},
+    {'min_discount': 25, 'max_rating': 4.4},
+    {'query': 'laptop', 'limit': 1, 'offset': 1},
+])
+def test_search_matches_pandas_backend(sqlite_csv, sqlite_repo, kwargs):
+    """Same products, order and totals as CSVRepository for the relevance ranker"""
+    expected, expected_total = CSVRepository(csv_path=sqlite_csv).search_products(return_total=True, **kwargs)
+    results, total = sqlite_repo.search_products(return_total=True, **kwargs)
+
+    assert _ids(results) == _ids(expected)
+    assert total == expected_total
+
+
+def test_lookups(sqlite_repo):
+    """Id lookups, related products, categories and reviews"""
+    assert sqlite_repo.get_product_by_id('Q2')['discounted_price'] == '₹45,999'
+    assert sqlite_repo.get_product_by_id('missing') is None
+    assert _ids(sqlite_repo.get_products_by_ids(['Q3', 'Q1', 'nope'])) == ['Q1', 'Q3']
+    assert sqlite_repo.get_categories()[0] == 'Electronics|Cables|USBCables'
+    assert _ids(sqlite_repo.get_related_products('Q1')) == []
+    reviews, total = sqlite_repo.get_reviews('Q4', limit=1, offset=1)
+    assert total == 2
+    assert [review['review_id'] for review in reviews] == ['R5']
+    assert 'review_id' not in sqlite_repo.get_product_by_id('Q4')
+
+
+def test_admin_writes_update_text_and_numeric_indexes(sqlite_repo):
+    """CRUD keeps the FTS index and parsed columns in sync and bumps the version"""
+    version = sqlite_repo.version_id
+
+    sqlite_repo.add_product({'product_id': 'Q5', 'product_name': 'HDMI Cable', 'discounted_price': '₹199'})
+    sqlite_repo.update_product('Q1', {'product_name': 'Braided Lightning Lead', 'discounted_price': '₹149'})
+    assert sqlite_repo.delete_product('Q3')
+    assert not sqlite_repo.delete_product('Q3')
+
+    assert _ids(sqlite_repo.search_products(query='hdmi')) == ['Q5']
+    assert _ids(sqlite_repo.search_products(query='lightning')) == ['Q1']
+    assert _ids(sqlite_repo.search_products(max_price=180)) == ['Q1']
+    assert sqlite_repo.search_products(query='sleeve') == []
+    assert sqlite_repo.update_product('missing', {'product_name': 'x'}) is None
+    assert sqlite_repo.version_id == version + 3
+
+
+def test_backend_selected_by_configuration(sqlite_csv, tmp_path, monkeypatch):
+    """CATALOG_BACKEND=sqlite serves the API from the database, importing it on first use"""
+    db_path = tmp_path / "configured.db"
+    monkeypatch.setenv("CATALOG_BACKEND", "sqlite")
+    monkeypatch.setenv("CATALOG_DB_PATH", str(db_path))
+    reset_shared_sqlite_repositories()
+    get_shared_sqlite_repository(str(db_path), csv_path=sqlite_csv)
+    try:
+        client = TestClient(create_app())
+        response = client.get("/items/search?q=laptop")
+
+        assert response.status_code == 200
+        assert _ids(response.json()["products"]) == ['Q2', 'Q3', 'Q1']
+        assert db_path.exists()
+    finally:
+        reset_shared_sqlite_repositories()
+
+
+def test_generated_ids_are_not_reused_after_a_delete(sqlite_repo):
+    """New ids continue past the highest P-number, whatever the row count"""
+    first = sqlite_repo.add_product({'product_name': 'Cable Tie'})['product_id']
+    assert sqlite_repo.delete_product('Q3')
+    second = sqlite_repo.add_product({'product_name': 'Cable Clip'})['product_id']
+
+    assert (first, second) == ('P00000001', 'P00000002')
+    assert sqlite_repo.get_product_by_id(first)['product_name'] == 'Cable Tie'
+    assert sqlite_repo.get_product_by_id(second)['product_name'] == 'Cable Clip'
+
+
+def test_adding_a_taken_id_is_rejected(sqlite_repo):
+    """Like the CSV backend, a second product with an existing id is a 409"""
+    with pytest.raises(Conflict):
+        sqlite_repo.add_product({'product_id': 'Q1', 'product_name': 'Copy'})
+    assert sqlite_repo.get_product_by_id('Q1')['product_name'] != 'Copy'
@@ -0,0 +1,86 @@
+"""Unit tests for the precomputed static ranking features"""
+import pytest
+import numpy as np
+import pandas as pd
+from app.repos.csv_repo import CSVRepository
+from app.repos.ranking import StaticFeatures
+
+
+@pytest.fixture
+def features_csv(tmp_path):
+    """Create a catalog of main products, accessories and plain products"""
+    test_data = pd.DataFrame({
+        'product_id': ['S1', 'S2', 'S3', 'S4'],
+        'product_name': ['Dell Laptop', 'Laptop Sleeve', 'Laptop Stickers', 'Gaming Laptop'],
+        'category': ['Computers|Laptops|Basic', 'Computers|Laptops|LaptopAccessories|Sleeves',
+                     'Home|Stationery|Stickers', 'Computers|GamingLaptops|Basic'],
+        'rating': [4.0, 4.5, None, 3.0],
+        'rating_count': ['1,000', '10', '0', '500'],
+        'about_product': ['laptop', 'laptop sleeve', 'laptop stickers', 'laptop'],
+    })
+    csv_path = tmp_path / "feature_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def test_features_computed_at_load(features_csv):
+    """Main product and accessory flags come from the category path, popularity from the ratings"""
+    features = CSVRepository(csv_path=features_csv).version.features
+
+    assert features['is_main_product'].tolist() == [True, True, False, False]
+    assert features['is_accessory'].tolist() == [False, True, False, False]
+    assert features['main_product'].tolist() == [1, 0, 0, 0]
+    # Missing ratings and few ratings stay near the prior, many ratings move away from it
+    popularity = features['popularity']
+    assert popularity[2] == pytest.approx(0.8)
+    assert popularity[1] == pytest.approx((4.5 * 10 + 4.0 * 50) / 60 / 5)
+    assert popularity[3] < popularity[0]
+
+
+def test_search_does_not_classify_categories(features_csv, monkeypatch):
+    """Rankers read the precomputed arrays instead of matching categories per query"""
+    repo = CSVRepository(csv_path=features_csv)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('category classified at query time')
+    monkeypatch.setattr(StaticFeatures, '_contains', staticmethod(fail))
+
+    for rank in ('relevance', 'bm25'):
+        results = repo.search_products(query='laptop', rank=rank)
+        assert results[0]['product_id'] == 'S1'
+
+
+def test_keywords_are_configurable(features_csv, monkeypatch):
+    """MAIN_PRODUCT_KEYWORDS and ACCESSORY_KEYWORDS replace the built-in lists"""
+    monkeypatch.setenv('MAIN_PRODUCT_KEYWORDS', 'GamingLaptops, Laptops')
+    monkeypatch.setenv('ACCESSORY_KEYWORDS', '')
+    repo = CSVRepository(csv_path=features_csv)
+
+    assert repo.version.features['main_product'].tolist() == [1, 1, 0, 1]
+    assert not repo.version.features['is_accessory'].any()
+    assert repo.search_products(query='laptop')[0]['product_id'] == 'S2'
+
+    explicit = StaticFeatures(main_product_keywords=['Stationery'], accessory_keywords=['Stickers'])
+    categories = pd.Series(['Home|Stationery|Pens', 'Home|Stationery|Stickers'])
+    assert explicit.main_product(categories).tolist() == [1, 0]
+
+
+def test_features_follow_admin_edits(features_csv):
+    """Edited and added rows get fresh features; a pinned older version keeps its own"""
+    repo = CSVRepository(csv_path=features_csv)
+    before = repo.pinned()
+
+    repo.update_product('S3', {'category': 'Computers|Laptops|Refurbished', 'rating': '5.0', 'rating_count': '2000'})
+    repo.add_product({'product_id': 'S5', 'product_name': 'Laptop Bag', 'category': 'Computers|Laptops|Bags',
+                      'rating': '4.1', 'rating_count': '30', 'about_product': 'laptop bag'})
+
+    features = repo.version.features
+    assert features['main_product'].tolist() == [1, 0, 1, 0, 0]
+    assert features['is_accessory'][4]
+    assert features['popularity'][2] == pytest.approx((5.0 * 2000 + 4.0 * 50) / 2050 / 5)
+    assert before.version.features['main_product'].tolist() == [1, 0, 0, 0]
+
+    repo.delete_product('S1')
+    assert repo.version.features['main_product'].tolist() == [0, 1, 0, 0]
+    assert all(len(values) == 4 for values in repo.version.features.values())
+    assert isinstance(repo.version.features['popularity'], np.ndarray)
@@ -0,0 +1,119 @@
+"""Unit tests for typeahead suggestions"""
+import threading
+import pytest
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.api.deps import get_csv_repo
+from app.repos import csv_repo
+from app.repos.csv_repo import CSVRepository
+from app.repos.sqlite_repo import SQLiteRepository
+from app.repos.suggest_index import SuggestIndex
+
+
+@pytest.fixture
+def suggest_csv(tmp_path):
+    """Create a catalog with overlapping name and category words"""
+    test_data = pd.DataFrame({
+        'product_id': ['S1', 'S2', 'S3', 'S4', 'S5'],
+        'product_name': ['USB Type-C Cable', 'USB Wall Charger', 'Smart TV 43 inch', 'Laptop Stand',
+                         'USB Type-C Cable'],
+        'category': ['Electronics|Cables|USBCables', 'Electronics|Chargers', 'Electronics|SmartTelevisions',
+                     'Computers|LaptopAccessories', 'Electronics|Cables|USBCables'],
+        'rating_count': ['1,200', '300', '5,000', '80', '40'],
+        'rating': [4.2, 4.0, 4.4, 3.9, 4.1],
+    })
+    csv_path = tmp_path / "suggest_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+def _texts(suggestions):
+    return [suggestion['text'] for suggestion in suggestions]
+
+
+def test_prefix_matches_any_word_weighted_by_rating_count(suggest_csv):
+    """Names and category terms, best rating_count first"""
+    repo = CSVRepository(csv_path=suggest_csv)
+
+    assert _texts(repo.suggest('us')) == ['USBCables', 'USB Type-C Cable', 'USB Wall Charger']
+    assert _texts(repo.suggest('TELEV')) == ['SmartTelevisions']
+    assert _texts(repo.suggest('ca', limit=2)) == ['Cables', 'USBCables']
+    assert repo.suggest('us')[1] == {'text': 'USB Type-C Cable', 'type': 'product', 'product_id': 'S1',
+                                     'weight': 1200}
+    assert repo.suggest('xyz') == []
+
+
+def test_multi_word_prefix(suggest_csv):
+    """Earlier words must match whole, the last one by prefix"""
+    repo = CSVRepository(csv_path=suggest_csv)
+
+    assert _texts(repo.suggest('usb c')) == ['USBCables', 'USB Type-C Cable', 'USB Wall Charger']
+    assert _texts(repo.suggest('usb ca')) == ['USBCables', 'USB Type-C Cable']
+    assert _texts(repo.suggest('usb ')) == ['USBCables', 'USB Type-C Cable', 'USB Wall Charger']
+
+
+def test_admin_writes_update_suggestions(suggest_csv):
+    """Renames, additions and deletions reach the index after a rebuild"""
+    repo = CSVRepository(csv_path=suggest_csv)
+    index = repo.version.suggest_index
+    repo.update_product('S3', {'rating': 4.5})
+    assert repo.version.suggest_index is index
+
+    repo.update_product('S4', {'product_name': 'Laptop Riser'})
+    repo.add_product({'product_id': 'S6', 'product_name': 'Rice Cooker', 'category': 'Home|Kitchen',
+                      'rating_count': '10'})
+    repo.delete_product('S2')
+
+    # The previous index keeps serving while the new one is built in the background
+    assert repo.version.suggest_index is index
+    repo.version.fresh_suggest_index()
+    assert _texts(repo.suggest('ri')) == ['Laptop Riser', 'Rice Cooker']
+    assert _texts(repo.suggest('wall')) == []
+
+
+def test_edit_stream_rebuilds_once_for_the_newest_version(suggest_csv, monkeypatch):
+    """Versions published during a rebuild share one rebuilder, which then builds only the latest"""
+    repo = CSVRepository(csv_path=suggest_csv)
+    index = repo.version.suggest_index
+    release, builds = threading.Event(), []
+
+    def slow_index(df, rating_count):
+        builds.append(df['product_name'].tolist())
+        release.wait(5)
+        return SuggestIndex(df, rating_count)
+    monkeypatch.setattr(csv_repo, 'SuggestIndex', slow_index)
+
+    for name in ('Laptop Riser', 'Laptop Tray', 'Laptop Desk', 'Laptop Shelf'):
+        repo.update_product('S4', {'product_name': name})
+        assert repo.version.suggest_index is index
+    rebuilder = repo.version._suggest_rebuilder
+    assert sum(thread.name == 'suggest-index-rebuild' for thread in threading.enumerate()) == 1
+    rebuild = rebuilder._thread
+    release.set()
+    rebuild.join(5)
+
+    assert [names[3] for names in builds] == ['Laptop Riser', 'Laptop Shelf']
+    assert 'Laptop Shelf' in _texts(repo.suggest('laptop')) and 'Laptop Riser' not in _texts(repo.suggest('laptop'))
+
+
+def test_sqlite_suggestions_match(suggest_csv, tmp_path):
+    """The SQLite backend builds the same index from its table"""
+    csv_repo = CSVRepository(csv_path=suggest_csv)
+    sqlite_repo = SQLiteRepository.import_csv(suggest_csv, tmp_path / "catalog.db")
+    for prefix in ('us', 'usb c', 'e', 'laptop'):
+        assert sqlite_repo.suggest(prefix) == csv_repo.suggest(prefix)
+
+
+def test_suggest_endpoint(suggest_csv):
+    """GET /items/suggest validates the prefix"""
+    app = create_app()
+    repo = CSVRepository(csv_path=suggest_csv)
+    app.dependency_overrides[get_csv_repo] = lambda: repo
+    client = TestClient(app)
+
+    response = client.get("/items/suggest?prefix=sma")
+
+    assert response.status_code == 200
+    assert _texts(response.json()["suggestions"]) == ['Smart TV 43 inch', 'SmartTelevisions']
+    assert client.get("/items/suggest?prefix=").status_code == 422
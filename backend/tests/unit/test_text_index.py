@@ -0,0 +1,77 @@
+"""Unit tests for the inverted text index behind /items/search"""
+import re
+import pytest
+import pandas as pd
+from app.repos.csv_repo import CSVRepository
+from app.repos import text_index
+from app.repos.text_index import InvertedIndex, tokenize
+
+
+@pytest.fixture
+def text_frame():
+    """Catalog rows with punctuation, mixed case and a missing description"""
+    return pd.DataFrame({
+        'product_id': ['T1', 'T2', 'T3', 'T4'],
+        'product_name': ['USB-C Fast Charger', 'Smart TV 43 inch', 'Television Stand', 'Wireless Earbuds'],
+        'category': ['Electronics|Chargers', 'Electronics|Televisions', 'Furniture|Stands', 'Audio|Earbuds'],
+        'about_product': ['Fast charging for phones', 'Full HD smart tv', None, 'Long battery life'],
+        'rating': [4.1, 4.3, 3.9, 4.0],
+    })
+
+
+def old_contains(frame, field, query, regex=False):
+    return frame[field].str.contains(query, case=False, na=False, regex=regex).to_numpy()
+
+
+@pytest.mark.parametrize('query', ['usb', 'tv', 'TELE', 'fast charging', 'usb-c', 'c f', 'ch', '|', 'missing'])
+def test_match_equals_substring_scan(text_frame, query):
+    """Postings answer the same rows as a case-insensitive substring scan"""
+    index = InvertedIndex(text_frame)
+    matches = index.match(query)
+
+    for field in ('product_name', 'category', 'about_product'):
+        assert (matches[field] == old_contains(text_frame, field, query)).all(), field
+
+
+@pytest.mark.parametrize('query', ['tv', 'TV', 'usb', 'usb-c', 'smart tv', 'charg'])
+def test_exact_word_equals_word_boundary_scan(text_frame, query):
+    """Whole-word matches agree with the \\bquery\\b regex"""
+    index = InvertedIndex(text_frame)
+    exact = index.exact_word(query)
+    pattern = r'\b' + re.escape(query) + r'\b'
+
+    for field in ('product_name', 'category', 'about_product'):
+        assert (exact[field] == old_contains(text_frame, field, pattern, regex=True)).all(), field
+
+
+def test_substring_cache_is_bounded(text_frame, monkeypatch):
+    """Distinct query fragments evict the least recently used ones"""
+    monkeypatch.setattr(text_index, 'SUBSTRING_CACHE_SIZE', 3)
+    index = InvertedIndex(text_frame)
+    for query in ('usb', 'tv', 'fast', 'tv', 'smart', 'zzz'):
+        index.match(query)
+
+    assert list(index._substring_cache) == ['tv', 'smart', 'zzz']
+    assert index.match('usb')['product_name'].tolist() == [True, False, False, False]
+
+
+def test_tokenize_handles_missing_values():
+    """NaN and None tokenize to nothing"""
+    assert tokenize(None) == []
+    assert tokenize(float('nan')) == []
+    assert tokenize('USB-C Cable') == ['usb', 'c', 'cable']
+
+
+def test_index_follows_admin_writes(tmp_path, text_frame):
+    """Added and updated products are searchable immediately"""
+    csv_path = tmp_path / "text_products.csv"
+    text_frame.to_csv(csv_path, index=False)
+    repo = CSVRepository(csv_path=str(csv_path))
+
+    repo.add_product({'product_id': 'T5', 'product_name': 'Gaming Headset', 'category': 'Audio|Headsets'})
+    assert [p['product_id'] for p in repo.search_products(query='headset')] == ['T5']
+
+    repo.update_product('T4', {'product_name': 'Noise Cancelling Headphones'})
+    assert repo.search_products(query='earbuds')[0]['product_id'] == 'T4'  # still in category
+    assert repo.search_products(query='wireless') == []
+    assert {p['product_id'] for p in repo.search_products(query='head')} == {'T4', 'T5'}
@@ -0,0 +1,59 @@
+"""Unit tests for partial top-k ranking"""
+import pytest
+import numpy as np
+import pandas as pd
+from app.repos.csv_repo import CSVRepository
+from app.repos.ranking import top_k
+from app.repos.search_cache import SearchCache
+from app.services.items_recommendation_service import recommend_items_for_query
+
+
+@pytest.fixture
+def ranking_csv(tmp_path):
+    """Create a catalog where many cables tie on relevance and rating"""
+    names = ['USB Cable', 'HDMI Cable', 'Braided Cable', 'Audio Cable', 'Cable Ties', 'Laptop']
+    test_data = pd.DataFrame({
+        'product_id': [f'T{i:02d}' for i in range(30)][::-1],
+        'product_name': [names[i % len(names)] for i in range(30)],
+        'category': ['Electronics|Accessories'] * 30,
+        'discounted_price': ['₹299'] * 30,
+        'rating': [[4.2, 4.5, None][i % 3] for i in range(30)],
+        'about_product': ['cable'] * 10 + ['desk'] * 20,
+    })
+    csv_path = tmp_path / "ranking_products.csv"
+    test_data.to_csv(csv_path, index=False)
+    return str(csv_path)
+
+
+@pytest.mark.parametrize('k', [0, 1, 7, 50, 200])
+def test_top_k_matches_full_sort(k):
+    """Partial selection returns the head of the full lexicographic sort"""
+    rng = np.random.default_rng(k)
+    scores = rng.integers(0, 4, 200).astype(float)
+    ratings = rng.choice([3.5, 4.0, np.nan], 200)
+    tie_ranks = rng.permutation(200)
+
+    expected = np.lexsort((tie_ranks, -np.nan_to_num(ratings, nan=-np.inf), -scores))[:k]
+    assert top_k(k, scores, ratings, tie_ranks).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('max_entries', [0, 256])
+def test_every_page_matches_the_fully_sorted_ranking(ranking_csv, max_entries):
+    """Pages past the ordered head are ranked on demand, cached or not"""
+    repo = CSVRepository(csv_path=ranking_csv, search_cache=SearchCache(max_entries=max_entries))
+    pages = []
+    for offset in range(0, 30, 4):
+        pages += repo.search_products(query='cable', limit=4, offset=offset)
+    full = repo.search_products(query='cable', limit=100)
+
+    assert len(full) == 26
+    assert [p['product_id'] for p in pages] == [p['product_id'] for p in full]
+
+
+def test_recommendations_break_ties_on_rating_then_id(ranking_csv):
+    """Equal scores are ordered by rating (missing last), then product_id"""
+    repo = CSVRepository(csv_path=ranking_csv)
+    items, total = recommend_items_for_query('cable', limit=6, repo=repo)
+
+    assert total == 26
+    assert [item['product_id'] for item in items] == ['T22', 'T25', 'T28', 'T20', 'T23', 'T26']